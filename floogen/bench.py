@@ -0,0 +1,408 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Scaling benchmarks of the FlooGen elaboration pipeline.
+
+Synthesizes meshes with `XY`, `ID` and `SRC` routing, trees in the style of
+`occamy_tree.yml` and meshes with collective operations in a range of sizes, and
+measures every stage of the pipeline on them: validation, `create_network`,
+`compile_network`, `gen_routing_info` and rendering of the package and top-module.
+
+    python -m floogen.bench                          # quick suite, up to 8x8
+    python -m floogen.bench --suite full --save baseline.json
+    python -m floogen.bench --compare baseline.json  # exit code 1 on a regression
+
+Times are the best of `--repeat` runs. Memory is the peak of the Python allocations
+during a stage, measured with `tracemalloc` in a separate run so that it does not
+distort the times.
+"""
+
+import argparse
+import copy
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, NamedTuple, TextIO
+
+from floogen.cli import find_template, render
+from floogen.model.network import Network
+
+STAGES = ("validate", "create_network", "compile_network", "gen_routing_info", "render")
+
+DEFAULT_THRESHOLD = 0.25
+"""Relative slowdown of a stage that `--compare` reports as a regression."""
+
+DEFAULT_MIN_TIME = 0.005
+"""Stages faster than this, in seconds, are too noisy to be compared."""
+
+_AXI_PROTOCOLS: list[dict[str, Any]] = [
+    {"name": "axi_in", "type": "narrow", "protocol": "AXI4", "data_width": 64,
+     "addr_width": 48, "id_width": 4, "user_width": 1, "type_prefix": None},
+    {"name": "axi_out", "type": "narrow", "protocol": "AXI4", "data_width": 64,
+     "addr_width": 48, "id_width": 2, "user_width": 1, "type_prefix": None},
+]  # fmt: skip
+
+_NW_PROTOCOLS: list[dict[str, Any]] = [
+    {"name": "narrow_in", "type": "narrow", "protocol": "AXI4", "data_width": 64,
+     "addr_width": 48, "id_width": 4, "user_width": 1},
+    {"name": "narrow_out", "type": "narrow", "protocol": "AXI4", "data_width": 64,
+     "addr_width": 48, "id_width": 2, "user_width": 1},
+    {"name": "wide_in", "type": "wide", "protocol": "AXI4", "data_width": 512,
+     "addr_width": 48, "id_width": 3, "user_width": 1},
+    {"name": "wide_out", "type": "wide", "protocol": "AXI4", "data_width": 512,
+     "addr_width": 48, "id_width": 1, "user_width": 1},
+]  # fmt: skip
+
+
+class Case(NamedTuple):
+    """A synthesized configuration to benchmark."""
+
+    name: str
+    config: dict[str, Any]
+
+
+def mesh_config(x: int, y: int, route_algo: str = "XY") -> dict[str, Any]:
+    """Return an AXI mesh of `x` by `y` clusters, with one HBM channel per row on the west."""
+    return {
+        "name": f"mesh_{route_algo.lower()}_{x}x{y}",
+        "description": f"{x}x{y} AXI mesh with {route_algo} routing",
+        "network_type": "axi",
+        "routing": {"route_algo": route_algo, "use_id_table": True},
+        "protocols": copy.deepcopy(_AXI_PROTOCOLS),
+        "endpoints": [
+            {
+                "name": "cluster",
+                "array": [x, y],
+                "addr_range": {"base": 0x0000_0000_0000, "size": 0x0000_0001_0000},
+                "mgr_port_protocol": ["axi_in"],
+                "sbr_port_protocol": ["axi_out"],
+            },
+            {
+                "name": "hbm",
+                "array": [y],
+                "addr_range": {"base": 0x0000_8000_0000, "size": 0x0000_0001_0000},
+                "sbr_port_protocol": ["axi_out"],
+            },
+        ],
+        "routers": [{"name": "router", "array": [x, y], "degree": 5}],
+        "connections": [
+            {
+                "src": "cluster",
+                "dst": "router",
+                "src_range": [[0, x - 1], [0, y - 1]],
+                "dst_range": [[0, x - 1], [0, y - 1]],
+                "dst_dir": "Eject",
+            },
+            {
+                "src": "hbm",
+                "dst": "router",
+                "src_range": [[0, y - 1]],
+                "dst_range": [[0, 0], [0, y - 1]],
+                "dst_dir": "West",
+            },
+        ],
+    }
+
+
+def tree_config(num_leaves: int, clusters_per_leaf: int = 4) -> dict[str, Any]:
+    """Return a two-level narrow-wide tree like `occamy_tree.yml`, with `num_leaves` leaf
+    routers of `clusters_per_leaf` clusters each and the HBM at the root."""
+    return {
+        "name": f"tree_{num_leaves}x{clusters_per_leaf}",
+        "description": f"Tree of {num_leaves} leaf routers with {clusters_per_leaf} clusters each",
+        "network_type": "narrow-wide",
+        "routing": {"route_algo": "ID", "use_id_table": True},
+        "protocols": copy.deepcopy(_NW_PROTOCOLS),
+        "endpoints": [
+            {
+                "name": "cluster",
+                "array": [num_leaves, clusters_per_leaf],
+                "addr_range": {"base": 0x0000_1000_0000, "size": 0x0000_0004_0000},
+                "mgr_port_protocol": ["narrow_in", "wide_in"],
+                "sbr_port_protocol": ["narrow_out", "wide_out"],
+            },
+            {
+                "name": "hbm",
+                "array": [8],
+                "addr_range": {"base": 0x0000_8000_0000, "size": 0x0000_4000_0000},
+                "sbr_port_protocol": ["narrow_out", "wide_out"],
+            },
+        ],
+        "routers": [{"name": "router", "tree": [1, num_leaves]}],
+        "connections": [
+            {
+                "src": "cluster",
+                "dst": "router",
+                "src_range": [[0, num_leaves - 1], [0, clusters_per_leaf - 1]],
+                "dst_lvl": 1,
+                "allow_multi": True,
+            },
+            {
+                "src": "router",
+                "dst": "hbm",
+                "dst_range": [[0, 7]],
+                "src_lvl": 0,
+                "allow_multi": True,
+            },
+        ],
+    }
+
+
+def interleaved_tree_config(num_leaves: int, clusters_per_leaf: int = 4) -> dict[str, Any]:
+    """Return `tree_config` with minimized routing tables and the clusters assigned to the
+    leaf routers round-robin, so that every endpoint ID is a separate range in the table of
+    the root router."""
+    config = tree_config(num_leaves, clusters_per_leaf)
+    config["name"] = f"tree_minimal_{num_leaves}x{clusters_per_leaf}"
+    config["description"] += ", interleaved over the leaves"
+    config["routing"]["table_encoding"] = "minimal"
+    config["endpoints"][0]["array"] = [clusters_per_leaf, num_leaves]
+    config["connections"][0:1] = [
+        {
+            "src": "cluster",
+            "dst": "router",
+            "src_range": [[i, i], [0, num_leaves - 1]],
+            "dst_lvl": 1,
+        }
+        for i in range(clusters_per_leaf)
+    ]
+    return config
+
+
+def collective_config(x: int, y: int) -> dict[str, Any]:
+    """Return a narrow-wide mesh like `collective.yml`, with multicast, barriers and
+    reductions enabled."""
+    user_width = {"collective_mask": 48, "collective_op": 4}
+    protocols = copy.deepcopy(_NW_PROTOCOLS)
+    for prot in protocols:
+        prot["user_width"] = {**user_width, "user": 5} if prot["type"] == "narrow" else user_width
+    return {
+        "name": f"collective_{x}x{y}",
+        "description": f"{x}x{y} narrow-wide mesh with collective operations",
+        "network_type": "narrow-wide",
+        "routing": {
+            "route_algo": "XY",
+            "use_id_table": True,
+            "collective": {
+                "en_narrow_multicast": True,
+                "en_wide_multicast": True,
+                "en_barrier": True,
+                "en_narrow_reduction": {"rd_pipeline_depth": 1},
+                "en_wide_reduction": {"ops": ["Add", "Max"], "rd_pipeline_depth": 5},
+            },
+            "vc_impl": "PREEMPT",
+        },
+        "protocols": protocols,
+        "endpoints": [
+            {
+                "name": "cluster",
+                "array": [x, y],
+                "addr_range": {"base": 0x2000_0000, "size": 0x0004_0000, "en_collective": True},
+                "mgr_port_protocol": ["narrow_in", "wide_in"],
+                "sbr_port_protocol": ["narrow_out", "wide_out"],
+            },
+        ],
+        "routers": [{"name": "router", "array": [x, y], "degree": 5}],
+        "connections": [
+            {
+                "src": "cluster",
+                "dst": "router",
+                "src_range": [[0, x - 1], [0, y - 1]],
+                "dst_range": [[0, x - 1], [0, y - 1]],
+                "dst_dir": "Eject",
+            },
+        ],
+    }
+
+
+def suite(name: str = "quick") -> list[Case]:
+    """Return the cases of the `quick` or the `full` suite."""
+    mesh_sizes = [2, 4, 8] if name == "quick" else [2, 4, 8, 16, 32, 64]
+    tree_sizes = [2, 6] if name == "quick" else [2, 6, 16, 32, 64]
+    collective_sizes = [4] if name == "quick" else [4, 8, 16]
+    interleaved_sizes = [16] if name == "quick" else [16, 64]
+    cases = []
+    for route_algo in ("XY", "ID", "SRC"):
+        for n in mesh_sizes:
+            config = mesh_config(n, n, route_algo)
+            cases.append(Case(config["name"], config))
+    for n in tree_sizes:
+        config = tree_config(n)
+        cases.append(Case(config["name"], config))
+    for n in interleaved_sizes:
+        config = interleaved_tree_config(n, 16)
+        cases.append(Case(config["name"], config))
+    for n in collective_sizes:
+        config = collective_config(n, n)
+        cases.append(Case(config["name"], config))
+    return cases
+
+
+def run_pipeline(config: dict[str, Any], trace_memory: bool = False) -> dict[str, float]:
+    """Run all stages on a configuration, returning the time of each stage in seconds,
+    or its peak memory in MiB if `trace_memory` is set."""
+    results = {}
+
+    def measure(stage: str, func: Callable[[], Any]) -> Any:
+        if trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = func()
+            results[stage] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+        else:
+            start = time.perf_counter()
+            result = func()
+            results[stage] = time.perf_counter() - start
+        return result
+
+    network = measure("validate", lambda: Network.model_validate(copy.deepcopy(config)))
+    measure("create_network", network.create_network)
+    measure("compile_network", network.compile_network)
+    measure("gen_routing_info", network.gen_routing_info)
+    context = {"noc": network, "name": network.name}
+    tpls = [find_template(Path(f"floo_{tpl}.sv.mako")) for tpl in ("noc_pkg", "noc")]
+    measure("render", lambda: [render(context, tpl) for tpl in tpls])
+    return results
+
+
+def run_case(case: Case, repeat: int = 3, trace_memory: bool = True) -> dict[str, Any]:
+    """Benchmark a case, returning the best time and the peak memory of every stage."""
+    times = [run_pipeline(case.config) for _ in range(repeat)]
+    result: dict[str, Any] = {stage: {"time": min(run[stage] for run in times)} for stage in STAGES}
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            memory = run_pipeline(case.config, trace_memory=True)
+        finally:
+            tracemalloc.stop()
+        for stage in STAGES:
+            result[stage]["memory"] = memory[stage]
+    return {"stages": result, "total": sum(stage["time"] for stage in result.values())}
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_time: float = DEFAULT_MIN_TIME,
+) -> list[str]:
+    """Compare results against a baseline and describe every stage that got slower by
+    more than `threshold`. Cases or stages missing from the baseline are skipped."""
+    regressions = []
+    for name, case in results["cases"].items():
+        base_case = baseline["cases"].get(name)
+        if base_case is None:
+            continue
+        for stage, entry in case["stages"].items():
+            base_time = base_case["stages"].get(stage, {}).get("time")
+            if base_time is None or max(base_time, entry["time"]) < min_time:
+                continue
+            if entry["time"] > base_time * (1 + threshold):
+                regressions.append(
+                    f"{name}: {stage} took {entry['time']:.3f}s, "
+                    f"{entry['time'] / base_time - 1:+.0%} over the baseline of {base_time:.3f}s"
+                )
+    return regressions
+
+
+def print_table(results: dict[str, Any], file: TextIO | None = None):
+    """Print the time and memory of every stage of every case, to stdout by default."""
+    file = file or sys.stdout
+    width = max([len("Case"), *map(len, results["cases"])])
+    header = "".join(f"  {stage:>16}" for stage in STAGES)
+    print(f"{'Case':<{width}}{header}  {'total':>8}", file=file)
+    for name, case in results["cases"].items():
+        cells = []
+        for stage in STAGES:
+            entry = case["stages"][stage]
+            memory = f" {entry['memory']:6.1f}M" if "memory" in entry else ""
+            cells.append(f"  {entry['time']:7.3f}s{memory:>8}")
+        print(f"{name:<{width}}{''.join(cells)}  {case['total']:7.3f}s", file=file)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(
+        prog="python -m floogen.bench",
+        description="Measure how the FlooGen pipeline scales with the size of the network.",
+    )
+    parser.add_argument(
+        "--suite",
+        choices=["quick", "full"],
+        default="quick",
+        help="Meshes up to 8x8 (quick), or up to 64x64 (full). Defaults to quick.",
+    )
+    parser.add_argument(
+        "-k",
+        "--case",
+        dest="case_filter",
+        default=None,
+        help="Only run the cases whose name matches this regular expression.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of timed runs per case. Defaults to 3."
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="Skip the additional run measuring the memory of every stage.",
+    )
+    parser.add_argument("--save", type=Path, default=None, help="Save the results as JSON.")
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="Compare against a baseline saved with `--save`, exit with 1 on a regression.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative slowdown reported as a regression. Defaults to {DEFAULT_THRESHOLD}.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help=f"Stages faster than this are not compared. Defaults to {DEFAULT_MIN_TIME}s.",
+    )
+    args = parser.parse_args(argv)
+
+    cases = suite(args.suite)
+    if args.case_filter is not None:
+        cases = [case for case in cases if re.search(args.case_filter, case.name)]
+
+    results: dict[str, Any] = {
+        "floogen": version("floogen"),
+        "python": platform.python_version(),
+        "cases": {},
+    }
+    for case in cases:
+        print(f"Running {case.name}...", file=sys.stderr)
+        results["cases"][case.name] = run_case(case, args.repeat, args.memory)
+    print_table(results)
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
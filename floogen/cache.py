@@ -0,0 +1,230 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""On-disk cache of elaborated networks.
+
+Creating, compiling and routing a network is by far the most expensive part of a
+`floogen` invocation, and it is repeated on every call even if the configuration did
+not change, e.g. when running `pkg`, `top` and `rdl` one after another. The elaborated
+`Network`, including the routing tables and the system address map, is therefore
+pickled into a user cache directory and reused by later invocations.
+
+Entries are content-addressed: the key is a hash over the resolved configuration,
+the `-P` overrides and the FlooGen version, together with a fingerprint of the FlooGen
+sources themselves, so that editable installs do not pick up stale entries either.
+The cache is bounded in size, the least recently used entries are evicted first.
+
+The same directory also holds the compiled Mako templates. Mako translates every
+template to a Python module before it can be rendered, which `load_template` keeps
+on disk, keyed by the template's path and content, so that later invocations only
+render.
+
+Sweeps of the injection rate keep the result of every point they evaluated as a small
+JSON document (`load_result`/`store_result`), keyed by the network and the settings of
+the point, so that repeating or extending a sweep only evaluates the new points.
+
+The cache directory is `$FLOOGEN_CACHE_DIR` if set, and `$XDG_CACHE_HOME/floogen`
+(defaulting to `~/.cache/floogen`) otherwise.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from importlib.metadata import version
+from importlib.resources import as_file, files
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import floogen.templates
+from floogen.profiler import stage
+
+if TYPE_CHECKING:
+    from mako.template import Template
+
+    from floogen.model.network import Network
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 256 * 2**20
+"""Default upper bound of the total size of the cache, in bytes."""
+
+_SUFFIX = ".pkl"
+_TEMPLATE_SUBDIR = "templates"
+_RESULT_SUBDIR = "results"
+
+
+def cache_dir() -> Path:
+    """Return the directory holding the cached networks."""
+    if env_dir := os.environ.get("FLOOGEN_CACHE_DIR"):
+        return Path(env_dir)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache) / "floogen"
+
+
+def _source_fingerprint() -> str:
+    """Return the FlooGen version together with a fingerprint of its sources."""
+    pkg_dir = Path(__file__).parent
+    digest = hashlib.sha256(version("floogen").encode())
+    for path in sorted(pkg_dir.rglob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(pkg_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def cache_key(network: "Network", param_overrides: dict[str, str] | None = None) -> str:
+    """Return the key of a parsed, but not yet elaborated, network."""
+    digest = hashlib.sha256(_source_fingerprint().encode())
+    digest.update(network.model_dump_json(exclude={"graph"}).encode())
+    digest.update(json.dumps(param_overrides or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_template(tpl: Path) -> "Template":
+    """Load a Mako template, reusing its compiled module from the cache directory."""
+    # Mako is only needed to render, not to elaborate or to query a network
+    from mako.template import Template
+
+    tpl = tpl.resolve()
+    digest = hashlib.sha256(str(tpl).encode())
+    digest.update(tpl.read_bytes())
+    module_file = cache_dir() / _TEMPLATE_SUBDIR / f"{tpl.name}.{digest.hexdigest()[:16]}.py"
+    try:
+        # Mako recompiles the module if it is older than the template or was compiled by
+        # a different Mako version.
+        return Template(filename=str(tpl), module_filename=str(module_file))
+    except OSError as e:
+        logger.warning("Could not cache the compiled template %s: %s", tpl, e)
+        return Template(filename=str(tpl))
+
+
+@functools.cache
+def package_template(name: str) -> "Template":
+    """Load one of FlooGen's own templates, once per process and only when first used."""
+    with as_file(files(floogen.templates).joinpath(name)) as tpl_path:
+        return load_template(tpl_path)
+
+
+def load(key: str, directory: Path | None = None) -> "Network | None":
+    """Return the cached network for `key`, or `None` if there is none."""
+    path = (directory or cache_dir()) / (key + _SUFFIX)
+    try:
+        with open(path, "rb") as f:
+            network = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # noqa: BLE001
+        # A truncated or outdated entry can fail in many ways, none of which is fatal.
+        logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+        path.unlink(missing_ok=True)
+        return None
+    # Mark the entry as recently used for the eviction
+    os.utime(path)
+    return network
+
+
+def store(
+    key: str,
+    network: "Network",
+    directory: Path | None = None,
+    max_size: int = DEFAULT_MAX_SIZE,
+):
+    """Store an elaborated network under `key` and evict old entries if necessary."""
+    directory = directory or cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent invocations never see
+        # a partially written entry.
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            pickle.dump(network, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, directory / (key + _SUFFIX))
+    except OSError as e:
+        logger.warning("Could not write to the cache directory %s: %s", directory, e)
+        return
+    evict(directory, max_size)
+
+
+def load_result(key: str, directory: Path | None = None) -> dict | None:
+    """Return the cached result for `key`, or `None` if there is none."""
+    path = (directory or cache_dir()) / _RESULT_SUBDIR / f"{key}.json"
+    try:
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)
+    return result
+
+
+def store_result(key: str, result: dict, directory: Path | None = None):
+    """Store a result under `key`. Old entries are evicted along with the networks."""
+    result_dir = (directory or cache_dir()) / _RESULT_SUBDIR
+    try:
+        result_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=result_dir, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as f:
+            json.dump(result, f)
+        os.replace(f.name, result_dir / f"{key}.json")
+    except OSError as e:
+        logger.warning("Could not write to the cache directory %s: %s", result_dir, e)
+
+
+def evict(directory: Path | None = None, max_size: int = DEFAULT_MAX_SIZE):
+    """Remove the least recently used entries until the cache fits into `max_size`."""
+    directory = directory or cache_dir()
+    entries = []
+    paths = [
+        *directory.glob("*" + _SUFFIX),
+        *directory.glob(f"{_TEMPLATE_SUBDIR}/*.py"),
+        *directory.glob(f"{_RESULT_SUBDIR}/*.json"),
+    ]
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total_size <= max_size:
+            break
+        path.unlink(missing_ok=True)
+        # Compiled templates leave their bytecode behind as well
+        for pyc in path.parent.glob(f"__pycache__/{path.stem}.*.pyc"):
+            pyc.unlink(missing_ok=True)
+        total_size -= size
+
+
+def elaborate(
+    network: "Network",
+    param_overrides: dict[str, str] | None = None,
+    use_cache: bool = True,
+) -> "Network":
+    """Create, compile and route a parsed network, reusing a cached result if possible."""
+    with stage("cache_load"):
+        key = cache_key(network, param_overrides) if use_cache else None
+        cached = load(key) if key is not None else None
+    if cached is not None:
+        logger.debug("Using cached network %s", key)
+        return cached
+    with stage("create_network"):
+        network.create_network()
+    with stage("compile_network"):
+        network.compile_network()
+    with stage("gen_routing_info"):
+        network.gen_routing_info()
+    if key is not None:
+        with stage("cache_store"):
+            store(key, network)
+    return network
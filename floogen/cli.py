@@ -5,22 +5,29 @@
 #
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
+# `floogen` is invoked many times by build systems, so the heavy dependencies - the network
+# models with pydantic and networkx, Mako and ruamel.yaml - are only imported by the
+# commands that need them.
+
 import argparse
+import functools
 import json
+import os
 import sys
+from collections.abc import Callable
 from importlib.metadata import version
 from importlib.util import find_spec
 from pathlib import Path
-from typing import TypedDict
-
-from mako.template import Template
+from typing import TYPE_CHECKING, NamedTuple, TypedDict
 
-from floogen.config_parser import ConfigError, parse_config
-from floogen.model.network import Network, config_json_schema
-from floogen.model.traffic import MESH_TRAFFIC_TYPES, gen_traffic_builtin, gen_traffic_cfg
+from floogen.model.traffic_patterns import MESH_TRAFFIC_TYPES
 from floogen.params import ParamError, parse_overrides
-from floogen.query import handle_query
-from floogen.utils import verible_format
+from floogen.profiler import Profiler, stage
+from floogen.utils import VeribleFormatter, verible_format
+
+if TYPE_CHECKING:
+    from floogen.model.link_load import TrafficMatrix
+    from floogen.model.network import Network
 
 tpl_dir = Path(__file__).parent / "templates"
 
@@ -36,35 +43,344 @@ class RenderKwargs(TypedDict, total=False):
     verible_fmt_args: str | None
 
 
-def render_template(
+class RenderTask(NamedTuple):
+    """A template to render as part of a batch, see `render_templates`."""
+
+    tpl: Path
+    render_kwargs: RenderKwargs
+    file_name: str | None = None
+    context: dict | None = None
+    """Context entries specific to this template, on top of the shared context."""
+
+
+def find_template(tpl: Path) -> Path:
+    """Return the path of a template, falling back to the internal template directory."""
+    if tpl.exists():
+        return tpl
+    # Search in the internal template directory if the template exists there
+    if (tpl_dir / tpl.name).exists():
+        return tpl_dir / tpl.name
+    raise FileNotFoundError(f"Template not found: {tpl}")
+
+
+def render(
     context: dict,
     tpl: Path,
-    outdir: Path | None = None,
-    file_name: str | None = None,
     format_output: bool = False,
     verible_fmt_bin: str | None = None,
     verible_fmt_args: str | None = None,
-):
-    """Render a template, format if requested and write to file or print to stdout."""
-    if not tpl.exists():
-        # Search in the internal template directory if the template exists there
-        if (tpl_dir / tpl.name).exists():
-            tpl = tpl_dir / tpl.name
-        else:
-            raise FileNotFoundError(f"Template not found: {tpl}")
-    rendered = Template(filename=str(tpl.resolve())).render(**context)
+) -> str:
+    """Render a template and format it if requested."""
+    from floogen.cache import load_template
+
+    rendered = load_template(tpl).render(**context)
     if format_output:
         rendered = verible_format(rendered, verible_fmt_bin, verible_fmt_args)
+    return rendered
+
+
+def output_path(tpl: Path, outdir: Path, file_name: str | None = None) -> Path:
+    """Return the path a template is written to in `outdir`."""
+    return outdir / (file_name or tpl.stem)
+
+
+def render_to_file(context: dict, tpl: Path, outfile: Path):
+    """Render a template straight into a file, without building the output in memory."""
+    from mako.runtime import Context
+
+    from floogen.cache import load_template
+
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    # Render next to the output and move it into place once complete, so that a template
+    # failing halfway neither truncates the previous output nor leaves a partial one.
+    # Unlike `tempfile`, `open` creates the file with the permissions of the umask.
+    tmpfile = outfile.with_name(f".{outfile.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmpfile, "w", encoding="utf-8") as f:
+            load_template(tpl).render_context(Context(f, **context))
+        os.replace(tmpfile, outfile)
+    except BaseException:
+        tmpfile.unlink(missing_ok=True)
+        raise
+
+
+def write_output(
+    rendered: str, tpl: Path, outdir: Path | None = None, file_name: str | None = None
+) -> Path | None:
+    """Write a rendered template to file or print it to stdout.
+
+    Returns the path of the written file, or `None` if the output was printed.
+    """
     if outdir:
         outdir.mkdir(parents=True, exist_ok=True)
-        if file_name:
-            outfile = outdir / file_name
-        else:
-            outfile = outdir / tpl.stem
+        outfile = output_path(tpl, outdir, file_name)
         with open(outfile, "w+", encoding="utf-8") as f:
             f.write(rendered)
-    else:
-        print(rendered)
+        return outfile
+    print(rendered)
+    return None
+
+
+def render_template(
+    context: dict,
+    tpl: Path,
+    outdir: Path | None = None,
+    file_name: str | None = None,
+    format_output: bool = False,
+    verible_fmt_bin: str | None = None,
+    verible_fmt_args: str | None = None,
+) -> Path | None:
+    """Render a template, format if requested and write to file or print to stdout.
+
+    Returns the path of the written file, or `None` if the output was printed.
+    """
+    render_kwargs: RenderKwargs = {
+        "outdir": outdir,
+        "format_output": format_output,
+        "verible_fmt_bin": verible_fmt_bin,
+        "verible_fmt_args": verible_fmt_args,
+    }
+    return render_templates(context, [RenderTask(tpl, render_kwargs, file_name)])[0]
+
+
+def _render_task(context: dict, task: RenderTask) -> str | None:
+    """Render the template of a task, formatting is done for the whole batch.
+
+    Outputs to a directory are streamed into their file and `None` is returned, outputs
+    to stdout are returned as a string.
+    """
+    context = {**context, **(task.context or {})}
+    if outdir := task.render_kwargs.get("outdir"):
+        render_to_file(context, task.tpl, output_path(task.tpl, outdir, task.file_name))
+        return None
+    return render(context, task.tpl)
+
+
+# The shared context of a render worker process, see `render_templates`.
+_worker_context: dict = {}
+
+
+def _init_render_worker(context: dict):
+    """Receive the shared context once per worker, rather than once per task."""
+    _worker_context.update(context)
+
+
+def _render_in_worker(task: RenderTask) -> str | None:
+    """Render a task in a worker process."""
+    return _render_task(_worker_context, task)
+
+
+def render_templates(
+    context: dict, tasks: list[RenderTask], jobs: int = 1, verbose: bool = False
+) -> list[Path | None]:
+    """Render a batch of templates, using up to `jobs` worker processes.
+
+    Rendering is independent between templates, so it is distributed over a process pool
+    if more than one job is requested. Outputs to a directory are streamed straight into
+    their files. The outputs are then formatted together, with one formatter invocation
+    per job rather than one per output. Outputs to stdout are printed by the calling
+    process in the order of `tasks`, so that the result does not depend on `jobs`.
+
+    Returns the paths of the written files, or `None` for outputs printed to stdout.
+    """
+    tasks = [task._replace(tpl=find_template(task.tpl)) for task in tasks]
+    with stage("render"):
+        if jobs > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(tasks)),
+                initializer=_init_render_worker,
+                initargs=(context,),
+            ) as pool:
+                rendered = list(pool.map(_render_in_worker, tasks))
+        else:
+            rendered = [_render_task(context, task) for task in tasks]
+    outfiles = [
+        output_path(task.tpl, outdir, task.file_name)
+        if (outdir := task.render_kwargs.get("outdir"))
+        else None
+        for task in tasks
+    ]
+
+    # Group the outputs to format by formatter options, usually there is only one group.
+    to_format: dict[tuple[str | None, str | None], list[int]] = {}
+    for i, task in enumerate(tasks):
+        if task.render_kwargs.get("format_output", False):
+            fmt_opts = (
+                task.render_kwargs.get("verible_fmt_bin"),
+                task.render_kwargs.get("verible_fmt_args"),
+            )
+            to_format.setdefault(fmt_opts, []).append(i)
+    for (verible_fmt_bin, verible_fmt_args), indices in to_format.items():
+        formatter = VeribleFormatter(verible_fmt_bin, verible_fmt_args)
+        printed = [i for i in indices if outfiles[i] is None]
+        with stage("format"):
+            formatter.format_files([f for i in indices if (f := outfiles[i]) is not None], jobs)
+            sources = [rendered[i] or "" for i in printed]
+            formatted = formatter.format(sources, jobs)
+        for i, output in zip(printed, formatted, strict=True):
+            rendered[i] = output
+        if verbose and formatter.num_formatted:
+            print(
+                f"Formatted {formatter.num_formatted} file(s) in {formatter.elapsed:.2f}s",
+                file=sys.stderr,
+            )
+
+    for output in rendered:
+        if output is not None:
+            print(output)
+    return outfiles
+
+
+def add_rdl_args(parser: argparse.ArgumentParser):
+    """Add the options of the SystemRDL generation."""
+    grp = parser.add_argument_group("SystemRDL options")
+    grp.add_argument(
+        "--as-mem",
+        dest="as_mem",
+        action="store_true",
+        default=False,
+        help="Add memory blocks for address regions without 'rdl_name' declared.",
+    )
+    grp.add_argument(
+        "--memwidth",
+        dest="memwidth",
+        type=int,
+        default=8,
+        help="Use the memory width of the RDL address region as the width of the memory block.",
+    )
+
+
+def add_traffic_args(parser: argparse.ArgumentParser, required: bool = True):
+    """Add the options of the traffic generation."""
+    p_traffic_src = parser.add_mutually_exclusive_group(required=required)
+    p_traffic_src.add_argument(
+        "--traffic-cfg",
+        dest="traffic_cfg",
+        type=Path,
+        help="Path to the traffic configuration file.",
+    )
+    p_traffic_src.add_argument(
+        "--traffic-type",
+        dest="traffic_type",
+        type=str,
+        choices=MESH_TRAFFIC_TYPES,
+        help="Generate a built-in traffic pattern, not requiring any dedicated traffic configuration file. "
+        "Available types: " + ", ".join(MESH_TRAFFIC_TYPES) + ".",
+    )
+    parser.add_argument(
+        "--traffic-name",
+        dest="traffic_name",
+        type=str,
+        default=None,
+        help="Base name of the emitted job files. Defaults to the traffic configuration filename. ",
+    )
+    p_traffic_builtin = parser.add_argument_group(
+        "built-in pattern options",
+        description="Only used with --traffic-type.",
+    )
+    p_traffic_builtin.add_argument(
+        "--traffic-rw",
+        dest="traffic_rw",
+        type=str,
+        default="write",
+        choices=["read", "write"],
+        help="Read or write transaction. Defaults to 'write'.",
+    )
+    p_traffic_builtin.add_argument(
+        "--num-narrow-bursts",
+        dest="num_narrow_bursts",
+        type=int,
+        default=10,
+        help="Number of narrow bursts per node. Defaults to 10.",
+    )
+    p_traffic_builtin.add_argument(
+        "--num-wide-bursts",
+        dest="num_wide_bursts",
+        type=int,
+        default=100,
+        help="Number of wide bursts per node. Defaults to 100.",
+    )
+    p_traffic_builtin.add_argument(
+        "--narrow-burst-length",
+        dest="narrow_burst_length",
+        type=int,
+        default=1,
+        help="Narrow burst length, in beats. Defaults to 1.",
+    )
+    p_traffic_builtin.add_argument(
+        "--wide-burst-length",
+        dest="wide_burst_length",
+        type=int,
+        default=16,
+        help="Wide burst length, in beats. Defaults to 16.",
+    )
+
+
+def add_traffic_matrix_args(parser: argparse.ArgumentParser, type_help: str):
+    """Add the options selecting the traffic that `analyze` and `sim` route."""
+    p_traffic_src = parser.add_mutually_exclusive_group()
+    p_traffic_src.add_argument(
+        "--traffic-cfg",
+        dest="traffic_cfg",
+        type=Path,
+        help="Path to the traffic configuration file.",
+    )
+    p_traffic_src.add_argument(
+        "--traffic-type",
+        dest="traffic_type",
+        type=str,
+        choices=MESH_TRAFFIC_TYPES,
+        help=type_help,
+    )
+    parser.add_argument(
+        "--traffic-rw",
+        dest="traffic_rw",
+        type=str,
+        default="write",
+        choices=["read", "write"],
+        help="Read or write transactions of the built-in patterns. Defaults to 'write'.",
+    )
+
+
+def add_sim_args(parser: argparse.ArgumentParser):
+    """Add the injection rates and the options of the flit-level simulation."""
+    parser.add_argument(
+        "--rate",
+        dest="rates",
+        type=float,
+        nargs="+",
+        default=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
+        help="Injection rates of the busiest initiator, in flits per cycle. "
+        "Defaults to 0.1 to 1.0 in steps of 0.1.",
+    )
+    p_sim = parser.add_argument_group("simulation options")
+    p_sim.add_argument(
+        "--cycles",
+        type=int,
+        default=10000,
+        help="Number of measured cycles. Defaults to 10000.",
+    )
+    p_sim.add_argument(
+        "--warmup",
+        type=int,
+        default=1000,
+        help="Number of cycles simulated before the measurement. Defaults to 1000.",
+    )
+    p_sim.add_argument(
+        "--fifo-depth",
+        dest="fifo_depth",
+        type=int,
+        default=2,
+        help="Depth of the input FIFOs of the routers, in flits. Defaults to 2.",
+    )
+    p_sim.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the random packet generation. Defaults to 0.",
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -97,12 +413,37 @@ def build_parser() -> argparse.ArgumentParser:
             "May be given multiple times."
         ),
     )
+    common.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="Elaborate the network from scratch instead of reusing a cached result.",
+    )
+    common.add_argument(
+        "--validate",
+        action="store_true",
+        help=(
+            "Validate every model built during elaboration in full, to debug the elaboration. "
+            "Slower, and implies --no-cache."
+        ),
+    )
     common.add_argument(
         "-v",
         "--verbose",
         action="store_true",
         help="Print detailed information about what the tool is doing.",
     )
+    common.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        default=None,
+        help=(
+            "Report the time and peak memory of every generation stage, and the number of "
+            "calls to hot functions, on stderr. Printed as a table (default) or as JSON."
+        ),
+    )
 
     # Parser for SystemVerilog formatting options. Argument groups are inherited by title,
     # so every command built on this parent shows the same section in its help message.
@@ -134,6 +475,20 @@ def build_parser() -> argparse.ArgumentParser:
         help="Override the module/package name and prefix for generated files.",
     )
 
+    # Parser for commands that render several independent outputs
+    parallel = argparse.ArgumentParser(add_help=False)
+    parallel.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Render and format independent outputs in N parallel processes. "
+            "0 uses all available CPUs. Defaults to 1."
+        ),
+    )
+
     # Top-level parser
     parser = argparse.ArgumentParser(
         description="FlooGen: A Network-on-Chip Generator for FlooNoC",
@@ -150,7 +505,7 @@ def build_parser() -> argparse.ArgumentParser:
     # floogen rtl -> pkg + top
     subparsers.add_parser(
         "rtl",
-        parents=[common, sv_format],
+        parents=[common, sv_format, parallel],
         add_help=True,
         help="Generate both the NoC package and top-module.",
     )
@@ -174,29 +529,16 @@ def build_parser() -> argparse.ArgumentParser:
     # floogen rdl
     p_rdl = subparsers.add_parser(
         "rdl",
-        parents=[common],
+        parents=[common, parallel],
         add_help=True,
         help="Generate the SystemRDL of all endpoint address regions.",
     )
-    p_rdl.add_argument(
-        "--as-mem",
-        dest="as_mem",
-        action="store_true",
-        default=False,
-        help="Add memory blocks for address regions without 'rdl_name' declared.",
-    )
-    p_rdl.add_argument(
-        "--memwidth",
-        dest="memwidth",
-        type=int,
-        default=8,
-        help="Use the memory width of the RDL address region as the width of the memory block.",
-    )
+    add_rdl_args(p_rdl)
 
     # floogen templates <template1> <template2> ...
     p_templates = subparsers.add_parser(
         "template",
-        parents=[common, sv_format],
+        parents=[common, sv_format, parallel],
         add_help=True,
         help="Render custom (external) templates.",
     )
@@ -223,69 +565,209 @@ def build_parser() -> argparse.ArgumentParser:
         add_help=True,
         help="Generate DMA job files from a traffic configuration file.",
     )
-    p_traffic_src = p_traffic.add_mutually_exclusive_group(required=True)
-    p_traffic_src.add_argument(
-        "--traffic-cfg",
-        dest="traffic_cfg",
-        type=Path,
-        help="Path to the traffic configuration file.",
+    add_traffic_args(p_traffic)
+
+    # floogen analyze
+    p_analyze = subparsers.add_parser(
+        "analyze",
+        parents=[common],
+        add_help=True,
+        help="Estimate the link loads and saturation rate under traffic patterns.",
+        description=(
+            "Route a traffic configuration or a built-in pattern through the network and "
+            "report the load of the busiest links, the injection rate at which they saturate "
+            "and the rate the bisection bandwidth allows. Without any traffic selected, all "
+            "built-in patterns are compared."
+        ),
     )
-    p_traffic_src.add_argument(
+    add_traffic_matrix_args(p_analyze, "Analyze a single built-in traffic pattern.")
+    p_analyze.add_argument(
+        "--top",
+        dest="num_bottlenecks",
+        type=int,
+        default=5,
+        help="Number of bottleneck links to report for a single pattern. Defaults to 5.",
+    )
+
+    # floogen sim
+    p_sim = subparsers.add_parser(
+        "sim",
+        parents=[common],
+        add_help=True,
+        help="Simulate the latency and throughput of a traffic pattern, flit by flit.",
+        description=(
+            "Move the data of a traffic configuration or a built-in pattern through the "
+            "network flit by flit, and report the packet latency and the accepted throughput "
+            "at every injection rate. Defaults to the 'uniform' pattern."
+        ),
+    )
+    add_traffic_matrix_args(p_sim, "Simulate a built-in traffic pattern.")
+    p_sim.add_argument(
+        "--burst-length",
+        dest="burst_length",
+        type=int,
+        default=16,
+        help="Burst length, in beats, i.e. the flits of a packet. Defaults to 16.",
+    )
+    add_sim_args(p_sim)
+
+    # floogen sweep
+    p_sweep = subparsers.add_parser(
+        "sweep",
+        parents=[common],
+        add_help=True,
+        help="Sweep the injection rate to find the latency curve and saturation point.",
+        description=(
+            "Evaluate the latency and throughput of every combination of built-in traffic "
+            "pattern, burst length and injection rate, with an analytical queueing estimate "
+            "or the flit-level simulation of 'sim'. The points are written as CSV or JSON, "
+            "together with the rate at which every pattern saturates the network. Evaluated "
+            "points are cached, unless --no-cache is given."
+        ),
+    )
+    p_sweep.add_argument(
         "--traffic-type",
-        dest="traffic_type",
+        dest="traffic_types",
         type=str,
+        nargs="+",
         choices=MESH_TRAFFIC_TYPES,
-        help="Generate a built-in traffic pattern, not requiring any dedicated traffic configuration file. "
-        "Available types: " + ", ".join(MESH_TRAFFIC_TYPES) + ".",
-    )
-    p_traffic.add_argument(
-        "--traffic-name",
-        dest="traffic_name",
-        type=str,
-        default=None,
-        help="Base name of the emitted job files. Defaults to the traffic configuration filename. ",
-    )
-    p_traffic_builtin = p_traffic.add_argument_group(
-        "built-in pattern options",
-        description="Only used with --traffic-type.",
+        default=MESH_TRAFFIC_TYPES,
+        metavar="TRAFFIC_TYPE",
+        help="Built-in traffic patterns to sweep. Defaults to all of them.",
     )
-    p_traffic_builtin.add_argument(
+    p_sweep.add_argument(
         "--traffic-rw",
         dest="traffic_rw",
         type=str,
         default="write",
         choices=["read", "write"],
-        help="Read or write transaction. Defaults to 'write'.",
+        help="Read or write transactions. Defaults to 'write'.",
     )
-    p_traffic_builtin.add_argument(
-        "--num-narrow-bursts",
-        dest="num_narrow_bursts",
+    p_sweep.add_argument(
+        "--burst-length",
+        dest="burst_lengths",
         type=int,
-        default=10,
-        help="Number of narrow bursts per node. Defaults to 10.",
+        nargs="+",
+        default=[16],
+        help="Burst lengths to sweep, in beats. Defaults to 16.",
     )
-    p_traffic_builtin.add_argument(
-        "--num-wide-bursts",
-        dest="num_wide_bursts",
-        type=int,
-        default=100,
-        help="Number of wide bursts per node. Defaults to 100.",
+    p_sweep.add_argument(
+        "--method",
+        type=str,
+        choices=["queueing", "sim"],
+        default="queueing",
+        help="Evaluate the points with an analytical queueing estimate over the link loads "
+        "or with the flit-level simulation. Defaults to 'queueing'.",
     )
-    p_traffic_builtin.add_argument(
-        "--narrow-burst-length",
-        dest="narrow_burst_length",
+    p_sweep.add_argument(
+        "--format",
+        type=str,
+        choices=["csv", "json"],
+        default="csv",
+        help="Output format. Defaults to 'csv'.",
+    )
+    p_sweep.add_argument(
+        "-j",
+        "--jobs",
         type=int,
         default=1,
-        help="Narrow burst length, in beats. Defaults to 1.",
+        metavar="N",
+        help="Evaluate the points in N parallel processes. 0 uses all available CPUs. "
+        "Defaults to 1.",
     )
-    p_traffic_builtin.add_argument(
-        "--wide-burst-length",
-        dest="wide_burst_length",
-        type=int,
-        default=16,
-        help="Wide burst length, in beats. Defaults to 16.",
+    add_sim_args(p_sweep)
+
+    # floogen route
+    p_route = subparsers.add_parser(
+        "route",
+        parents=[common],
+        add_help=True,
+        help="Trace the route between two endpoints, or count the hops between all of them.",
+        description=(
+            "Replay the configured routing algorithm to list the routers and ports a packet "
+            "from SRC to DST traverses. With --all, the number of routers on the route from "
+            "every manager to every subordinate is written as a matrix instead."
+        ),
+    )
+    p_route.add_argument(
+        "src", nargs="?", help="Source endpoint or network interface, e.g. 'cluster_0_0'."
+    )
+    p_route.add_argument(
+        "dst", nargs="?", help="Destination endpoint or network interface, e.g. 'hbm_1'."
+    )
+    p_route.add_argument(
+        "--response",
+        action="store_true",
+        help="Trace the route of a response, which differs with the mirrored algorithms.",
+    )
+    p_route.add_argument(
+        "--all",
+        dest="all_pairs",
+        action="store_true",
+        help="Write the hop counts between all managers and subordinates.",
+    )
+    p_route.add_argument(
+        "--format",
+        type=str,
+        choices=["csv", "json"],
+        default="csv",
+        help="Output format of --all. Defaults to 'csv'.",
     )
 
+    # floogen stats
+    p_stats = subparsers.add_parser(
+        "stats",
+        parents=[common],
+        add_help=True,
+        help="Report the hop counts and path diversity of the topology.",
+        description=(
+            "Compute the average and maximum number of routers on the shortest paths between "
+            "all endpoints that exchange requests or responses, and how many distinct shortest "
+            "paths they have, independently of the routing algorithm."
+        ),
+    )
+    p_stats.add_argument(
+        "--format",
+        type=str,
+        choices=["text", "json"],
+        default="text",
+        help="Output format, 'json' e.g. to compare topologies in CI. Defaults to 'text'.",
+    )
+
+    # floogen all
+    p_all = subparsers.add_parser(
+        "all",
+        parents=[common, sv_format, parallel],
+        add_help=True,
+        help="Generate several outputs from a single elaboration of the network.",
+        description=(
+            "Elaborate the network once and generate any combination of outputs into the "
+            "output directory. Without any output selected, the package, the top-module and "
+            "the SystemRDL are generated. The paths of all written files are printed to stdout."
+        ),
+    )
+    p_all_outputs = p_all.add_argument_group("Outputs")
+    p_all_outputs.add_argument("--pkg", action="store_true", help="Generate the NoC package.")
+    p_all_outputs.add_argument("--top", action="store_true", help="Generate the NoC top-module.")
+    p_all_outputs.add_argument(
+        "--rdl", action="store_true", help="Generate the SystemRDL of all address regions."
+    )
+    p_all_outputs.add_argument(
+        "--schema",
+        action="store_true",
+        help=f"Write the JSON schema of the configuration file to '{SCHEMA_FILE_NAME}'.",
+    )
+    p_all_outputs.add_argument(
+        "--template",
+        dest="templates",
+        type=Path,
+        action="append",
+        default=[],
+        help="Render a custom (external) template. May be given multiple times.",
+    )
+    add_rdl_args(p_all)
+    add_traffic_args(p_all, required=False)
+
     # floogen query <key>
     p_query = subparsers.add_parser(
         "query",
@@ -337,24 +819,353 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def write_schema(outdir: Path | None) -> Path | None:
+    """Write the JSON schema of the configuration file, or print it to stdout."""
+    from floogen.model.network import config_json_schema
+
+    with stage("schema"):
+        schema = json.dumps(config_json_schema(), indent=2) + "\n"
+    if outdir:
+        outdir.mkdir(parents=True, exist_ok=True)
+        schema_file = outdir / SCHEMA_FILE_NAME
+        schema_file.write_text(schema, encoding="utf-8")
+        return schema_file
+    print(schema, end="")
+    return None
+
+
+def pkg_task(context: dict, render_kwargs: RenderKwargs) -> RenderTask:
+    """Return the task rendering the NoC package."""
+    return RenderTask(
+        tpl_dir / "floo_noc_pkg.sv.mako",
+        render_kwargs,
+        file_name=f"floo_{context['name']}_noc_pkg.sv",
+    )
+
+
+def top_task(context: dict, render_kwargs: RenderKwargs) -> RenderTask:
+    """Return the task rendering the NoC top-module."""
+    return RenderTask(
+        tpl_dir / "floo_noc.sv.mako",
+        render_kwargs,
+        file_name=f"floo_{context['name']}_noc.sv",
+    )
+
+
+def rdl_tasks(
+    network: "Network", args: argparse.Namespace, outdir: Path | None
+) -> list[RenderTask]:
+    """Return the tasks rendering the SystemRDL address map, one file per SAM group."""
+    sam = network.routing_info.sam
+    groups = sam.distinct_groups() or [None]
+    tasks = []
+    for group in groups:
+        suffix = f"_{group}" if group else ""
+        rdl_context = {
+            "rdl_as_mem": args.as_mem,
+            "rdl_memwidth": args.memwidth,
+            "sam": sam.filter_by_group(group) if group else sam,
+            "suffix": suffix,
+        }
+        tasks.append(
+            RenderTask(
+                tpl_dir / "floo_addrmap.rdl.mako",
+                {"outdir": outdir},
+                file_name=f"{network.name}_addrmap{suffix}.rdl",
+                context=rdl_context,
+            )
+        )
+    return tasks
+
+
+def report_minimized_tables(network: "Network"):
+    """Print the number of rules of every router table before and after encoding it."""
+    total_before = total_after = 0
+    for rt in network.graph.get_rt_nodes():
+        if rt.table is None:
+            continue
+        before, after = rt.table.num_unminimized_rules, len(rt.table)
+        total_before += before
+        total_after += after
+        print(f"{rt.name}: {before} -> {after} rules", file=sys.stderr)
+    if total_before:
+        change = total_after / total_before - 1
+        print(
+            f"Encoded router tables: {total_before} -> {total_after} rules ({change:+.0%})",
+            file=sys.stderr,
+        )
+
+
+def report_id_order(network: "Network"):
+    """Print the router table rules of every endpoint ID order that `id_order: auto` tried."""
+    num_rules = network.routing_info.id_order_rules
+    print(
+        "Router table rules per endpoint ID order: "
+        + ", ".join(f"{order} {rules}" for order, rules in num_rules.items()),
+        file=sys.stderr,
+    )
+    before = next(iter(num_rules.values()))
+    best = min(num_rules, key=num_rules.__getitem__)
+    change = num_rules[best] / before - 1 if before else 0
+    print(
+        f"Endpoint IDs in {best} order: {before} -> {num_rules[best]} rules ({change:+.0%})",
+        file=sys.stderr,
+    )
+
+
+def gen_traffic(network: "Network", args: argparse.Namespace, outdir: Path) -> list[Path]:
+    """Generate the DMA job files of a traffic configuration or a built-in pattern."""
+    from floogen.model.traffic import gen_traffic_builtin, gen_traffic_cfg
+
+    default_traffic_name = args.traffic_cfg.stem if args.traffic_cfg else "mesh"
+    traffic_name = args.traffic_name or default_traffic_name
+    with stage("traffic"):
+        if args.traffic_cfg:
+            return gen_traffic_cfg(
+                args.traffic_cfg, network, traffic_name, outdir, verbose=args.verbose
+            )
+        return gen_traffic_builtin(
+            args.traffic_type,
+            network,
+            traffic_name,
+            outdir,
+            args.num_narrow_bursts,
+            args.narrow_burst_length,
+            args.num_wide_bursts,
+            args.wide_burst_length,
+            args.traffic_rw,
+            verbose=args.verbose,
+        )
+
+
+def traffic_matrices(
+    network: "Network", args: argparse.Namespace, traffic_types: list[str]
+) -> dict[str, Callable[[], "TrafficMatrix"]]:
+    """Return a builder for the traffic matrix of the traffic configuration, or of every pattern.
+
+    A pattern selected with `--traffic-type` replaces the default `traffic_types`. The
+    matrices are only built when called, so that a caller comparing several patterns can
+    report one that fails to build on its own. A network the traffic cannot be mapped onto
+    is rejected right away.
+    """
+    from floogen.model.link_load import check_mesh, pattern_matrix, traffic_cfg_matrix
+    from floogen.model.traffic import parse_traffic_cfg
+
+    check_mesh(network)
+    if args.traffic_cfg:
+        traffic = parse_traffic_cfg(args.traffic_cfg)
+        return {args.traffic_cfg.stem: functools.partial(traffic_cfg_matrix, network, traffic)}
+    if args.traffic_type:
+        traffic_types = [args.traffic_type]
+    return {
+        traffic_type: functools.partial(pattern_matrix, network, traffic_type, args.traffic_rw)
+        for traffic_type in traffic_types
+    }
+
+
+def analyze_traffic(network: "Network", args: argparse.Namespace) -> Path | None:
+    """Print or write the link loads of a traffic configuration, or of the built-in patterns.
+
+    Returns the path of the written report, if any.
+    """
+    from floogen.model.link_load import FlowRouter, LoadReport, analyze, print_reports
+
+    with stage("analyze"):
+        router = FlowRouter(network)
+        matrices = traffic_matrices(network, args, MESH_TRAFFIC_TYPES)
+        reports = []
+        for name, build_matrix in matrices.items():
+            try:
+                reports.append(analyze(network, build_matrix(), name, router))
+            except ValueError as e:
+                # When comparing the built-in patterns, one that cannot be built or routed
+                # is a result
+                if len(matrices) == 1:
+                    raise
+                reports.append(LoadReport(name=name, loads={}, error=str(e)))
+    if args.outdir is None:
+        print_reports(reports, args.num_bottlenecks)
+        return None
+    outfile = args.outdir / f"{network.name}_loads.txt"
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    with open(outfile, "w", encoding="utf-8") as f:
+        print_reports(reports, args.num_bottlenecks, file=f)
+    return outfile
+
+
+def simulate_traffic(network: "Network", args: argparse.Namespace) -> Path | None:
+    """Print or write the latency and throughput of a traffic pattern at every injection rate.
+
+    Returns the path of the written results, if any.
+    """
+    from floogen.model.flit_sim import FlitSimulator, print_results
+
+    with stage("sim"):
+        [(name, build_matrix)] = traffic_matrices(network, args, ["uniform"]).items()
+        simulator = FlitSimulator(network, build_matrix(), args.fifo_depth)
+        results = [
+            simulator.run(rate, args.burst_length, args.cycles, args.warmup, args.seed)
+            for rate in args.rates
+        ]
+    if args.outdir is None:
+        print(f"Traffic: {name}")
+        print_results(results)
+        return None
+    outfile = args.outdir / f"{network.name}_sim.txt"
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    with open(outfile, "w", encoding="utf-8") as f:
+        print(f"Traffic: {name}", file=f)
+        print_results(results, file=f)
+    return outfile
+
+
+def sweep_traffic(network: "Network", args: argparse.Namespace, jobs: int) -> Path | None:
+    """Sweep the injection rate and write the curves to stdout, or to the output directory.
+
+    Returns the path of the written file, if any.
+    """
+    from floogen.model.link_load import check_mesh
+    from floogen.sweep import SweepTask, run_sweep, write_csv, write_json
+
+    check_mesh(network)
+    tasks = [
+        SweepTask(
+            traffic_type=traffic_type,
+            traffic_rw=args.traffic_rw,
+            burst_length=burst_length,
+            injection_rate=rate,
+            method=args.method,
+            cycles=args.cycles,
+            warmup=args.warmup,
+            fifo_depth=args.fifo_depth,
+            seed=args.seed,
+        )
+        for traffic_type in dict.fromkeys(args.traffic_types)
+        for burst_length in dict.fromkeys(args.burst_lengths)
+        for rate in sorted(set(args.rates))
+    ]
+    with stage("sweep"):
+        curves = run_sweep(network, tasks, jobs, use_cache=not args.no_cache)
+    for curve in curves:
+        if curve.error is not None:
+            print(
+                f"floogen: skipping traffic '{curve.traffic_type}': {curve.error}", file=sys.stderr
+            )
+    write = write_json if args.format == "json" else write_csv
+    if args.outdir is None:
+        write(curves)
+        return None
+    outfile = args.outdir / f"{network.name}_sweep.{args.format}"
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    with open(outfile, "w", encoding="utf-8") as f:
+        write(curves, f)
+    return outfile
+
+
+def trace_route(network: "Network", args: argparse.Namespace) -> Path | None:
+    """Print the route between two endpoints, or write the hop counts of all of them.
+
+    Returns the path of the written hop matrix, if any.
+    """
+    if args.all_pairs:
+        from floogen.model.route_trace import hop_matrix
+
+        with stage("route"):
+            matrix = hop_matrix(network)
+        write = matrix.write_json if args.format == "json" else matrix.write_csv
+        if args.outdir is None:
+            write()
+            return None
+        outfile = args.outdir / f"{network.name}_hops.{args.format}"
+        outfile.parent.mkdir(parents=True, exist_ok=True)
+        with open(outfile, "w", encoding="utf-8") as f:
+            write(f)
+        return outfile
+
+    if args.src is None or args.dst is None:
+        raise ValueError("the 'route' command requires a source and a destination, or --all")
+    with stage("route"):
+        hops = network.trace_route(args.src, args.dst, args.response)
+    width = max(len(hop.node) for hop in hops)
+    print(f"{hops[0].node} -> {hops[-1].node}: {len(hops) - 2} hop(s)")
+    for hop in hops:
+        ports = f"  in {hop.in_port} -> out {hop.out_port}" if hop.in_port is not None else ""
+        print(f"  {hop.node:<{width}}{ports}".rstrip())
+    return None
+
+
+def topology_report(network: "Network", args: argparse.Namespace) -> Path | None:
+    """Print or write the hop-count and path-diversity statistics of the topology.
+
+    Returns the path of the written report, if any.
+    """
+    from floogen.model.topology_stats import topology_stats
+
+    with stage("stats"):
+        stats = topology_stats(network)
+    write = stats.write_json if args.format == "json" else stats.write_text
+    if args.outdir is None:
+        write()
+        return None
+    outfile = args.outdir / f"{network.name}_stats.{'json' if args.format == 'json' else 'txt'}"
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    with open(outfile, "w", encoding="utf-8") as f:
+        write(f)
+    return outfile
+
+
+def gen_all(
+    context: dict,
+    network: "Network",
+    args: argparse.Namespace,
+    render_kwargs: RenderKwargs,
+    jobs: int = 1,
+) -> list[Path | None]:
+    """Generate all outputs selected for the `all` command."""
+    outdir = args.outdir
+    with_traffic = args.traffic_cfg is not None or args.traffic_type is not None
+    if not (args.pkg or args.top or args.rdl or args.schema or args.templates or with_traffic):
+        args.pkg = args.top = args.rdl = True
+
+    tasks = []
+    if args.pkg:
+        tasks.append(pkg_task(context, render_kwargs))
+    if args.top:
+        tasks.append(top_task(context, render_kwargs))
+    if args.rdl:
+        tasks.extend(rdl_tasks(network, args, outdir))
+    tasks.extend(RenderTask(tpl, render_kwargs) for tpl in args.templates)
+    written = render_templates(context, tasks, jobs, args.verbose)
+    if with_traffic:
+        written.extend(gen_traffic(network, args, outdir / "jobs"))
+    if args.schema:
+        written.append(write_schema(outdir))
+    return written
+
+
 def main():
     """Generates the network."""
 
     parser = build_parser()
     args = parser.parse_args()
 
+    if getattr(args, "profile", None) is None:
+        return run(parser, args)
+    with Profiler() as profiler:
+        ret = run(parser, args)
+    profiler.report(args.profile)
+    return ret
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Run the command selected by the parsed arguments."""
     if args.command is None:
         parser.print_help()
         return 0
 
     # Handled before the config is read, since it does not need one.
     if args.command == "schema":
-        schema = json.dumps(config_json_schema(), indent=2) + "\n"
-        if args.outdir:
-            args.outdir.mkdir(parents=True, exist_ok=True)
-            (args.outdir / SCHEMA_FILE_NAME).write_text(schema, encoding="utf-8")
-        else:
-            print(schema, end="")
+        write_schema(args.outdir)
         return 0
 
     if args.command == "help":
@@ -364,12 +1175,22 @@ def main():
             args.subparsers[args.help_command].print_help()
         return 0
 
+    # The manifest of written files goes to stdout, so the outputs themselves cannot.
+    if args.command == "all" and args.outdir is None:
+        print("floogen: the 'all' command requires an output directory (-o)", file=sys.stderr)
+        return 1
+
     try:
         param_overrides = parse_overrides(args.params)
     except ParamError as e:
         print(f"floogen: {e}", file=sys.stderr)
         return 1
 
+    from floogen.cache import elaborate
+    from floogen.config_parser import ConfigError, parse_config
+    from floogen.model.network import Network
+    from floogen.model.routing import TableEncoding
+
     try:
         network = parse_config(Network, args.config, param_overrides)
     except ConfigError as e:
@@ -378,105 +1199,84 @@ def main():
         print(f"floogen: {e}", file=sys.stderr)
         return 1
 
-    network.create_network()
-    network.compile_network()
-    network.gen_routing_info()
+    if args.validate:
+        # Read by `full_validation()`, and inherited by the worker processes
+        os.environ["FLOOGEN_VALIDATE"] = "1"
+    network = elaborate(network, param_overrides, use_cache=not (args.no_cache or args.validate))
+    if args.verbose and network.routing_info.id_order_rules:
+        report_id_order(network)
+    if args.verbose and network.routing.table_encoding is not TableEncoding.RANGES:
+        report_minimized_tables(network)
 
     # The general context to pass to all templates
     context = {"noc": network}
 
     # Additional render arguments
     render_kwargs: RenderKwargs = {"outdir": args.outdir}
+    # Number of worker processes for rendering, `0` uses all CPUs
+    jobs = getattr(args, "jobs", 1) or os.cpu_count() or 1
 
     # Command specific render arguments
     match args.command:
-        case "rtl" | "pkg" | "top" | "template":
+        case "rtl" | "pkg" | "top" | "template" | "all":
             render_kwargs["format_output"] = not args.no_format
             render_kwargs["verible_fmt_bin"] = args.verible_fmt_bin
             render_kwargs["verible_fmt_args"] = args.verible_fmt_args
             context["name"] = args.name or network.name
-            pkg_file_name = f"floo_{args.name or network.name}_noc_pkg.sv"
-            top_file_name = f"floo_{args.name or network.name}_noc.sv"
-        case "traffic":
-            traffic_outdir = args.outdir or Path("jobs")
-            default_traffic_name = args.traffic_cfg.stem if args.traffic_cfg else "mesh"
-            traffic_name = args.traffic_name or default_traffic_name
 
     match args.command:
         case "rtl":
-            render_template(
-                context,
-                tpl=tpl_dir / "floo_noc_pkg.sv.mako",
-                file_name=pkg_file_name,
-                **render_kwargs,
-            )
-            render_template(
-                context,
-                tpl=tpl_dir / "floo_noc.sv.mako",
-                file_name=top_file_name,
-                **render_kwargs,
-            )
+            tasks = [pkg_task(context, render_kwargs), top_task(context, render_kwargs)]
+            render_templates(context, tasks, jobs, args.verbose)
         case "pkg":
-            render_template(
-                context,
-                tpl=tpl_dir / "floo_noc_pkg.sv.mako",
-                file_name=pkg_file_name,
-                **render_kwargs,
-            )
+            render_templates(context, [pkg_task(context, render_kwargs)], verbose=args.verbose)
         case "top":
-            render_template(
-                context,
-                tpl=tpl_dir / "floo_noc.sv.mako",
-                file_name=top_file_name,
-                **render_kwargs,
-            )
+            render_templates(context, [top_task(context, render_kwargs)], verbose=args.verbose)
         case "rdl":
-            context["rdl_as_mem"] = args.as_mem
-            context["rdl_memwidth"] = args.memwidth
-            sam = network.routing_info.sam
-            groups = sam.distinct_groups() or [None]
-            for group in groups:
-                suffix = f"_{group}" if group else ""
-                context["sam"] = sam.filter_by_group(group) if group else sam
-                context["suffix"] = suffix
-                render_template(
-                    context,
-                    tpl=tpl_dir / "floo_addrmap.rdl.mako",
-                    file_name=f"{network.name}_addrmap{suffix}.rdl",
-                    **render_kwargs,
-                )
+            render_templates(context, rdl_tasks(network, args, args.outdir), jobs, args.verbose)
         case "template":
-            for tpl in args.template:
-                render_template(
-                    context,
-                    tpl=tpl,
-                    **render_kwargs,
-                )
+            tasks = [RenderTask(tpl, render_kwargs) for tpl in args.template]
+            render_templates(context, tasks, jobs, args.verbose)
+        case "all":
+            for path in gen_all(context, network, args, render_kwargs, jobs):
+                print(path)
         case "visualize":
             if args.outdir:
                 network.visualize(filename=args.outdir / (network.name + ".pdf"))
             else:
                 network.visualize(savefig=False)
         case "query":
+            from floogen.query import handle_query
+
             handle_query(network, args.query)
         case "traffic":
-            if args.traffic_cfg:
-                gen_traffic_cfg(
-                    args.traffic_cfg, network, traffic_name, traffic_outdir, verbose=args.verbose
-                )
-            else:
-                gen_traffic_builtin(
-                    args.traffic_type,
-                    network,
-                    traffic_name,
-                    traffic_outdir,
-                    args.num_narrow_bursts,
-                    args.narrow_burst_length,
-                    args.num_wide_bursts,
-                    args.wide_burst_length,
-                    args.traffic_rw,
-                    verbose=args.verbose,
-                )
+            gen_traffic(network, args, args.outdir or Path("jobs"))
+        case "route":
+            try:
+                if (outfile := trace_route(network, args)) is not None:
+                    print(outfile)
+            except ValueError as e:
+                print(f"floogen: {e}", file=sys.stderr)
+                return 1
+        case "stats":
+            if (outfile := topology_report(network, args)) is not None:
+                print(outfile)
+        case "sweep":
+            try:
+                if (outfile := sweep_traffic(network, args, jobs)) is not None:
+                    print(outfile)
+            except ValueError as e:
+                print(f"floogen: {e}", file=sys.stderr)
+                return 1
+        case "analyze" | "sim":
+            try:
+                traffic_report = analyze_traffic if args.command == "analyze" else simulate_traffic
+                if (outfile := traffic_report(network, args)) is not None:
+                    print(outfile)
+            except ValueError as e:
+                print(f"floogen: {e}", file=sys.stderr)
+                return 1
+    return 0
 
 
 if __name__ == "__main__":
@@ -15,6 +15,7 @@ from ruamel.yaml import YAMLError
 from ruamel.yaml.comments import CommentedMap
 
 from floogen.params import ParamError, resolve_params
+from floogen.profiler import stage
 
 logger = logging.getLogger(__name__)
 
@@ -84,7 +85,7 @@ def parse_config(
         ConfigError: If the file is not valid YAML, has unresolvable parameters, or does
             not validate against `cls`.
     """
-    with config_file.open() as file:
+    with config_file.open() as file, stage("load_yaml"):
         try:
             config_data = ruamel.yaml.YAML(typ="rt").load(file)
         except YAMLError as e:
@@ -92,14 +93,16 @@ def parse_config(
             raise ConfigError(f"Could not parse '{config_file}' as YAML") from e
 
     try:
-        resolve_params(config_data, param_overrides)
+        with stage("resolve_params"):
+            resolve_params(config_data, param_overrides)
     except ParamError as e:
         logger.error("Error while resolving the parameters of '%s':", config_file)
         logger.error("Error: %s", e)
         raise ConfigError(f"Could not resolve the parameters of '{config_file}'") from e
 
     try:
-        return cls.model_validate(config_data)
+        with stage("validate"):
+            return cls.model_validate(config_data)
     except ValidationError as e:
         logger.error(
             "Encountered %s validation errors while parsing the configuration file:",
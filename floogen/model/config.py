@@ -11,12 +11,16 @@ below carry the "the config file may also spell this as ..." coercions that woul
 otherwise be written out as a `field_validator` on every individual field.
 """
 
+import inspect
+import os
 from enum import Enum
 from typing import Annotated, Any, TypeVar
 
 from pydantic import BaseModel, BeforeValidator, ConfigDict
+from pydantic.json_schema import JsonDict
 
 T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
 
 
 class ConfigModel(BaseModel):
@@ -36,6 +40,37 @@ class ConfigModel(BaseModel):
     model_config = ConfigDict(extra="forbid", use_attribute_docstrings=True)
 
 
+def dataclass_config(doc: str | None) -> ConfigDict:
+    """Return the `__pydantic_config__` of a dataclass that is read like a `ConfigModel`.
+
+    Unlike for models, pydantic does not describe a plain dataclass by its docstring in
+    the JSON schema, so it is passed in explicitly.
+    """
+    extra: JsonDict | None = {"description": inspect.cleandoc(doc)} if doc else None
+    return ConfigDict(**ConfigModel.model_config, json_schema_extra=extra)
+
+
+def full_validation() -> bool:
+    """Whether models built during elaboration are validated in full.
+
+    Off by default, set `FLOOGEN_VALIDATE=1` (or pass `floogen --validate`) to debug the
+    elaboration itself.
+    """
+    return os.environ.get("FLOOGEN_VALIDATE", "") not in ("", "0")
+
+
+def construct(cls: type[M], **fields: Any) -> M:
+    """Build an elaborated model from values that were already validated.
+
+    The fields are taken as they are with `model_construct`, which skips revalidating
+    e.g. the protocols and links that every network interface refers to. Unless
+    `full_validation()` is enabled, in which case this is a plain `model_validate`.
+    """
+    if full_validation():
+        return cls.model_validate(fields)
+    return cls.model_construct(**fields)
+
+
 class ConfigEnum(Enum):
     """Enum whose members can also be selected by *name* in a configuration file.
 
@@ -0,0 +1,276 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Cycle-approximate, flit-level simulation of an elaborated network.
+
+The simulator moves the data of a traffic matrix - the same flows `floogen analyze`
+routes - through the network flit by flit, to estimate the latency and the accepted
+throughput at a given injection rate in seconds instead of the hours an RTL simulation
+takes.
+
+The model follows the routers FlooGen generates, but leaves out everything that does
+not limit the data:
+
+- Every link is a channel that carries one flit per cycle into an input FIFO of the
+  node it leads to, `InFifoDepth` flits deep. A flit is only sent if the FIFO had a free
+  slot at the beginning of the cycle, so a hop takes one cycle.
+- The routers switch packets in wormhole fashion. The head flit of a packet is routed
+  with the configured routing algorithm, like in `FlowRouter`, and allocates its output
+  port, which is granted round-robin among the inputs, until the tail flit has left.
+- A packet is a burst, with one flit per beat of data. Writes are sent from the
+  initiator to the target along the request path, reads from the target back to the
+  initiator along the response path. The requests of reads and the write responses carry
+  no data and are not simulated, nor are the network interfaces beyond their injection
+  queue.
+- Every data source generates packets in a Bernoulli process, so that the busiest
+  initiator of the traffic matrix offers the injection rate in flits per cycle.
+
+All state is kept in flat lists indexed by channel, router and packet, so a cycle only
+touches the routers that hold flits.
+"""
+
+import bisect
+import itertools
+import math
+import random
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, TextIO
+
+from floogen.model.link_load import FlowRouter, TrafficMatrix
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+FIFO_DEPTH = 2
+"""The depth of the input FIFOs of the generated routers, their `InFifoDepth`."""
+
+
+@dataclass
+class SimResult:
+    """The outcome of simulating a traffic matrix at one injection rate."""
+
+    injection_rate: float
+    """The flits per cycle the busiest initiator offers."""
+    offered: float
+    """The flits per cycle offered to the whole network during the measurement."""
+    accepted: float
+    """The flits per cycle delivered by the whole network during the measurement."""
+    latencies: list[int] = field(default_factory=list)
+    """The cycles from the creation of every measured packet to the arrival of its tail."""
+    undelivered: int = 0
+    """The measured packets that did not arrive before the simulation ended."""
+
+    @property
+    def avg_latency(self) -> float:
+        """The average latency of the delivered packets, in cycles."""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else math.nan
+
+    def percentile(self, pct: float) -> float:
+        """Return the latency that `pct` percent of the delivered packets do not exceed."""
+        if not self.latencies:
+            return math.nan
+        latencies = sorted(self.latencies)
+        return latencies[max(math.ceil(pct / 100 * len(latencies)) - 1, 0)]
+
+    @property
+    def saturated(self) -> bool:
+        """Whether the network did not keep up with the offered traffic."""
+        return self.undelivered > 0 or self.accepted < 0.95 * self.offered
+
+
+class FlitSimulator:
+    """Simulates a traffic matrix on an elaborated network at different injection rates.
+
+    The routes of all flows are computed once, so that several rates can be simulated
+    on the same instance.
+    """
+
+    def __init__(
+        self,
+        network: "Network",
+        matrix: TrafficMatrix,
+        fifo_depth: int = FIFO_DEPTH,
+        router: FlowRouter | None = None,
+    ):
+        router = router or FlowRouter(network)
+        self.fifo_depth = fifo_depth
+        # The channels, numbered as the routes need them
+        self.channels: list[tuple[str, str]] = []
+        channel_ids: dict[tuple[str, str], int] = {}
+        # The data sources, each with its flows and their cumulative rates
+        self.sources: list[str] = []
+        self.flow_routes: list[list[list[int]]] = []
+        self.flow_rates: list[list[float]] = []
+        source_ids: dict[str, int] = {}
+        for (initiator, target, rw), rate in matrix.items():
+            response = rw == "read"
+            src, dst = (target, initiator) if response else (initiator, target)
+            route = []
+            for link in itertools.pairwise(router.path(src, dst, response)):
+                if link not in channel_ids:
+                    channel_ids[link] = len(self.channels)
+                    self.channels.append(link)
+                route.append(channel_ids[link])
+            if src not in source_ids:
+                source_ids[src] = len(self.sources)
+                self.sources.append(src)
+                self.flow_routes.append([])
+                self.flow_rates.append([])
+            s = source_ids[src]
+            self.flow_routes[s].append(route)
+            rates = self.flow_rates[s]
+            rates.append((rates[-1] if rates else 0.0) + rate)
+
+        # The routers, each with the channels leading into it
+        self.routers: list[str] = []
+        self.router_inputs: list[list[int]] = []
+        router_ids: dict[str, int] = {}
+        self.channel_router = [-1] * len(self.channels)
+        for c, (_, v) in enumerate(self.channels):
+            if v not in router.routers:
+                continue
+            if v not in router_ids:
+                router_ids[v] = len(self.routers)
+                self.routers.append(v)
+                self.router_inputs.append([])
+            self.channel_router[c] = router_ids[v]
+            self.router_inputs[router_ids[v]].append(c)
+
+    def run(
+        self,
+        injection_rate: float,
+        burst_length: int = 16,
+        cycles: int = 10000,
+        warmup: int = 1000,
+        seed: int = 0,
+    ) -> SimResult:
+        """Simulate `cycles` cycles at the injection rate, after `warmup` cycles.
+
+        The packets created during the measurement are drained for up to another
+        `cycles` cycles, so that their latency is accounted for as well.
+        """
+        rng = random.Random(seed)
+        depth = self.fifo_depth
+        num_channels = len(self.channels)
+        channel_router = self.channel_router
+        router_inputs = self.router_inputs
+        # The FIFO at the end of every channel holds `(packet, hop, flit)` entries
+        fifos: list[deque] = [deque() for _ in range(num_channels)]
+        # The input that holds an output, from its head to its tail flit, or -1
+        owner = [-1] * num_channels
+        # The input an output was last granted to, for round-robin arbitration
+        last_grant = [-1] * num_channels
+        router_flits = [0] * len(self.routers)
+        # The packets: their route, creation cycle and whether they are measured
+        pkt_route: list[list[int]] = []
+        pkt_created: list[int] = []
+        pkt_measured: list[bool] = []
+        # The packets waiting at every source, and the next flit of the first one
+        queues: list[deque] = [deque() for _ in self.sources]
+        next_flit = [0] * len(self.sources)
+        # The packets every source creates per cycle
+        pkt_rates = [rates[-1] * injection_rate / burst_length for rates in self.flow_rates]
+
+        start, end = warmup, warmup + cycles
+        result = SimResult(injection_rate=injection_rate, offered=0.0, accepted=0.0)
+        offered = accepted = pending = 0
+        cycle = 0
+        while cycle < end or (pending and cycle < end + cycles):
+            measured = start <= cycle < end
+            # Create new packets
+            if cycle < end:
+                for s, pkt_rate in enumerate(pkt_rates):
+                    num_pkts = int(pkt_rate) + (rng.random() < pkt_rate % 1)
+                    rates = self.flow_rates[s]
+                    for _ in range(num_pkts):
+                        flow = bisect.bisect_right(rates, rng.random() * rates[-1])
+                        queues[s].append(len(pkt_route))
+                        pkt_route.append(self.flow_routes[s][min(flow, len(rates) - 1)])
+                        pkt_created.append(cycle)
+                        pkt_measured.append(measured)
+                    if measured:
+                        offered += num_pkts * burst_length
+                        pending += num_pkts
+
+            # Allocate the outputs of the routers and switch one flit per output
+            moves = []
+            for r, inputs in enumerate(router_inputs):
+                if not router_flits[r]:
+                    continue
+                requests: dict[int, list[int]] = {}
+                for c in inputs:
+                    if not (fifo := fifos[c]):
+                        continue
+                    pkt, hop, flit = fifo[0]
+                    out = pkt_route[pkt][hop + 1]
+                    if owner[out] == c or (owner[out] < 0 and flit == 0):
+                        requests.setdefault(out, []).append(c)
+                for out, candidates in requests.items():
+                    if channel_router[out] >= 0 and len(fifos[out]) >= depth:
+                        continue
+                    if len(candidates) == 1:
+                        c = candidates[0]
+                    else:
+                        last = last_grant[out]
+                        c = min(candidates, key=lambda c, last=last: (c <= last, c))
+                    last_grant[out] = c
+                    moves.append((c, out))
+
+            # Inject the next flit of every source into its first channel
+            for s, queue in enumerate(queues):
+                if not queue:
+                    continue
+                pkt = queue[0]
+                c = pkt_route[pkt][0]
+                if len(fifos[c]) >= depth:
+                    continue
+                fifos[c].append((pkt, 0, next_flit[s]))
+                router_flits[channel_router[c]] += 1
+                next_flit[s] += 1
+                if next_flit[s] == burst_length:
+                    queue.popleft()
+                    next_flit[s] = 0
+
+            for c, out in moves:
+                pkt, hop, flit = fifos[c].popleft()
+                router_flits[channel_router[c]] -= 1
+                tail = flit == burst_length - 1
+                owner[out] = -1 if tail else c
+                if (r := channel_router[out]) >= 0:
+                    fifos[out].append((pkt, hop + 1, flit))
+                    router_flits[r] += 1
+                    continue
+                # The flit arrives at its destination
+                if measured:
+                    accepted += 1
+                if tail and pkt_measured[pkt]:
+                    result.latencies.append(cycle - pkt_created[pkt])
+                    pending -= 1
+            cycle += 1
+
+        result.offered = offered / cycles
+        result.accepted = accepted / cycles
+        result.undelivered = pending
+        return result
+
+
+def print_results(results: list[SimResult], file: TextIO | None = None):
+    """Print the throughput and the latency distribution at every injection rate."""
+    file = file or sys.stdout
+    print(
+        f"{'Rate':>6}  {'Offered':>8}  {'Accepted':>8}  {'Avg lat':>8}  "
+        f"{'p50':>6}  {'p90':>6}  {'p99':>6}  {'Max':>6}",
+        file=file,
+    )
+    for result in results:
+        latencies = "  ".join(f"{result.percentile(pct):>6.0f}" for pct in (50, 90, 99, 100))
+        print(
+            f"{result.injection_rate:>6.3f}  {result.offered:>8.3f}  {result.accepted:>8.3f}  "
+            f"{result.avg_latency:>8.1f}  {latencies}" + ("  (saturated)" * result.saturated),
+            file=file,
+        )
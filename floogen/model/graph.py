@@ -4,37 +4,196 @@
 #
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
+from array import array
 
 import networkx as nx
 
 from floogen.model.routing import XYDirections
 
+NODE_TYPES = ("router", "endpoint", "network_interface")
+EDGE_TYPES = ("link", "protocol")
+
+
+class CompactGraph:
+    """Integer-indexed snapshot of the topology of a `Graph`.
+
+    Nodes are numbered in insertion order and the adjacency is stored in compressed
+    sparse row (CSR) form, i.e. the successors of node `i` are
+    `succ_idx[succ_ptr[i]:succ_ptr[i + 1]]`, in the order in which the edges were
+    added. Predecessors are stored the same way, sorted by node index. Node and edge
+    types as well as array indices and levels are kept in per-node columns.
+
+    Only the structure is captured, node and edge objects are still looked up in the
+    `Graph` as they are set during compilation.
+    """
+
+    def __init__(self, graph: "Graph"):
+        self.names: tuple[str, ...] = tuple(graph.nodes)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.node_type = array("b", (NODE_TYPES.index(t) for _, t in graph.nodes(data="type")))
+        self.arr_idx = [arr_idx for _, arr_idx in graph.nodes(data="arr_idx")]
+        self.lvl = array("i", (-1 if lvl is None else lvl for _, lvl in graph.nodes(data="lvl")))
+
+        self.succ_ptr = array("l", [0])
+        self.succ_idx = array("l")
+        self.edge_type = array("b")
+        preds: list[list[int]] = [[] for _ in self.names]
+        for u, succ in enumerate(graph.succ.values()):
+            for v, attr in succ.items():
+                self.succ_idx.append(self.index[v])
+                self.edge_type.append(EDGE_TYPES.index(attr["type"]))
+                preds[self.index[v]].append(u)
+            self.succ_ptr.append(len(self.succ_idx))
+        self.pred_ptr = array("l", [0])
+        self.pred_idx = array("l")
+        for pred in preds:
+            self.pred_idx.extend(pred)
+            self.pred_ptr.append(len(self.pred_idx))
+
+    def successors(self, node: int) -> array:
+        """Return the indices of the successors of a node."""
+        return self.succ_idx[self.succ_ptr[node] : self.succ_ptr[node + 1]]
+
+    def predecessors(self, node: int) -> array:
+        """Return the indices of the predecessors of a node."""
+        return self.pred_idx[self.pred_ptr[node] : self.pred_ptr[node + 1]]
+
+    def edges_from(self, node: str) -> list[tuple[str, str]]:
+        """Return the outgoing edges of a node."""
+        return [(node, self.names[v]) for v in self.successors(self.index[node])]
+
+    def edges_to(self, node: str) -> list[tuple[str, str]]:
+        """Return the incoming edges of a node."""
+        return [(self.names[u], node) for u in self.predecessors(self.index[node])]
+
+    def edges_of(self, node: str) -> list[tuple[str, str]]:
+        """Return the incoming and outgoing edges of a node, in the graph's edge order."""
+        idx = self.index[node]
+        edges = []
+        for u in sorted({idx, *self.predecessors(idx)}):
+            if u == idx:
+                edges.extend(self.edges_from(node))
+            else:
+                edges.append((self.names[u], node))
+        return edges
+
 
 class Graph(nx.DiGraph):
-    """Network graph class."""
+    """Network graph class.
+
+    The graph keeps an index of its nodes and edges per type, which is maintained as
+    nodes and edges are added, so typed queries like `get_ni_nodes()` do not have to
+    filter the whole graph. Their results are cached until a node or edge of that type
+    is added or gets a new object. Endpoints are additionally numbered in creation
+    order, which provides their unique ids.
+
+    Once the topology is complete, the graph can be frozen into a `CompactGraph`, which
+    then serves the adjacency queries. Any structural change thaws the graph.
+    """
 
     def __init__(self):
         """Initialize the graph."""
         super().__init__()
         self._node_idx = 0
+        self._compact: CompactGraph | None = None
+        self._typed_nodes: dict[str, list[str]] = {}
+        self._typed_edges: dict[str, dict[str, list[str]]] = {}
+        self._typed_cache: dict[tuple[str, str, bool, bool], list] = {}
+        self._ep_ordinal: dict[str, int] = {}
+
+    def freeze(self) -> CompactGraph:
+        """Freeze the topology of the graph and return its compact representation."""
+        if self._compact is None:
+            self._compact = CompactGraph(self)
+        return self._compact
+
+    def thaw(self):
+        """Drop the compact representation, e.g. because the structure changes."""
+        self._compact = None
+
+    def _invalidate(self, kind: str, elem_type: str):
+        """Drop the cached query results for the nodes or edges of a type."""
+        for with_obj in (False, True):
+            for with_name in (False, True):
+                self._typed_cache.pop((kind, elem_type, with_obj, with_name), None)
+
+    def _reindex(self):
+        """Rebuild the typed indexes from scratch, e.g. after nodes were removed."""
+        self.thaw()
+        self._typed_nodes = {}
+        self._typed_edges = {}
+        self._typed_cache = {}
+        for node, node_type in self.nodes(data="type"):
+            self._typed_nodes.setdefault(node_type, []).append(node)
+        self._ep_ordinal = {ep: i for i, ep in enumerate(self._typed_nodes.get("endpoint", []))}
+        for u, v, edge_type in self.edges(data="type"):
+            self._typed_edges.setdefault(edge_type, {}).setdefault(u, []).append(v)
 
     def add_node(self, node_for_adding: str, **attr):
         """Add a node to the graph."""
+        self.thaw()
         if self.has_node(node_for_adding):
             raise ValueError(f"Node {node_for_adding} already exists in the graph.")
         assert "type" in attr, "Node type not provided"
         if "obj" not in attr:
             attr["obj"] = None
         super().add_node(node_for_adding, **attr)
+        self._typed_nodes.setdefault(attr["type"], []).append(node_for_adding)
+        self._invalidate("node", attr["type"])
+        if attr["type"] == "endpoint":
+            self._ep_ordinal[node_for_adding] = len(self._ep_ordinal)
 
     def add_edge(self, u_of_edge: str, v_of_edge: str, **attr):
         """Add an edge to the graph."""
+        self.thaw()
         if self.has_edge(u_of_edge, v_of_edge):
             raise ValueError(f"Edge ({u_of_edge}, {v_of_edge}) already exists in the graph.")
         assert "type" in attr, "Edge type not provided"
         if "obj" not in attr:
             attr["obj"] = None
         super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._typed_edges.setdefault(attr["type"], {}).setdefault(u_of_edge, []).append(v_of_edge)
+        self._invalidate("edge", attr["type"])
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        """Add multiple nodes to the graph."""
+        super().add_nodes_from(nodes_for_adding, **attr)
+        self._reindex()
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        """Add multiple edges to the graph."""
+        super().add_edges_from(ebunch_to_add, **attr)
+        self._reindex()
+
+    def remove_node(self, n):
+        """Remove a node from the graph."""
+        super().remove_node(n)
+        self._reindex()
+
+    def remove_nodes_from(self, nodes):
+        """Remove multiple nodes from the graph."""
+        super().remove_nodes_from(nodes)
+        self._reindex()
+
+    def remove_edge(self, u, v):
+        """Remove an edge from the graph."""
+        super().remove_edge(u, v)
+        self._reindex()
+
+    def remove_edges_from(self, ebunch):
+        """Remove multiple edges from the graph."""
+        super().remove_edges_from(ebunch)
+        self._reindex()
+
+    def clear(self):
+        """Remove all nodes and edges from the graph."""
+        super().clear()
+        self._reindex()
+
+    def clear_edges(self):
+        """Remove all edges from the graph."""
+        super().clear_edges()
+        self._reindex()
 
     def add_edge_bidir(self, u_of_edge: str, v_of_edge: str, **attr):
         """Add a bidirectional edge to the graph."""
@@ -48,6 +207,7 @@ class Graph(nx.DiGraph):
     def set_node_obj(self, node, obj):
         """Set the node object."""
         self.nodes[node]["obj"] = obj
+        self._invalidate("node", self.nodes[node]["type"])
 
     def get_node_arr_idx(self, node):
         """Return the node array index."""
@@ -68,6 +228,7 @@ class Graph(nx.DiGraph):
     def set_edge_obj(self, edge, obj):
         """Set the edge object."""
         self.edges[edge]["obj"] = obj
+        self._invalidate("edge", self.edges[edge]["type"])
 
     def is_rt_node(self, node):
         """Return whether the node is a router node."""
@@ -103,7 +264,10 @@ class Graph(nx.DiGraph):
 
     def get_edges(self, filters=None, with_obj=True, with_name=False):
         """Filter the edges from the graph."""
-        edges = self.edges
+        return self._get_edges_among(self.edges, filters, with_obj=with_obj, with_name=with_name)
+
+    def _get_edges_among(self, edges, filters=None, with_obj=True, with_name=False):
+        """Filter the given edges."""
         if filters is not None:
             for flt in filters:
                 edges = list(filter(flt, edges))
@@ -113,8 +277,49 @@ class Graph(nx.DiGraph):
             return [self.get_edge_obj(edge) for edge in edges]
         return edges
 
+    def _get_typed_nodes(self, node_type, with_obj=True, with_name=False):
+        """Return the nodes of a type from the index."""
+        if nx.is_frozen(self):
+            # Views, e.g. subgraphs, share the storage but not the index of their graph
+            return self.get_nodes(
+                filters=[lambda n: self.nodes[n]["type"] == node_type],
+                with_obj=with_obj,
+                with_name=with_name,
+            )
+        key = ("node", node_type, with_obj, with_name)
+        if key not in self._typed_cache:
+            nodes = self._typed_nodes.get(node_type, [])
+            if with_obj and with_name:
+                self._typed_cache[key] = [(node, self.get_node_obj(node)) for node in nodes]
+            elif with_obj:
+                self._typed_cache[key] = [self.get_node_obj(node) for node in nodes]
+            else:
+                self._typed_cache[key] = list(nodes)
+        return list(self._typed_cache[key])
+
+    def _get_typed_edges(self, edge_type, with_obj=True, with_name=False):
+        """Return the edges of a type from the index."""
+        if nx.is_frozen(self):
+            return self.get_edges(
+                filters=[lambda e: self.edges[e]["type"] == edge_type],
+                with_obj=with_obj,
+                with_name=with_name,
+            )
+        key = ("edge", edge_type, with_obj, with_name)
+        if key not in self._typed_cache:
+            # Edges are listed in the same order as `self.edges`, i.e. grouped by source
+            succ = self._typed_edges.get(edge_type, {})
+            edges = [(u, v) for u in self.nodes if u in succ for v in succ[u]]
+            self._typed_cache[key] = self._get_edges_among(
+                edges, with_obj=with_obj, with_name=with_name
+            )
+        return list(self._typed_cache[key])
+
     def get_edges_from(self, node, filters=None, with_obj=True, with_name=False):
         """Return the outgoing edges from the node."""
+        if self._compact is not None:
+            edges = self._compact.edges_from(node)
+            return self._get_edges_among(edges, filters, with_obj=with_obj, with_name=with_name)
         if filters is None:
             filters = []
         filters = [lambda e: e[0] == node] + filters
@@ -122,6 +327,9 @@ class Graph(nx.DiGraph):
 
     def get_edges_to(self, node, filters=None, with_obj=True, with_name=False):
         """Return the incoming edges to the node."""
+        if self._compact is not None:
+            edges = self._compact.edges_to(node)
+            return self._get_edges_among(edges, filters, with_obj=with_obj, with_name=with_name)
         if filters is None:
             filters = []
         filters = [lambda e: e[1] == node] + filters
@@ -129,6 +337,9 @@ class Graph(nx.DiGraph):
 
     def get_edges_of(self, node, filters=None, with_obj=True, with_name=False):
         """Return the edges of the node."""
+        if self._compact is not None:
+            edges = self._compact.edges_of(node)
+            return self._get_edges_among(edges, filters, with_obj=with_obj, with_name=with_name)
         if filters is None:
             filters = []
         filters = [lambda e: node in e] + filters
@@ -136,23 +347,23 @@ class Graph(nx.DiGraph):
 
     def get_ni_nodes(self, with_obj=True, with_name=False):
         """Return the ni nodes."""
-        return self.get_nodes(filters=[self.is_ni_node], with_obj=with_obj, with_name=with_name)
+        return self._get_typed_nodes("network_interface", with_obj=with_obj, with_name=with_name)
 
     def get_rt_nodes(self, with_obj=True, with_name=False):
         """Return the router nodes."""
-        return self.get_nodes(filters=[self.is_rt_node], with_obj=with_obj, with_name=with_name)
+        return self._get_typed_nodes("router", with_obj=with_obj, with_name=with_name)
 
     def get_ep_nodes(self, with_obj=True, with_name=False):
         """Return the endpoint nodes."""
-        return self.get_nodes(filters=[self.is_ep_node], with_obj=with_obj, with_name=with_name)
+        return self._get_typed_nodes("endpoint", with_obj=with_obj, with_name=with_name)
 
     def get_prot_edges(self, with_obj=True, with_name=False):
         """Return the protocol edges."""
-        return self.get_edges(filters=[self.is_prot_edge], with_obj=with_obj, with_name=with_name)
+        return self._get_typed_edges("protocol", with_obj=with_obj, with_name=with_name)
 
     def get_link_edges(self, with_obj=True, with_name=False):
         """Return the link edges."""
-        return self.get_edges(filters=[self.is_link_edge], with_obj=with_obj, with_name=with_name)
+        return self._get_typed_edges("link", with_obj=with_obj, with_name=with_name)
 
     def get_nodes_from_range(self, node: str, rng: list[tuple[int, int]]):
         """Return the nodes from the range."""
@@ -288,9 +499,12 @@ class Graph(nx.DiGraph):
                 raise NotImplementedError(f"Unsupported array {array}")
 
     def create_unique_ep_id(self, node) -> int:
-        """Return the endpoint id."""
-        ep_nodes = [name for name, _ in self.get_ep_nodes(with_name=True)]
-        return ep_nodes.index(node)
+        """Return the endpoint id, i.e. the position of the endpoint in creation order."""
+        if nx.is_frozen(self):
+            return self.get_ep_nodes(with_obj=False).index(node)
+        if node not in self._ep_ordinal:
+            raise ValueError(f"{node} is not an endpoint of the graph")
+        return self._ep_ordinal[node]
 
     def get_node_id(self, node_name=None, node_obj=None):
         """Return the node id."""
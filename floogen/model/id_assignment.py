@@ -0,0 +1,157 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Assignment of the endpoint IDs used by table-based and source-based routing.
+
+A router table maps every destination ID to an output port, and IDs that are adjacent
+and routed to the same port share a rule. How many rules a table needs therefore
+depends on how the IDs are assigned: numbered in declaration order, the endpoints of
+a mesh are scattered over the ID space, while numbered along the topology, endpoints
+that are reached over the same port tend to get contiguous IDs.
+
+`assign_ep_ids()` numbers the endpoints in one of the `IdOrder`s. With `IdOrder.AUTO`,
+every applicable order is evaluated with `count_table_rules()`, which derives the size
+of the trimmed router tables from a single breadth-first search per router, without
+building any table.
+"""
+
+from typing import TYPE_CHECKING
+
+from floogen.model.route_engine import RouteEngine
+from floogen.model.routing import IdOrder
+
+if TYPE_CHECKING:
+    from floogen.model.graph import Graph
+
+
+def _eps_by_router(graph: "Graph") -> dict[str | None, list[str]]:
+    """Group the endpoints by the router their network interface is attached to.
+
+    Endpoints without a router are grouped under `None`.
+    """
+    eps_by_rt: dict[str | None, list[str]] = {}
+    for ep_name, ep in graph.get_ep_nodes(with_name=True):
+        ni_name = ep.get_ni_name(ep_name)
+        neighbors = (n for n in graph.neighbors(ni_name) if graph.is_rt_node(n))
+        eps_by_rt.setdefault(next(neighbors, None), []).append(ep_name)
+    return eps_by_rt
+
+
+def _order_by_routers(graph: "Graph", routers: list[str]) -> list[str]:
+    """Order the endpoints by their router in `routers`, those without a router last."""
+    eps_by_rt = _eps_by_router(graph)
+    ordered = [ep for rt in routers for ep in eps_by_rt.pop(rt, [])]
+    return ordered + [ep for eps in eps_by_rt.values() for ep in eps]
+
+
+def dfs_order(graph: "Graph") -> list[str]:
+    """Order the endpoints along a depth-first traversal of the routers.
+
+    The neighbors of a router are visited in the order of its links, and the endpoints
+    of a router keep their declaration order.
+    """
+    routers: list[str] = []
+    visited: set[str] = set()
+    for root in graph.get_rt_nodes(with_obj=False):
+        stack = [root]
+        while stack:
+            rt = stack.pop()
+            if rt in visited:
+                continue
+            visited.add(rt)
+            routers.append(rt)
+            neighbors = [n for n in graph.neighbors(rt) if graph.is_rt_node(n)]
+            stack += reversed([n for n in neighbors if n not in visited])
+    return _order_by_routers(graph, routers)
+
+
+def hilbert_index(x: int, y: int, order: int) -> int:
+    """Return the position of `(x, y)` on the Hilbert curve filling a `2^order` square."""
+    index = 0
+    for s in (1 << i for i in reversed(range(order))):
+        rx, ry = int(x & s > 0), int(y & s > 0)
+        index += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant, so that the curve continues where the last one ended
+        if ry == 0:
+            if rx == 1:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+    return index
+
+
+def hilbert_order(graph: "Graph") -> list[str] | None:
+    """Order the endpoints along a Hilbert curve over the array indices of the routers.
+
+    Returns `None` if not all routers are part of a two-dimensional array.
+    """
+    routers = graph.get_rt_nodes(with_obj=False)
+    coords = {rt: graph.nodes[rt].get("arr_idx") for rt in routers}
+    if not routers or any(idx is None or len(idx) != 2 for idx in coords.values()):
+        return None
+    order = max(max(x, y) for x, y in coords.values()).bit_length()
+    rank = {rt: hilbert_index(*coords[rt], order) for rt in routers}
+    return _order_by_routers(graph, sorted(routers, key=rank.__getitem__))
+
+
+def count_table_rules(graph: "Graph", candidates: dict[IdOrder, list[str]]) -> dict[IdOrder, int]:
+    """Return the total number of trimmed router table rules for every candidate order.
+
+    Only subordinate endpoints have a route, and a rule covers consecutive IDs that are
+    routed to the same next hop, which is what `RouteMap.trim()` produces.
+    """
+    engine = RouteEngine(graph)
+    sbr_nis = {
+        ep_name: ep.get_ni_name(ep_name)
+        for ep_name, ep in graph.get_ep_nodes(with_name=True)
+        if ep.is_sbr()
+    }
+    # The subordinates of every candidate, sorted by ID, each with the ID it follows on
+    sequences = {}
+    for order, ordered in candidates.items():
+        ids = {ep: i for i, ep in enumerate(ordered)}
+        sbr_eps = sorted(sbr_nis, key=ids.__getitem__)
+        sequences[order] = [(sbr_nis[ep], ids[ep]) for ep in sbr_eps]
+
+    num_rules = dict.fromkeys(candidates, 0)
+    for rt in graph.get_rt_nodes(with_obj=False):
+        next_hops = engine.next_hops(rt)
+        for order, sequence in sequences.items():
+            prev_hop, prev_id = None, -2
+            for ni_name, ep_id in sequence:
+                hop = next_hops.get(ni_name)
+                if hop != prev_hop or ep_id != prev_id + 1:
+                    num_rules[order] += 1
+                prev_hop, prev_id = hop, ep_id
+    return num_rules
+
+
+def assign_ep_ids(graph: "Graph", order: IdOrder) -> tuple[dict[str, int], dict[IdOrder, int]]:
+    """Return the ID of every endpoint, numbered in the given `order`.
+
+    With `IdOrder.AUTO`, the order with the fewest trimmed router table rules is used,
+    preferring the declaration order on a tie. The number of rules of every evaluated
+    order is returned alongside, and is empty for any other order.
+    """
+    ordered: list[str] | None
+    match order:
+        case IdOrder.INSERTION:
+            ordered = graph.get_ep_nodes(with_obj=False)
+        case IdOrder.DFS:
+            ordered = dfs_order(graph)
+        case IdOrder.HILBERT:
+            if (ordered := hilbert_order(graph)) is None:
+                raise ValueError("`id_order: hilbert` requires a two-dimensional array of routers")
+        case IdOrder.AUTO:
+            candidates = {
+                IdOrder.INSERTION: graph.get_ep_nodes(with_obj=False),
+                IdOrder.DFS: dfs_order(graph),
+            }
+            if (ordered := hilbert_order(graph)) is not None:
+                candidates[IdOrder.HILBERT] = ordered
+            num_rules = count_table_rules(graph, candidates)
+            best = min(num_rules, key=num_rules.__getitem__)
+            return {ep: i for i, ep in enumerate(candidates[best])}, num_rules
+    return {ep: i for i, ep in enumerate(ordered)}, {}
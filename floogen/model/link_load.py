@@ -0,0 +1,447 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Static estimate of the load of every link under a traffic pattern.
+
+Every flow of a traffic matrix is routed with the algorithm the network is configured
+with - following the XY coordinates, the router tables or the source routes generated
+for it - and its rate is accumulated on every link it crosses. The rates are normalized
+so that the busiest initiator injects one flit per cycle. The load of a link is then the
+number of flits per cycle it has to carry, and the network saturates at the injection
+rate at which the busiest link carries one flit per cycle, i.e. at the inverse of the
+maximum link load.
+
+Only the data is accounted for: the data of a write travels from the initiator to the
+target along the request path, the data of a read from the target back to the initiator
+along the response path. Headers, address and response beats without data are ignored.
+
+The routes towards a destination form a tree for all algorithms but source-based
+routing, so the flows to a destination are accumulated along that tree in a single pass
+over its links, instead of walking every flow separately.
+"""
+
+import itertools
+import math
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple, TextIO
+
+from floogen.model.routing import RouteAlgo, XYDirections
+from floogen.model.traffic import (
+    Traffic,
+    _mesh_dims,
+    _ni_mesh_coord,
+    _protocol_data_widths,
+    pattern_accesses,
+)
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+TrafficMatrix = dict[tuple[str, str, str], float]
+"""The rate of every `(initiator NI, target NI, "read"/"write")` flow."""
+
+Link = tuple[str, str]
+"""A link, given by the names of the nodes it connects."""
+
+
+def check_mesh(network: "Network"):
+    """Raise a `ValueError` unless all routers form a 2D array, which traffic is mapped onto.
+
+    Traffic patterns and configurations address the endpoints by their mesh coordinate,
+    which is derived from the array index of the router they are attached to.
+    """
+    graph = network.graph
+    for rt in graph.get_rt_nodes(with_obj=False):
+        if len(graph.nodes[rt].get("arr_idx") or ()) != 2:
+            raise ValueError(
+                f"Traffic requires a 2D mesh of routers, but router '{rt}' is not part of one"
+            )
+
+
+def _ni_coords(network: "Network") -> dict[tuple[int, int], str]:
+    """Map the mesh coordinate of every network interface to its name."""
+    check_mesh(network)
+    return {_ni_mesh_coord(network, ni): ni for ni in network.graph.get_ni_nodes(with_obj=False)}
+
+
+def _normalize(matrix: TrafficMatrix) -> TrafficMatrix:
+    """Scale the rates so that the busiest initiator injects one flit per cycle."""
+    per_initiator: dict[str, float] = {}
+    for (initiator, _, _), rate in matrix.items():
+        per_initiator[initiator] = per_initiator.get(initiator, 0.0) + rate
+    peak = max(per_initiator.values(), default=0.0)
+    return {flow: rate / peak for flow, rate in matrix.items()} if peak else {}
+
+
+def pattern_matrix(
+    network: "Network", traffic_type: str, traffic_rw: str = "write"
+) -> TrafficMatrix:
+    """Return the traffic matrix of a built-in traffic pattern.
+
+    The `uniform` pattern is spread over all other nodes, where `gen_traffic_builtin`
+    draws a single one at random.
+    """
+    num_x, num_y = _mesh_dims(network)
+    coords = _ni_coords(network)
+    matrix: TrafficMatrix = {}
+    for x in range(num_x):
+        for y in range(num_y):
+            if (initiator := coords.get((x, y))) is None:
+                continue
+            for dest, access_rw, share in pattern_accesses(traffic_type, x, y, num_x, num_y):
+                if (target := coords.get(dest)) is None or target == initiator:
+                    continue
+                flow = (initiator, target, access_rw or traffic_rw)
+                matrix[flow] = matrix.get(flow, 0.0) + float(share)
+    return _normalize(matrix)
+
+
+def traffic_cfg_matrix(network: "Network", traffic: Traffic) -> TrafficMatrix:
+    """Return the traffic matrix of a traffic configuration, weighted by the bytes of every flow."""
+    coords = _ni_coords(network)
+    proto_dw = _protocol_data_widths(network)
+    matrix: TrafficMatrix = {}
+    for stream in traffic.traffic_flows:
+        initiator = coords.get((stream.initiator[0], stream.initiator[1]))
+        target = coords.get((stream.endpoint[0], stream.endpoint[1]))
+        if initiator is None or target is None:
+            raise ValueError(f"Cannot map traffic flow '{stream.name}' to network interfaces")
+        num_bytes = 0
+        for bursts, data_width in (
+            (stream.narrow_burst, proto_dw.get("narrow")),
+            (stream.wide_burst, proto_dw.get("wide")),
+        ):
+            if data_width is not None:
+                num_bytes += sum(b.number * b.length * data_width // 8 for b in bursts)
+        if num_bytes and initiator != target:
+            flow = (initiator, target, stream.rw)
+            matrix[flow] = matrix.get(flow, 0.0) + num_bytes
+    return _normalize(matrix)
+
+
+class RouteHop(NamedTuple):
+    """A node on a route, with the ports a router is entered and left on."""
+
+    node: str
+    in_port: int | None = None
+    out_port: int | None = None
+
+
+class FlowRouter:
+    """Routes flows through an elaborated network with its configured routing algorithm."""
+
+    def __init__(self, network: "Network"):
+        graph = network.graph
+        self.route_algo = network.routing.route_algo
+        self.nis = {ni.name: ni for ni in graph.get_ni_nodes()}
+        self.routers = {rt.name: rt for rt in graph.get_rt_nodes()}
+        self.num_nodes = len(self.nis) + len(self.routers)
+        # A network interface is attached to the network by a single outgoing link
+        self.ni_links = {
+            ni: next(v for v in graph.neighbors(ni) if graph.is_link_edge((ni, v)))
+            for ni in self.nis
+        }
+        self.src_routes: dict[str, dict] = {}
+        if self.route_algo == RouteAlgo.SRC:
+            for name, ni in self.nis.items():
+                self.src_routes[name] = {rule.id: rule.route for rule in ni.table.routes}
+
+    def _dor_port(self, rt_id, dst_id, x_first: bool) -> int:
+        """Return the output port of dimension-ordered routing, as in `floo_route_select`."""
+        if (dst_id.x, dst_id.y) == (rt_id.x, rt_id.y):
+            return XYDirections.EJECT.value + dst_id.port_id
+        x_dir = XYDirections.WEST if dst_id.x < rt_id.x else XYDirections.EAST
+        y_dir = XYDirections.SOUTH if dst_id.y < rt_id.y else XYDirections.NORTH
+        if dst_id.x == rt_id.x:
+            return y_dir.value
+        if dst_id.y == rt_id.y:
+            return x_dir.value
+        return (x_dir if x_first else y_dir).value
+
+    def next_hop(self, node: str, dst: str, response: bool = False) -> str:
+        """Return the node after `node` on the way to the network interface `dst`.
+
+        Responses take the opposite dimension order with the mirrored algorithms. Not
+        available for source-based routing, where the route depends on the source.
+        """
+        if node in self.ni_links:
+            return self.ni_links[node]
+        rt = self.routers[node]
+        dst_id = self.nis[dst].id
+        match self.route_algo:
+            case RouteAlgo.XY | RouteAlgo.YX | RouteAlgo.XY_MIRRORED | RouteAlgo.YX_MIRRORED:
+                x_first = self.route_algo in (RouteAlgo.XY, RouteAlgo.XY_MIRRORED)
+                if response and self.route_algo in (RouteAlgo.XY_MIRRORED, RouteAlgo.YX_MIRRORED):
+                    x_first = not x_first
+                port = self._dor_port(rt.id, dst_id, x_first)
+            case RouteAlgo.ID:
+                if rt.table is None or (rule := rt.table.lookup(dst_id.id)) is None:
+                    raise ValueError(f"{node} has no route to {dst}")
+                port = rule.dest.id
+            case _:
+                raise ValueError(f"Routing algorithm {self.route_algo} has no per-router route")
+        if port >= len(rt.outgoing) or (link := rt.outgoing[port]) is None:
+            raise ValueError(f"{node} routes {dst} to the unconnected port {port}")
+        if link.dest in self.ni_links and link.dest != dst:
+            raise ValueError(f"{node} routes {dst} to {link.dest}")
+        return link.dest
+
+    def path(self, src: str, dst: str, response: bool = False) -> list[str]:
+        """Return the nodes from the network interface `src` to `dst`, both included."""
+        path = [src]
+        if self.route_algo == RouteAlgo.SRC:
+            route = self.src_routes[src].get(self.nis[dst].id)
+            if route is None:
+                raise ValueError(f"{src} has no route to {dst}")
+            path.append(self.ni_links[src])
+            for port, _ in route:
+                path.append(self.routers[path[-1]].outgoing[port].dest)
+        else:
+            while path[-1] != dst:
+                if len(path) > self.num_nodes:
+                    raise ValueError(f"Routing loop from {src} to {dst}")
+                path.append(self.next_hop(path[-1], dst, response))
+        if path[-1] != dst:
+            raise ValueError(f"The route from {src} ends at {path[-1]} instead of {dst}")
+        return path
+
+    def _tree(
+        self, dst: str, sources: list[str], response: bool, strict: bool = True
+    ) -> tuple[dict[str, str], dict[str, int]]:
+        """Return the routes from `sources` to `dst` as a tree.
+
+        The tree is given by the next hop of every node on the routes and the number of
+        links from it to `dst`. If not `strict`, sources that cannot reach `dst` are
+        left out instead of raising a `ValueError`.
+        """
+        succ: dict[str, str] = {}
+        failed: set[str] = set()
+        for src in sources:
+            u, chain = src, []
+            try:
+                while u != dst and u not in succ:
+                    if u in failed:
+                        raise ValueError(f"{src} cannot reach {dst}")
+                    chain.append(u)
+                    succ[u] = self.next_hop(u, dst, response)
+                    u = succ[u]
+            except ValueError:
+                if strict:
+                    raise
+                for node in chain:
+                    succ.pop(node, None)
+                failed.update(chain)
+        # The distance to `dst` orders the links of the tree from the leaves to the root
+        depth = {dst: 0}
+        for node in succ:
+            u = node
+            chain = []
+            while u not in depth:
+                chain.append(u)
+                u = succ[u]
+                if len(chain) > self.num_nodes:
+                    raise ValueError(f"Routing loop towards {dst}")
+            for d, v in enumerate(reversed(chain), start=depth[u] + 1):
+                depth[v] = d
+        return succ, depth
+
+    def _accumulate(
+        self, loads: dict[Link, float], dst: str, rates: dict[str, float], response: bool
+    ):
+        """Add the flows from the sources in `rates` to `dst` to the link loads."""
+        succ, depth = self._tree(dst, list(rates), response)
+        amount = dict(rates)
+        for u in sorted(succ, key=depth.__getitem__, reverse=True):
+            if rate := amount.get(u, 0.0):
+                v = succ[u]
+                loads[(u, v)] = loads.get((u, v), 0.0) + rate
+                amount[v] = amount.get(v, 0.0) + rate
+
+    def hop_counts(self, sources: list[str], dst: str, response: bool = False) -> dict[str, int]:
+        """Return the number of routers on the route from every source to `dst`.
+
+        Sources without a route to `dst` are left out.
+        """
+        if self.route_algo == RouteAlgo.SRC:
+            dst_id = self.nis[dst].id
+            return {
+                src: len(route)
+                for src in sources
+                if (route := self.src_routes[src].get(dst_id)) is not None
+            }
+        _, depth = self._tree(dst, sources, response, strict=False)
+        return {src: depth[src] - 1 for src in sources if src in depth}
+
+    def trace(self, src: str, dst: str, response: bool = False) -> list[RouteHop]:
+        """Return the nodes from `src` to `dst`, with the ports every router is crossed on."""
+        path = self.path(src, dst, response)
+        hops = [RouteHop(path[0])]
+        for i in range(1, len(path) - 1):
+            rt = self.routers[path[i]]
+            in_port = next(
+                port
+                for port, link in enumerate(rt.incoming)
+                if link is not None and link.source == path[i - 1]
+            )
+            out_port = next(
+                port
+                for port, link in enumerate(rt.outgoing)
+                if link is not None and link.dest == path[i + 1]
+            )
+            hops.append(RouteHop(path[i], in_port, out_port))
+        hops.append(RouteHop(path[-1]))
+        return hops
+
+    def link_loads(self, matrix: TrafficMatrix) -> dict[Link, float]:
+        """Return the load of every link that carries any flow of `matrix`."""
+        # The data flows, grouped by destination and by whether they are responses
+        flows: dict[tuple[str, bool], dict[str, float]] = {}
+        for (initiator, target, rw), rate in matrix.items():
+            src, dst, response = (
+                (target, initiator, True) if rw == "read" else (initiator, target, False)
+            )
+            rates = flows.setdefault((dst, response), {})
+            rates[src] = rates.get(src, 0.0) + rate
+
+        loads: dict[Link, float] = {}
+        for (dst, response), rates in flows.items():
+            if self.route_algo == RouteAlgo.SRC:
+                for src, rate in rates.items():
+                    path = self.path(src, dst, response)
+                    for link in itertools.pairwise(path):
+                        loads[link] = loads.get(link, 0.0) + rate
+            else:
+                self._accumulate(loads, dst, rates, response)
+        return loads
+
+
+@dataclass
+class Bisection:
+    """A cut of a 2D array of routers into two halves along one dimension."""
+
+    dim: str
+    """The dimension that is cut, `x` or `y`."""
+    num_links: int
+    """The number of links crossing the cut in each direction."""
+    sides: dict[str, bool]
+    """Whether a network interface lies in the upper half."""
+
+
+def bisections(network: "Network") -> list[Bisection]:
+    """Return the cuts through the middle of both dimensions of the router array.
+
+    Empty if the routers do not form a single 2D array.
+    """
+    graph = network.graph
+    coords = {rt: graph.nodes[rt].get("arr_idx") for rt in graph.get_rt_nodes(with_obj=False)}
+    if not coords or any(idx is None or len(idx) != 2 for idx in coords.values()):
+        return []
+    ni_coords = {_ni_mesh_coord(network, ni): ni for ni in graph.get_ni_nodes(with_obj=False)}
+    cuts = []
+    for dim in (0, 1):
+        size = max(idx[dim] for idx in coords.values()) + 1
+        if size < 2:
+            continue
+        upper = {rt: idx[dim] >= size // 2 for rt, idx in coords.items()}
+        num_links = sum(
+            1
+            for u, v in graph.get_link_edges(with_obj=False, with_name=True)
+            if u in upper and v in upper and upper[u] and not upper[v]
+        )
+        sides = {ni: xy[dim] >= size // 2 for xy, ni in ni_coords.items()}
+        cuts.append(Bisection(dim="xy"[dim], num_links=num_links, sides=sides))
+    return cuts
+
+
+@dataclass
+class LoadReport:
+    """The link loads of a network under a traffic matrix."""
+
+    name: str
+    """The name of the traffic pattern."""
+    loads: dict[Link, float]
+    """The load of every link, in flits per cycle when the busiest initiator injects one."""
+    bisection_rate: float | None = None
+    """The injection rate at which the traffic crossing a bisection saturates its links."""
+    error: str | None = None
+    """Why the traffic could not be built or routed, in which case there are no loads."""
+
+    @property
+    def max_load(self) -> float:
+        """The load of the busiest link."""
+        return max(self.loads.values(), default=0.0)
+
+    @property
+    def saturation_rate(self) -> float:
+        """The injection rate at which the busiest link saturates, in flits per cycle."""
+        return 1 / self.max_load if self.max_load else math.inf
+
+    def bottlenecks(self, num: int = 5) -> list[tuple[Link, float]]:
+        """Return the `num` busiest links with their loads."""
+        return sorted(self.loads.items(), key=lambda item: (-item[1], item[0]))[:num]
+
+
+def analyze(
+    network: "Network", matrix: TrafficMatrix, name: str, router: FlowRouter | None = None
+) -> LoadReport:
+    """Route the traffic matrix through the network and return the link loads."""
+    router = router or FlowRouter(network)
+    loads = router.link_loads(matrix)
+    bisection_rate = None
+    for cut in bisections(network):
+        for upwards in (True, False):
+            crossing = sum(
+                rate
+                for (initiator, target, rw), rate in matrix.items()
+                if (cut.sides[initiator] != cut.sides[target])
+                and (cut.sides[target] if rw == "write" else cut.sides[initiator]) == upwards
+            )
+            if crossing and cut.num_links:
+                rate = cut.num_links / crossing
+                bisection_rate = rate if bisection_rate is None else min(bisection_rate, rate)
+    return LoadReport(name=name, loads=loads, bisection_rate=bisection_rate)
+
+
+def _rate(rate: float | None) -> str:
+    return "-" if rate is None else f"{rate:.3f}"
+
+
+def _link(link: Link) -> str:
+    return f"{link[0]} -> {link[1]}"
+
+
+def print_reports(reports: list[LoadReport], num_bottlenecks: int = 5, file: TextIO | None = None):
+    """Print the bottleneck links of a single report, or a table of several ones."""
+    file = file or sys.stdout
+    if len(reports) == 1:
+        report = reports[0]
+        print(f"Traffic: {report.name}", file=file)
+        if report.error is not None:
+            print(f"Not routable: {report.error}", file=file)
+            return
+        print(f"Max link load: {report.max_load:.3f} flits/cycle", file=file)
+        print(f"Saturation rate: {_rate(report.saturation_rate)} flits/cycle", file=file)
+        print(f"Bisection-limited rate: {_rate(report.bisection_rate)} flits/cycle", file=file)
+        print("Bottleneck links:", file=file)
+        for link, load in report.bottlenecks(num_bottlenecks):
+            print(f"  {_link(link)}: {load:.3f}", file=file)
+        return
+
+    width = max(len("Traffic"), *(len(report.name) for report in reports))
+    header = f"{'Traffic':<{width}}  {'Max load':>8}  {'Saturation':>10}  {'Bisection':>9}"
+    print(f"{header}  Bottleneck link", file=file)
+    for report in reports:
+        if report.error is not None:
+            print(f"{report.name:<{width}}  not analyzed: {report.error}", file=file)
+            continue
+        bottleneck = report.bottlenecks(1)
+        print(
+            f"{report.name:<{width}}  {report.max_load:>8.3f}  "
+            f"{_rate(report.saturation_rate):>10}  {_rate(report.bisection_rate):>9}  "
+            + (_link(bottleneck[0][0]) if bottleneck else "-"),
+            file=file,
+        )
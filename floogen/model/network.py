@@ -5,24 +5,26 @@
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
 import pathlib
+from collections.abc import Iterator
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import networkx as nx
-from pydantic import ConfigDict, Field, field_validator, model_validator
+from pydantic import ConfigDict, Field, PrivateAttr, field_validator, model_validator
 from pydantic.json_schema import SkipJsonSchema
 
-from floogen.model.config import ConfigModel
+from floogen.model.config import ConfigModel, construct
 from floogen.model.connection import ConnectionDesc
 from floogen.model.endpoint import Endpoint, EndpointDesc
-from floogen.model.graph import Graph
+from floogen.model.id_assignment import assign_ep_ids
 from floogen.model.link import AxiLink, NarrowWideLink, NarrowWideVCLink
 from floogen.model.network_interface import AxiNI, NarrowWideAxiNI
 from floogen.model.protocol import AXI4, AXI4Bus
+from floogen.model.route_engine import RouteEngine
 from floogen.model.router import AxiRouter, NarrowWideRouter, RouterDesc
 from floogen.model.routing import (
     AddrRange,
     Coord,
+    IdOrder,
     RouteAlgo,
     RouteMap,
     RouteMapRule,
@@ -32,11 +34,19 @@ from floogen.model.routing import (
     Routing,
     RoutingDesc,
     SimpleId,
+    TableEncoding,
     WideRwDecouple,
     XYDirections,
 )
 from floogen.params import ParamValue
-from floogen.utils import bool_to_sv, clog2, snake_to_camel, sv_enum_typedef, sv_param_decl
+from floogen.utils import (
+    bool_to_sv,
+    clog2,
+    snake_to_camel,
+    sv_enum_typedef,
+    sv_param_decl,
+    sv_param_decl_head,
+)
 
 # The SystemVerilog data type used for an integer parameter, by magnitude. `int` is
 # 32 bits wide, so an address above 4 GiB silently truncates without the wider type.
@@ -59,6 +69,25 @@ class NetworkType(str, Enum):
         return self.value
 
 
+if TYPE_CHECKING:
+    from floogen.model.graph import Graph
+    from floogen.model.link_load import RouteHop
+
+    _GraphField = Graph
+else:
+    # Annotated as `Any` and checked by `validate_graph()` instead, so that the
+    # configuration models - e.g. for `floogen schema` - can be used without importing
+    # networkx.
+    _GraphField = Any
+
+
+def _new_graph() -> "Graph":
+    """Return an empty network graph, importing networkx on first use."""
+    from floogen.model.graph import Graph
+
+    return Graph()
+
+
 class Network(ConfigModel):
     """
     Network class to describe a network with routers and endpoints.
@@ -85,16 +114,21 @@ class Network(ConfigModel):
     `${...}`. They are already resolved to plain values by the time the configuration is
     validated (see `floogen.params`) and are kept here only so that they can be emitted
     as `localparam`s in the generated package."""
-    graph: SkipJsonSchema[Graph] = Field(default_factory=Graph)
+    graph: SkipJsonSchema[_GraphField] = Field(default_factory=_new_graph)
     """Elaboration state rather than configuration: built by `create_network()` and
     omitted from the JSON schema, which describes the configuration file only."""
 
+    _id_order_rules: dict[IdOrder, int] = PrivateAttr(default_factory=dict)
+    """The rules of every order evaluated by `id_order: auto`, passed on to `Routing`."""
+
     def create_network(self):
         """Initialize the network as a graph."""
-        self.graph = Graph()
+        self.graph = _new_graph()
         self.create_routers()
         self.create_endpoints()
         self.create_connections()
+        # The topology is complete, later stages only query it
+        self.graph.freeze()
 
     def compile_network(self):
         """Compile the network."""
@@ -104,6 +138,16 @@ class Network(ConfigModel):
         self.compile_nis()
         self.compile_routers()
 
+    @field_validator("graph")
+    @classmethod
+    def validate_graph(cls, graph):
+        """Check that a given graph is a `Graph`, importing networkx only if one is given."""
+        from floogen.model.graph import Graph
+
+        if not isinstance(graph, Graph):
+            raise ValueError(f"Expected a network graph, got {type(graph).__name__}")  # noqa: TRY004
+        return graph
+
     @field_validator("endpoints")
     @classmethod
     def validate_endpoints(cls, endpoints):
@@ -368,49 +412,49 @@ class Network(ConfigModel):
     def compile_ids(self):
         """Infer the id type from the network."""
         # Add XY coordinates to the nodes
-        match self.routing.route_algo:
-            case _ if self.routing.route_algo.is_dor_algo:
-                # 1st stage: Get all router nodes
-                for node_name, node in self.graph.get_rt_nodes(with_name=True):
-                    x, y = self.graph.get_node_arr_idx(node_name)
-                    node_xy_id = Coord(x=x, y=y)
-                    if node.xy_id_offset is not None:
-                        node_xy_id += node.xy_id_offset
-                    self.graph.nodes[node_name]["id"] = node_xy_id
-                for node_name, node in self.graph.get_ni_nodes(with_name=True):
-                    # Search for a neighbor node *with* an array index
-                    for neighbor in self.graph.neighbors(node_name):
-                        if self.graph.nodes[neighbor].get("id") is not None:
-                            # If it has a directed edge, we can derive the coordinate from there
-                            edge = self.graph.edges[(node_name, neighbor)]
-                            if edge["dst_dir"] is not None:
-                                node_xy_id = self.graph.nodes[neighbor][
-                                    "id"
-                                ] + XYDirections.to_coords(edge["dst_dir"])
-                                break
-                            edge = self.graph.edges[(neighbor, node_name)]
-                            if edge["src_dir"] is not None:
-                                node_xy_id = self.graph.nodes[neighbor][
-                                    "id"
-                                ] + XYDirections.to_coords(edge["src_dir"])
-                                break
-                    assert node_xy_id is not None
-                    if node.xy_id_offset is not None:
-                        node_xy_id += node.xy_id_offset
-                    self.graph.nodes[node_name]["id"] = node_xy_id
-            case RouteAlgo.ID | RouteAlgo.SRC:
-                for ep_name, ep in self.graph.get_ep_nodes(with_name=True):
-                    node_id = SimpleId(id=self.graph.create_unique_ep_id(ep_name))
-                    ni_name = ep.get_ni_name(ep_name)
-                    self.graph.nodes[ep_name]["id"] = node_id
-                    self.graph.nodes[ni_name]["id"] = node_id
-
-        # Add unique IDs (uid's) to the nodes
+        if self.routing.route_algo.is_dor_algo:
+            # 1st stage: Get all router nodes
+            for node_name, node in self.graph.get_rt_nodes(with_name=True):
+                x, y = self.graph.get_node_arr_idx(node_name)
+                node_xy_id = Coord(x=x, y=y)
+                if node.xy_id_offset is not None:
+                    node_xy_id += node.xy_id_offset
+                self.graph.nodes[node_name]["id"] = node_xy_id
+            for node_name, node in self.graph.get_ni_nodes(with_name=True):
+                # Search for a neighbor node *with* an array index
+                for neighbor in self.graph.neighbors(node_name):
+                    if self.graph.nodes[neighbor].get("id") is not None:
+                        # If it has a directed edge, we can derive the coordinate from there
+                        edge = self.graph.edges[(node_name, neighbor)]
+                        if edge["dst_dir"] is not None:
+                            node_xy_id = self.graph.nodes[neighbor]["id"] + XYDirections.to_coords(
+                                edge["dst_dir"]
+                            )
+                            break
+                        edge = self.graph.edges[(neighbor, node_name)]
+                        if edge["src_dir"] is not None:
+                            node_xy_id = self.graph.nodes[neighbor]["id"] + XYDirections.to_coords(
+                                edge["src_dir"]
+                            )
+                            break
+                assert node_xy_id is not None
+                if node.xy_id_offset is not None:
+                    node_xy_id += node.xy_id_offset
+                self.graph.nodes[node_name]["id"] = node_xy_id
+
+        # Add unique IDs (uid's) to the nodes, which are also the IDs for
+        # table-based and source-based routing
+        use_uid_as_id = self.routing.route_algo in (RouteAlgo.ID, RouteAlgo.SRC)
+        ep_order = self.routing.id_order if use_uid_as_id else IdOrder.INSERTION
+        ep_ids, self._id_order_rules = assign_ep_ids(self.graph, ep_order)
         for ep_name, ep in self.graph.get_ep_nodes(with_name=True):
-            node_id = SimpleId(id=self.graph.create_unique_ep_id(ep_name))
+            node_id = SimpleId(id=ep_ids[ep_name])
             ni_name = ep.get_ni_name(ep_name)
             self.graph.nodes[ep_name]["uid"] = node_id
             self.graph.nodes[ni_name]["uid"] = node_id
+            if use_uid_as_id:
+                self.graph.nodes[ep_name]["id"] = node_id
+                self.graph.nodes[ni_name]["id"] = node_id
 
     def compile_links(self):
         """Infer the link type from the network."""
@@ -558,13 +602,14 @@ class Network(ConfigModel):
         """Compile the endpoints in the network."""
 
         for ni_name, ep_desc in self.graph.get_ni_nodes(with_name=True):
+            # IDs and address ranges are immutable, so they are shared instead of copied
             ni_dict = {
                 "name": f"{ni_name}",
                 "endpoint": ep_desc,
                 "routing": self.routing,
-                "addr_range": [rng.model_copy() for rng in ep_desc.addr_range],
-                "id": self.graph.get_node_id(node_name=ni_name).model_copy(),
-                "uid": self.graph.get_node_uid(node_name=ni_name).model_copy(),
+                "addr_range": list(ep_desc.addr_range),
+                "id": self.graph.get_node_id(node_name=ni_name),
+                "uid": self.graph.get_node_uid(node_name=ni_name),
             }
 
             assert ep_desc
@@ -581,7 +626,7 @@ class Network(ConfigModel):
                     ni_dict["arr_idx"] = SimpleId(id=arr_idx[0])
                     if ep_desc.is_sbr():
                         ni_dict["addr_range"] = [
-                            rng.model_copy().set_arr(arr_idx, arr_dim) for rng in ep_desc.addr_range
+                            rng.set_arr(arr_idx, arr_dim) for rng in ep_desc.addr_range
                         ]
 
                 # 2D array case
@@ -591,7 +636,7 @@ class Network(ConfigModel):
                     ni_dict["arr_idx"] = Coord(x=arr_idx[0], y=arr_idx[1])
                     if ep_desc.is_sbr():
                         ni_dict["addr_range"] = [
-                            rng.model_copy().set_arr(arr_idx, arr_dim) for rng in ep_desc.addr_range
+                            rng.set_arr(arr_idx, arr_dim) for rng in ep_desc.addr_range
                         ]
                 # Invalid case
                 case _:
@@ -627,9 +672,9 @@ class Network(ConfigModel):
             )[0]
             match self.network_type:
                 case "axi":
-                    self.graph.set_node_obj(ni_name, AxiNI.model_validate(ni_dict))
+                    self.graph.set_node_obj(ni_name, construct(AxiNI, **ni_dict))
                 case "narrow-wide":
-                    self.graph.set_node_obj(ni_name, NarrowWideAxiNI.model_validate(ni_dict))
+                    self.graph.set_node_obj(ni_name, construct(NarrowWideAxiNI, **ni_dict))
 
     @property
     def routing_info(self) -> Routing:
@@ -668,6 +713,7 @@ class Network(ConfigModel):
         self.routing = Routing.from_desc(
             self.routing,
             **generated,
+            id_order_rules=self._id_order_rules,
             sam=self.gen_sam(generated.get("xy_id_offset")),
         )
 
@@ -687,21 +733,25 @@ class Network(ConfigModel):
 
     def gen_router_tables(self):
         """Generate the routing table for the network."""
+        engine = RouteEngine(self.graph)
+        ni_sbr_nodes = [ni for ni in self.graph.get_ni_nodes() if ni.is_sbr()]
         for rt in self.graph.get_rt_nodes():
             routing_table = []
-            ni_sbr_nodes = [ni for ni in self.graph.get_ni_nodes() if ni.is_sbr()]
+            # A single search from the router yields the next hop towards every NI.
+            next_hops = engine.next_hops(rt.name)
+            out_ports = rt.out_ports()
             for ni in ni_sbr_nodes:
-                shortest_path = nx.shortest_path(self.graph, rt.name, ni.name)
-                out_edge = (rt.name, shortest_path[1])
-                out_link = self.graph.get_edge_obj(out_edge)
-                out_idx = rt.outgoing.index(out_link)
-                dest = SimpleId(id=out_idx)
+                if ni.name not in next_hops:
+                    raise ValueError(f"No path from {rt.name} to {ni.name}")
+                dest = SimpleId(id=out_ports[next_hops[ni.name]])
                 addr_range = AddrRange.from_start_size(ni.id.id, 1)
                 routing_table.append(RouteMapRule(dest=dest, addr_range=addr_range, desc=ni.name))
 
             # Add routing table to the router
             rt.table = RouteMap(name=rt.name + "_map", rules=routing_table)
             rt.table.trim()
+            if self.routing.table_encoding is TableEncoding.MINIMAL:
+                rt.table.minimize()
 
     def gen_xy_routing_info(self):
         """Generate the XY routing info for the network."""
@@ -721,10 +771,17 @@ class Network(ConfigModel):
 
     def gen_routes(self):
         """Generates the routes for source-based routing."""
+        engine = RouteEngine(self.graph)
+        ports = {
+            rt.name: (rt.out_ports(), clog2(len(rt.outgoing))) for rt in self.graph.get_rt_nodes()
+        }
+        ni_nodes = self.graph.get_ni_nodes()
         self.routing_info.num_route_bits = 0
-        for ni_src in self.graph.get_ni_nodes():
+        for ni_src in ni_nodes:
+            # A single search from the source NI yields the routes to all destinations.
+            src_routes = engine.source_routes(ni_src.name, ports)
             routes = []
-            for ni_dst in self.graph.get_ni_nodes():
+            for ni_dst in ni_nodes:
                 # Skip if source and destination are the same
                 # and for manager-manager and subordinate-subordinate
                 # connections
@@ -735,22 +792,12 @@ class Network(ConfigModel):
                 ):
                     routes.append(RouteRule(route=None, id=ni_dst.id, desc=f"-> {ni_dst.name}"))
                     continue
-                route = nx.shortest_path(self.graph, ni_src.name, ni_dst.name)
-                max_route_bits = 0
-                port_lst = []
-                for i in range(1, len(route) - 1):
-                    out_edge = (route[i], route[i + 1])
-                    out_link = self.graph.get_edge_obj(out_edge)
-                    rt = self.graph.get_node_obj(route[i])
-                    out_port = rt.outgoing.index(out_link)
-                    num_port_bits = clog2(len(rt.outgoing))
-                    port_lst.append((out_port, num_port_bits))
-                    max_route_bits += num_port_bits
+                if ni_dst.name not in src_routes:
+                    raise ValueError(f"No path from {ni_src.name} to {ni_dst.name}")
+                port_lst, route_bits = src_routes[ni_dst.name]
                 rule = RouteRule(route=port_lst, id=ni_dst.id, desc=f"-> {ni_dst.name}")
                 routes.append(rule)
-                self.routing_info.num_route_bits = max(
-                    self.routing_info.num_route_bits, max_route_bits
-                )
+                self.routing_info.num_route_bits = max(self.routing_info.num_route_bits, route_bits)
             ni_src.table = RouteTable(name=ni_src.name + "_table", routes=routes)
 
     def gen_sam(self, xy_id_offset=None):
@@ -913,22 +960,26 @@ class Network(ConfigModel):
 
     def render_ni_tables(self):
         """Render the network interfaces tables in the generated code."""
-        string = ""
+        return "".join(self.iter_ni_tables())
+
+    def iter_ni_tables(self) -> Iterator[str]:
+        """Render the network interfaces tables as a stream of fragments, one per route."""
         sorted_ni_list = sorted(
             self.graph.get_ni_nodes(),
             key=lambda ni: self.graph.get_node_id(node_obj=ni),
             reverse=True,
         )
-        for ni in sorted_ni_list:
-            string += ni.table.render(num_route_bits=self.routing_info.num_route_bits, no_decl=True)
-            string += ",\n"
-        string = "'{\n" + string[:-2] + "}\n"
-        return sv_param_decl(
+        yield sv_param_decl_head(
             name="RoutingTables",
-            value=string,
             dtype="route_t",
             array_size=["NumEndpoints-1", "NumEndpoints-1"],
         )
+        yield "'{\n"
+        for i, ni in enumerate(sorted_ni_list):
+            if i:
+                yield ",\n"
+            yield from ni.table.iter_render(self.routing_info.num_route_bits, no_decl=True)
+        yield "}\n;\n"
 
     def render_nis(self):
         """Render the network interfaces in the generated code."""
@@ -1001,12 +1052,35 @@ class Network(ConfigModel):
             fields_dict[rule_desc] = i
         return sv_enum_typedef(name="sam_idx_e", fields_dict=fields_dict)
 
+    def ni_name(self, name: str) -> str:
+        """Return the name of a network interface, given its own or its endpoint's name."""
+        if self.graph.has_node(name) and self.graph.is_ni_node(name):
+            return name
+        for ep_name, ep in self.graph.get_ep_nodes(with_name=True):
+            if ep_name == name:
+                return ep.get_ni_name(ep_name)
+        raise ValueError(f"Unknown endpoint or network interface '{name}'")
+
+    def trace_route(self, src: str, dst: str, response: bool = False) -> list["RouteHop"]:
+        """Return the nodes a packet from `src` to `dst` traverses, as the hardware routes it.
+
+        Both ends are given as endpoints or network interfaces. Every router on the way is
+        listed with the indices of the ports the packet enters and leaves it on. With
+        `response`, the route of a response is traced, which differs from the request
+        route with the mirrored routing algorithms.
+        """
+        # Imported lazily, the traffic models depend on the network themselves
+        from floogen.model.link_load import FlowRouter
+
+        return FlowRouter(self).trace(self.ni_name(src), self.ni_name(dst), response)
+
     def visualize(self, savefig=True, filename: pathlib.Path = pathlib.Path("network.png")):
         """Visualize the network graph."""
         # Imported lazily so the optional 'viz' extra (matplotlib) is only
         # required when this feature is actually used. The CLI hides the
         # `visualize` command when matplotlib is unavailable.
         import matplotlib.pyplot as plt
+        import networkx as nx
 
         ni_nodes = self.graph.get_ni_nodes(with_obj=False, with_name=True)
         router_nodes = self.graph.get_rt_nodes(with_obj=False, with_name=True)
@@ -4,13 +4,11 @@
 #
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
-from importlib.resources import as_file, files
 from typing import ClassVar
 
-from mako.lookup import Template
 from pydantic import BaseModel
 
-import floogen.templates
+from floogen.cache import package_template
 from floogen.model.endpoint import EndpointDesc
 from floogen.model.link import AxiLink, NarrowWideLink
 from floogen.model.protocol import AXI4
@@ -65,8 +63,7 @@ class NetworkInterface(BaseModel):
 class AxiNI(NetworkInterface):
     """Axi Network Interface class."""
 
-    with as_file(files(floogen.templates).joinpath("floo_axi_chimney.sv.mako")) as _tpl_path:
-        tpl: ClassVar = Template(filename=str(_tpl_path))
+    tpl_name: ClassVar[str] = "floo_axi_chimney.sv.mako"
 
     mgr_port: AXI4 | None = None
     sbr_port: AXI4 | None = None
@@ -75,14 +72,13 @@ class AxiNI(NetworkInterface):
 
     def render(self, **kwargs) -> str:
         """Render the network interface."""
-        return self.tpl.render(ni=self, **kwargs)
+        return package_template(self.tpl_name).render(ni=self, **kwargs)
 
 
 class NarrowWideAxiNI(NetworkInterface):
     """ " NarrowWideNI class to describe a narrow-wide network interface."""
 
-    with as_file(files(floogen.templates).joinpath("floo_nw_chimney.sv.mako")) as _tpl_path:
-        tpl: ClassVar = Template(filename=str(_tpl_path))
+    tpl_name: ClassVar[str] = "floo_nw_chimney.sv.mako"
 
     mgr_narrow_port: AXI4 | None = None
     sbr_narrow_port: AXI4 | None = None
@@ -93,4 +89,4 @@ class NarrowWideAxiNI(NetworkInterface):
 
     def render(self, **kwargs) -> str:
         """Render the network interface."""
-        return self.tpl.render(ni=self, **kwargs)
+        return package_template(self.tpl_name).render(ni=self, **kwargs)
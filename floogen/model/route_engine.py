@@ -0,0 +1,137 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Shortest-path computation over the elaborated network graph.
+
+Routing tables need the next hop from every router towards every destination. Asking
+`nx.shortest_path` for each of those pairs separately repeats the same search over and
+over, which dominates generation time on large meshes. `RouteEngine` works on the
+integer-indexed `CompactGraph` and runs a single breadth-first search per source, from
+which the next hop towards *every* reachable node falls out in one pass.
+
+Where several paths are equally short, the search breaks the tie from the source alone:
+neighbours are visited in the graph's adjacency order, and every node is reached through
+the neighbour that was visited first. `nx.shortest_path`, which the tables were computed
+with before, searches from both ends at once, so its choice also depends on the order of
+the destination's neighbours. Both agree on the meshes and trees of the examples, but on
+other topologies with equally short paths the chosen paths - and with them the generated
+tables - can differ from the ones of earlier versions.
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from floogen.model.graph import Graph
+
+
+class RouteEngine:
+    """Integer-indexed breadth-first search over a `Graph`.
+
+    The engine works on the graph's `CompactGraph`, freezing the graph if necessary.
+    It has to be rebuilt if nodes or edges are added afterwards.
+    """
+
+    def __init__(self, graph: "Graph"):
+        compact = graph.freeze()
+        self._names = compact.names
+        self._index = compact.index
+        self._succ = [compact.successors(v) for v in range(len(self._names))]
+
+    def _bfs(self, source: str) -> tuple[int, list[int], list[int]]:
+        """Search from `source`, returning its index, the BFS order and the predecessors.
+
+        Unreached nodes have a predecessor of `-1`, the source is its own predecessor.
+        """
+        src = self._index[source]
+        pred = [-1] * len(self._names)
+        pred[src] = src
+        order = [src]
+        queue = deque(order)
+        while queue:
+            v = queue.popleft()
+            for w in self._succ[v]:
+                if pred[w] == -1:
+                    pred[w] = v
+                    order.append(w)
+                    queue.append(w)
+        return src, order, pred
+
+    def next_hops(self, source: str) -> dict[str, str]:
+        """Return the first node after `source` on the shortest path to every other node.
+
+        Nodes that cannot be reached from `source` are absent from the result.
+        """
+        src, order, pred = self._bfs(source)
+        first = [-1] * len(self._names)
+        # `order` lists every node after its predecessor, so the first hop of a node is
+        # either the node itself (a direct neighbour) or the first hop of its predecessor.
+        for v in order[1:]:
+            first[v] = v if pred[v] == src else first[pred[v]]
+        return {self._names[v]: self._names[first[v]] for v in order[1:]}
+
+    def source_routes(
+        self, source: str, ports: dict[str, tuple[dict[str, int], int]]
+    ) -> dict[str, tuple[list[tuple[int, int]], int]]:
+        """Return the source route from `source` to every other reachable node.
+
+        `ports` maps each router to its output port per neighbour and the number of
+        bits needed to encode a port. A route lists the `(port, bits)` hop taken at
+        every node between `source` and the destination, and comes with the total
+        number of bits it occupies. Routes are extended from their predecessor's, so
+        all destinations share the work of a single search, and break ties between
+        equally short paths like `next_hops`. Nodes that are only reached through a node
+        other than a router are absent from the result.
+        """
+        src, order, pred = self._bfs(source)
+        routes: list[tuple[list[tuple[int, int]], int] | None] = [None] * len(self._names)
+        routes[src] = ([], 0)
+        for v in order[1:]:
+            u = pred[v]
+            if u == src:
+                routes[v] = ([], 0)
+            elif (route := routes[u]) is not None and self._names[u] in ports:
+                # Only routers forward packets, paths through other nodes are not routes.
+                out_ports, num_bits = ports[self._names[u]]
+                hops, total_bits = route
+                routes[v] = (hops + [(out_ports[self._names[v]], num_bits)], total_bits + num_bits)
+        return {self._names[v]: route for v in order[1:] if (route := routes[v]) is not None}
+
+    def path_counts(self, source: str, forwarders: set[str]) -> dict[str, tuple[int, int]]:
+        """Return the distance in links and the number of shortest paths to every node.
+
+        Only the nodes reachable from `source` are included. Paths only lead through the
+        `forwarders`, e.g. the routers, like routes do.
+        """
+        src = self._index[source]
+        dist = [-1] * len(self._names)
+        num_paths = [0] * len(self._names)
+        dist[src], num_paths[src] = 0, 1
+        order = [src]
+        queue = deque(order)
+        while queue:
+            v = queue.popleft()
+            if v != src and self._names[v] not in forwarders:
+                continue
+            for w in self._succ[v]:
+                if dist[w] == -1:
+                    dist[w] = dist[v] + 1
+                    order.append(w)
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    num_paths[w] += num_paths[v]
+        return {self._names[v]: (dist[v], num_paths[v]) for v in order[1:]}
+
+    def shortest_path(self, source: str, target: str) -> list[str]:
+        """Return the shortest path from `source` to `target`, both included."""
+        src, _, pred = self._bfs(source)
+        dst = self._index[target]
+        if pred[dst] == -1:
+            raise ValueError(f"No path from {source} to {target}")
+        path = [dst]
+        while path[-1] != src:
+            path.append(pred[path[-1]])
+        return [self._names[v] for v in reversed(path)]
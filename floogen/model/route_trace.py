@@ -0,0 +1,69 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""The routes the generated network takes, replayed from its routing information.
+
+`Network.trace_route()` follows a single route hop by hop, `hop_matrix()` counts the
+routers on the routes between all managers and subordinates. Both use `FlowRouter`,
+which replays the configured routing algorithm: dimension-ordered routing on the `Coord`
+of the routers, the router tables of `ID` routing, or the route tables of the network
+interfaces with `SRC` routing.
+
+The routes towards a destination form a tree for all but source-based routing, so the
+hop counts from all managers to a subordinate are derived from a single pass over that
+tree instead of tracing every pair.
+"""
+
+import csv
+import json
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TextIO
+
+from floogen.model.link_load import FlowRouter
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+
+@dataclass
+class HopMatrix:
+    """The number of routers on the request route from every manager to every subordinate."""
+
+    sources: list[str]
+    """The network interfaces of the managers, i.e. the rows."""
+    destinations: list[str]
+    """The network interfaces of the subordinates, i.e. the columns."""
+    hops: list[list[int | None]]
+    """The hop counts, `None` if there is no route or the source is the destination."""
+
+    def write_csv(self, file: TextIO | None = None):
+        """Write a row per source, with an empty cell where there is no route."""
+        writer = csv.writer(file or sys.stdout, lineterminator="\n")
+        writer.writerow(["", *self.destinations])
+        for src, row in zip(self.sources, self.hops, strict=True):
+            writer.writerow([src, *("" if hops is None else hops for hops in row)])
+
+    def write_json(self, file: TextIO | None = None):
+        """Write the sources, destinations and hop counts as a JSON object."""
+        file = file or sys.stdout
+        data = {"sources": self.sources, "destinations": self.destinations, "hops": self.hops}
+        json.dump(data, file)
+        file.write("\n")
+
+
+def hop_matrix(network: "Network", router: FlowRouter | None = None) -> HopMatrix:
+    """Count the routers on the request routes from all managers to all subordinates."""
+    router = router or FlowRouter(network)
+    nis = network.graph.get_ni_nodes()
+    sources = [ni.name for ni in nis if ni.is_mgr()]
+    destinations = [ni.name for ni in nis if ni.is_sbr()]
+    columns = []
+    for dst in destinations:
+        hop_counts = router.hop_counts([src for src in sources if src != dst], dst)
+        columns.append([hop_counts.get(src) for src in sources])
+    hops = [[column[i] for column in columns] for i in range(len(sources))]
+    return HopMatrix(sources=sources, destinations=destinations, hops=hops)
@@ -6,13 +6,11 @@
 
 
 from abc import ABC, abstractmethod
-from importlib.resources import as_file, files
 from typing import ClassVar
 
-from mako.lookup import Template
 from pydantic import BaseModel, model_validator
 
-import floogen.templates
+from floogen.cache import package_template
 from floogen.model.config import ArrayDims, ConfigModel, OneOrMany
 from floogen.model.link import Link
 from floogen.model.routing import Coord, RouteAlgo, RouteMap, SimpleId
@@ -53,6 +51,15 @@ class Router(BaseModel, ABC):
     def render(self):
         """Declare the router in the generated code."""
 
+    def out_ports(self):
+        """Map each neighbour reached through an outgoing link to its port index."""
+        ports = {}
+        for port, link in enumerate(self.outgoing):
+            if link is not None:
+                # `list.index` semantics: the first port wins if a neighbour repeats.
+                ports.setdefault(link.dest, port)
+        return ports
+
     @model_validator(mode="after")
     def check_links(self):
         """Check if the number of links is correct."""
@@ -72,20 +79,18 @@ class Router(BaseModel, ABC):
 class AxiRouter(Router):
     """Router class to describe a single-AXI router"""
 
-    with as_file(files(floogen.templates).joinpath("floo_axi_router.sv.mako")) as _tpl_path:
-        _tpl: ClassVar = Template(filename=str(_tpl_path))
+    _tpl_name: ClassVar[str] = "floo_axi_router.sv.mako"
 
     def render(self, **kwargs):
         """Declare the router in the generated code."""
-        return self._tpl.render(router=self, **kwargs) + "\n"
+        return package_template(self._tpl_name).render(router=self, **kwargs) + "\n"
 
 
 class NarrowWideRouter(Router):
     """Router class to describe a narrow-wide router"""
 
-    with as_file(files(floogen.templates).joinpath("floo_nw_router.sv.mako")) as _tpl_path:
-        _tpl: ClassVar = Template(filename=str(_tpl_path))
+    _tpl_name: ClassVar[str] = "floo_nw_router.sv.mako"
 
     def render(self, **kwargs):
         """Declare the router in the generated code."""
-        return self._tpl.render(router=self, **kwargs) + "\n"
+        return package_template(self._tpl_name).render(router=self, **kwargs) + "\n"
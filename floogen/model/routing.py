@@ -4,22 +4,38 @@
 #
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
+import logging
+from bisect import bisect_right
+from collections.abc import Iterator
+from dataclasses import dataclass
 from enum import Enum
+from itertools import pairwise
 from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, BeforeValidator, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    field_validator,
+    model_validator,
+)
 
-from floogen.model.config import ConfigEnum, ConfigModel, OneOrMany
+from floogen.model.config import ConfigEnum, ConfigModel, OneOrMany, dataclass_config
 from floogen.utils import (
     bool_to_sv,
     cdiv,
     snake_to_camel,
     sv_param_decl,
+    sv_param_decl_head,
     sv_struct_render,
     sv_struct_typedef,
     sv_typedef,
 )
 
+logger = logging.getLogger(__name__)
+
 # The width fields on `Routing` are filled in by `Network.gen_routing_info()`, which sets
 # exactly the ones the configured routing algorithm needs. Reading them before that is a
 # programming error rather than a config error.
@@ -97,6 +113,43 @@ class VcImpl(ConfigEnum):
         return self.value
 
 
+class TableEncoding(ConfigEnum):
+    """Encoding of the routing tables of the routers for table-based (`ID`) routing.
+
+    Attributes:
+        RANGES: One rule per range of adjacent IDs routed to the same port.
+        MINIMAL: The fewest overlapping rules, where the rule listed first takes precedence.
+    """
+
+    RANGES = "ranges"
+    MINIMAL = "minimal"
+
+    def __str__(self):
+        return self.value
+
+
+class IdOrder(ConfigEnum):
+    """Order in which the endpoints are assigned their IDs for `ID` and `SRC` routing.
+
+    Attributes:
+        INSERTION: The order in which the endpoints are declared.
+        DFS: A depth-first traversal of the routers, where the endpoints of a router
+            get consecutive IDs.
+        HILBERT: A Hilbert curve over the array indices of the routers, where the
+            endpoints of a router get consecutive IDs. Requires a 2D array of routers.
+        AUTO: Whichever of the above needs the fewest router table rules. Requires
+            table-based (`ID`) routing, the only one with router tables.
+    """
+
+    INSERTION = "insertion"
+    DFS = "dfs"
+    HILBERT = "hilbert"
+    AUTO = "auto"
+
+    def __str__(self):
+        return self.value
+
+
 class NarrowReductionOp(ConfigEnum):
     """Integer ALU reduction operations available on the narrow router."""
 
@@ -305,10 +358,16 @@ PortDirection = Annotated[
 """A router port, given either as an index or as a direction name."""
 
 
-class SimpleId(ConfigModel):
+# IDs and coordinates are frozen dataclasses rather than models: they are created, hashed
+# and sorted constantly during elaboration, which then costs no validation. Pydantic still
+# validates them wherever they are read from a configuration file.
+@dataclass(frozen=True, slots=True)
+class SimpleId:
     """ID class."""
 
-    id: int
+    __pydantic_config__ = dataclass_config(__doc__)
+
+    id: Annotated[int, Field(ge=0)]
 
     def __hash__(self):
         return hash(self.id)
@@ -325,14 +384,6 @@ class SimpleId(ConfigModel):
         """Less than comparison."""
         return self.id < other.id
 
-    @field_validator("id")
-    @classmethod
-    def validate_id(cls, v):
-        """Validate the ID."""
-        if v < 0:
-            raise ValueError("ID must be positive")
-        return v
-
     def render(self, as_index=False):
         """Render the SystemVerilog ID."""
         if not as_index:
@@ -340,25 +391,25 @@ class SimpleId(ConfigModel):
         return f"[{self.id}]"
 
 
-class Coord(ConfigModel):
+@dataclass(frozen=True, slots=True)
+class Coord:
     """2D coordinate class.
 
     `x` and `y` default to 0 so that a partial offset (e.g. `{x: 2}`) is accepted
     wherever a coordinate is read from a config file.
     """
 
+    __pydantic_config__ = dataclass_config(__doc__)
+
     x: int = 0
     y: int = 0
     port_id: int = 0
 
-    def __hash__(self):
-        return hash((self.x, self.y, self.port_id))
-
     def __add__(self, other):
-        return Coord(x=self.x + other.x, y=self.y + other.y, port_id=self.port_id + other.port_id)
+        return Coord(self.x + other.x, self.y + other.y, self.port_id + other.port_id)
 
     def __sub__(self, other):
-        return Coord(x=self.x - other.x, y=self.y - other.y, port_id=self.port_id - other.port_id)
+        return Coord(self.x - other.x, self.y - other.y, self.port_id - other.port_id)
 
     def __lt__(self, other):
         if self.y < other.y:
@@ -403,8 +454,13 @@ class AddrRange(ConfigModel):
     `size` is additionally accepted as an *input* key in place of `start` or `end`, but is
     not stored as a field - it is normalised away into `end` and read back through the
     derived `size` property.
+
+    Ranges are frozen, so they can be shared between endpoints, network interfaces and
+    address maps. `set_arr()` returns a new range instead of moving this one.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     start: int = Field(ge=0)
     end: int = Field(ge=0)
     base: int | None = None
@@ -506,22 +562,18 @@ class AddrRange(ConfigModel):
                     )
         return self
 
-    def set_arr(self, arr_idx, arr_dim):
-        """Update the address range with the given index."""
-        # `size` is derived from `start`/`end`, so it has to be read before either moves.
-        size = self.size
-        self.arr_idx = arr_idx
-        self.arr_dim = arr_dim
-        if self.base is not None:
-            match arr_idx:
-                case (m,):
-                    self.start = self.base + size * m
-                case (m, n):
-                    self.start = self.base + size * (m * arr_dim[1] + n)
-            self.end = self.start + size
-        else:
+    def set_arr(self, arr_idx, arr_dim) -> "AddrRange":
+        """Return the address range of the array element with the given index."""
+        if self.base is None:
             raise ValueError("Address range base not set")
-        return self
+        start = self.start
+        match arr_idx:
+            case (m,):
+                start = self.base + self.size * m
+            case (m, n):
+                start = self.base + self.size * (m * arr_dim[1] + n)
+        update = {"arr_idx": arr_idx, "arr_dim": arr_dim, "start": start, "end": start + self.size}
+        return self.model_copy(update=update)
 
 
 class RouteMapRule(BaseModel):
@@ -717,40 +769,96 @@ class RouteTable(BaseModel):
 
     def render(self, num_route_bits, no_decl=False):
         """Render the SystemVerilog route table."""
-        string = ""
-        rules_str = ""
+        return "".join(self.iter_render(num_route_bits, no_decl))
+
+    def iter_render(self, num_route_bits, no_decl=False) -> Iterator[str]:
+        """Render the SystemVerilog route table as a stream of fragments, one per route."""
+        name = snake_to_camel(self.name)
         if not self.routes:
-            string += sv_param_decl(
-                f"{snake_to_camel(self.name)}",
-                value="'{default: 0}",
-                dtype="route_t",
-            )
-            return string
-        string += sv_param_decl(f"{snake_to_camel(self.name)}NumRoutes", len(self.routes)) + "\n"
+            yield sv_param_decl(name, value="'{default: 0}", dtype="route_t")
+            return
+        if not no_decl:
+            yield sv_param_decl(f"{name}NumRoutes", len(self.routes)) + "\n"
+            yield sv_param_decl_head(name, dtype="route_t", array_size=f"{name}NumRoutes-1")
+        yield "'{\n"
+        last = len(self.routes) - 1
         for i, rule in enumerate(self.routes):
-            rules_str += f"{rule.render(num_route_bits)}"
-            rules_str += "," if i != len(self.routes) - 1 else " "
-            if rule.desc is not None:
-                rules_str += f"// {rule.desc}"
-            rules_str += "\n"
-        if no_decl:
-            return "'{\n" + rules_str + "}"
-        string += sv_param_decl(
-            f"{snake_to_camel(self.name)}",
-            value="'{\n" + rules_str + "\n}",
-            dtype="route_t",
-            array_size=f"{snake_to_camel(self.name)}NumRoutes-1",
-        )
-        return string
+            sep = "," if i != last else " "
+            desc = f"// {rule.desc}" if rule.desc is not None else ""
+            yield f"{rule.render(num_route_bits)}{sep}{desc}\n"
+        yield "}" if no_decl else "\n};\n"
+
+
+MINIMIZE_WINDOW = 256
+"""The most ranges `RouteMap.minimize()` minimizes at once.
+
+`_min_strokes` takes cubic time and quadratic memory in the number of ranges, so longer
+runs of adjacent ranges are split into windows of this size, which are minimized
+independently. This bounds the time per window to a fraction of a second, at the cost
+of rules that could have spanned several windows."""
+
+
+def _min_strokes(colors: list[Any]) -> list[list[int]]:
+    """Cover a sequence with the fewest strokes, where later strokes paint over earlier ones.
+
+    Each stroke paints a contiguous range `[first, last]` of the sequence with the color
+    of `first`. Returns the strokes in painting order, which reproduce `colors` exactly.
+    This is the "strange printer" problem: `cost[i][j]` is the fewest strokes for
+    `colors[i:j + 1]`, where the stroke of `colors[i]` either paints it alone, or extends
+    to the next `k` of the same color, painting `colors[i + 1:k]` on top of it.
+    """
+    n = len(colors)
+    same_color = [[k for k in range(i + 1, n) if colors[k] == c] for i, c in enumerate(colors)]
+    cost = [[0] * n for _ in range(n + 1)]
+    extend_to: list[list[int | None]] = [[None] * n for _ in range(n)]
+    for i in range(n - 1, -1, -1):
+        for j in range(i, n):
+            best = cost[i + 1][j] + 1
+            for k in same_color[i]:
+                if k > j:
+                    break
+                if (c := cost[i + 1][k - 1] + cost[k][j]) < best:
+                    best = c
+                    extend_to[i][j] = k
+            cost[i][j] = best
+
+    def paint(i: int, j: int) -> list[list[int]]:
+        # The first stroke starts at `i`, with the color of `colors[i]`
+        strokes: list[list[int]] = []
+        while i <= j:
+            k = extend_to[i][j]
+            if k is None:
+                strokes.append([i, i])
+                i += 1
+                continue
+            tail = paint(k, j)
+            tail[0][0] = i
+            strokes += tail + paint(i + 1, k - 1)
+            break
+        return strokes
+
+    return paint(0, n - 1)
 
 
 class RouteMap(BaseModel):
     """Route Map class, which can represent the system address map (SAM),
-    or a routing table of a router."""
+    or a routing table of a router.
+
+    Besides `rules`, which keeps the order the rules are rendered in, the map holds an
+    index of the rules sorted by start address. It is built once on validation and kept
+    up to date by `insert()` and `trim()`, and answers `lookup()` in O(log N). Rules
+    appended to `rules` directly are not indexed.
+
+    The rules of a map never overlap, unless it was `minimize()`d.
+    """
 
     name: str
     rules: list[RouteMapRule]
 
+    _starts: list[int] = PrivateAttr(default_factory=list)
+    _by_start: list[RouteMapRule] = PrivateAttr(default_factory=list)
+    _minimized: bool = PrivateAttr(default=False)
+
     def __str__(self):
         return f"{self.rules}"
 
@@ -763,52 +871,137 @@ class RouteMap(BaseModel):
 
     @model_validator(mode="after")
     def check_no_overlapping_ranges(self):
-        """Check if there are no overlapping ranges."""
-        rules = sorted(self.rules)
-        for i in range(len(rules) - 1):
-            if rules[i].addr_range.end > rules[i + 1].addr_range.start:
+        """Index the rules, which checks that there are no overlapping ranges."""
+        self._index(sorted(self.rules, key=lambda rule: rule.addr_range.start))
+        return self
+
+    def _index(self, by_start: list[RouteMapRule]):
+        """Set the index to `by_start`, after checking it for overlaps in a single pass."""
+        for prev, rule in pairwise(by_start):
+            if prev.addr_range.end > rule.addr_range.start:
                 raise ValueError(
-                    f"Overlapping ranges: {rules[i].addr_range} and {rules[i + 1].addr_range}\n \
-                    {self.pprint()}"
+                    f"Overlapping ranges in {self.name}: {prev.addr_range} and {rule.addr_range}"
                 )
-        return self
+        self._by_start = by_start
+        self._starts = [rule.addr_range.start for rule in by_start]
+
+    def lookup(self, addr: int) -> RouteMapRule | None:
+        """Return the rule whose address range contains `addr`, or `None` if none does."""
+        i = bisect_right(self._starts, addr) - 1
+        if i >= 0 and addr < self._by_start[i].addr_range.end:
+            return self._by_start[i]
+        return None
+
+    @property
+    def num_unminimized_rules(self) -> int:
+        """The number of non-overlapping rules the map is equivalent to."""
+        return len(self._by_start)
+
+    def _check_not_minimized(self):
+        if self._minimized:
+            raise ValueError(f"{self.name} is minimized and cannot be modified anymore")
+
+    def insert(self, rule: RouteMapRule):
+        """Append a rule, raising a `ValueError` if it overlaps one of the others."""
+        self._check_not_minimized()
+        rng = rule.addr_range
+        i = bisect_right(self._starts, rng.start)
+        overlaps = (i > 0 and self._by_start[i - 1].addr_range.end > rng.start) or (
+            i < len(self._starts) and self._starts[i] < rng.end
+        )
+        if overlaps:
+            raise ValueError(f"Address range {rng} overlaps an existing rule of {self.name}")
+        self._starts.insert(i, rng.start)
+        self._by_start.insert(i, rule)
+        self.rules.append(rule)
 
     def trim(self):
-        """Optimize the routing table."""
-        # Separate the rules by destination
-        rules_by_dest = {}
-        for rule in self.rules:
-            rules_by_dest.setdefault(rule.dest, []).append(rule)
-
-        # Sort the rules by start address
-        for dest, ranges in rules_by_dest.items():
-            rules_by_dest[dest] = sorted(ranges)
-
-        # Merge the rules if the end of one range is the start of the next
-        for dest, ranges in rules_by_dest.items():
-            i = 0
-            while i < len(ranges) - 1:
-                if ranges[i].addr_range.end == ranges[i + 1].addr_range.start:
-                    ranges[i].addr_range.end = ranges[i + 1].addr_range.end
-                    del ranges[i + 1]
-                else:
-                    i += 1
+        """Optimize the routing table.
 
-        # Combine the rules into a single table again
-        self.rules = []
-        for dest, ranges in rules_by_dest.items():
-            for rule in ranges:
-                self.rules.append(rule)
+        Adjacent ranges to the same destination are merged. The rules end up grouped by
+        destination, in the order the destinations first appear, and sorted by address.
+        """
+        self._check_not_minimized()
+        # Walk the rules in address order, where a range that continues the previous one
+        # of the same destination can only directly follow it.
+        rules_by_dest: dict[SimpleId | Coord, list[RouteMapRule]] = {
+            rule.dest: [] for rule in self.rules
+        }
+        by_start: list[RouteMapRule] = []
+        last_idx: dict[SimpleId | Coord, int] = {}
+        for rule in self._by_start:
+            ranges = rules_by_dest[rule.dest]
+            if ranges and ranges[-1].addr_range.end == rule.addr_range.start:
+                merged = ranges[-1].addr_range.model_copy(update={"end": rule.addr_range.end})
+                ranges[-1] = ranges[-1].model_copy(update={"addr_range": merged})
+                by_start[last_idx[rule.dest]] = ranges[-1]
+            else:
+                ranges.append(rule)
+                last_idx[rule.dest] = len(by_start)
+                by_start.append(rule)
 
-        # Validate the routing table
-        self.model_validate(self)
+        # Combine the rules into a single table again
+        self.rules = [rule for ranges in rules_by_dest.values() for rule in ranges]
+        # Merged ranges do not change the order of their start addresses
+        self._by_start = by_start
+        self._starts = [rule.addr_range.start for rule in by_start]
+
+    def minimize(self):
+        """Replace the rules by the fewest rules that decode every address the same way.
+
+        The rules are allowed to overlap, in which case the earlier rule in `rules` takes
+        precedence: it is rendered at the higher index of the rule array, which is the one
+        the address decoder of the hardware selects. A rule for a destination can then
+        span the ranges of others, which are carved out by rules of higher precedence.
+        Addresses that no rule maps stay unmapped. `lookup()` keeps working on the
+        equivalent non-overlapping rules, but the map cannot be modified any further.
+
+        Runs of more than `MINIMIZE_WINDOW` adjacent ranges are minimized in windows of
+        that size, so the result is no longer guaranteed to be minimal.
+        """
+        self._check_not_minimized()
+        # Ranges separated by unmapped addresses are minimized independently, as runs of
+        # ranges to the same destination
+        segments: list[list[RouteMapRule]] = []
+        for rule in self._by_start:
+            if not segments or segments[-1][-1].addr_range.end != rule.addr_range.start:
+                segments.append([rule])
+            elif segments[-1][-1].dest == rule.dest:
+                merged = segments[-1][-1].addr_range.model_copy(update={"end": rule.addr_range.end})
+                segments[-1][-1] = segments[-1][-1].model_copy(update={"addr_range": merged})
+            else:
+                segments[-1].append(rule)
+
+        if (longest := max(map(len, segments), default=0)) > MINIMIZE_WINDOW:
+            logger.warning(
+                "Minimizing %s in windows of %d of its %d adjacent ranges, the result may "
+                "not be minimal",
+                self.name,
+                MINIMIZE_WINDOW,
+                longest,
+            )
+        rules = []
+        for segment in segments:
+            for start in range(0, len(segment), MINIMIZE_WINDOW):
+                runs = segment[start : start + MINIMIZE_WINDOW]
+                strokes = _min_strokes([run.dest for run in runs])
+                # The rule painted last has to take precedence, so it comes first
+                for first, last in reversed(strokes):
+                    end = runs[last].addr_range.end
+                    rng = runs[first].addr_range.model_copy(update={"end": end})
+                    rules.append(runs[first].model_copy(update={"addr_range": rng}))
+        self.rules = rules
+        self._minimized = True
 
     def render(self, aw=None):
         """Render the SystemVerilog routing table."""
-        string = ""
+        return "".join(self.iter_render(aw))
+
+    def iter_render(self, aw=None) -> Iterator[str]:
+        """Render the SystemVerilog routing table as a stream of fragments, one per rule."""
         rules = self.rules.copy()
         # typedef of the address rule
-        string += sv_param_decl(f"{snake_to_camel(self.name)}NumRules", len(rules)) + "\n"
+        yield sv_param_decl(f"{snake_to_camel(self.name)}NumRules", len(rules)) + "\n"
         addr_type = f"logic [{aw - 1}:0]" if aw is not None else "id_t"
         effective_rule_type = self.rule_type()
         rule_type_dict = {}
@@ -816,7 +1009,7 @@ class RouteMap(BaseModel):
             if aw is not None:
                 # SAM: address fields use a different bit width, needs its own typedef
                 rule_type_dict = {"idx": "id_t", "start_addr": addr_type, "end_addr": addr_type}
-                string += sv_struct_typedef(self.rule_type(), rule_type_dict)
+                yield sv_struct_typedef(self.rule_type(), rule_type_dict)
             else:
                 # Router table: reuse the shared route_map_rule_t from the package
                 effective_rule_type = "route_map_rule_t"
@@ -826,40 +1019,39 @@ class RouteMap(BaseModel):
                 "len": "int unsigned",
                 "base_id": "int unsigned",
             }
-            string += sv_struct_typedef("collective_mask_sel_t", rule_type_dict)
+            yield sv_struct_typedef("collective_mask_sel_t", rule_type_dict)
             rule_type_dict = {
                 "id": "id_t",
                 "mask_x": "collective_mask_sel_t",
                 "mask_y": "collective_mask_sel_t",
             }
-            string += sv_struct_typedef("collective_idx_t", rule_type_dict)
+            yield sv_struct_typedef("collective_idx_t", rule_type_dict)
             rule_type_dict = {
                 "idx": "collective_idx_t",
                 "start_addr": addr_type,
                 "end_addr": addr_type,
             }
-            string += sv_struct_typedef(self.rule_type(), rule_type_dict)
+            yield sv_struct_typedef(self.rule_type(), rule_type_dict)
 
-        rules_str = ""
         if not rules:
-            string += sv_param_decl(
+            yield sv_param_decl(
                 f"{snake_to_camel(self.name)}",
                 value="'{default: 0}",
                 dtype=effective_rule_type,
             )
-            return string
-        for i, rule in enumerate(rules):
-            rules_str += f"{rule.render(aw)}"
-            rules_str += "," if i != len(rules) - 1 else " "
-            if rule.desc is not None:
-                rules_str += f"// {snake_to_camel(rule.render_desc())}\n"
-        string += sv_param_decl(
+            return
+        yield sv_param_decl_head(
             f"{snake_to_camel(self.name)}",
-            value="'{\n" + rules_str + "\n}",
             dtype=effective_rule_type,
             array_size=f"{snake_to_camel(self.name)}NumRules-1",
         )
-        return string
+        yield "'{\n"
+        last = len(rules) - 1
+        for i, rule in enumerate(rules):
+            sep = "," if i != last else " "
+            desc = f"// {snake_to_camel(rule.render_desc())}\n" if rule.desc is not None else "\n"
+            yield f"{rule.render(aw)}{sep}{desc}"
+        yield "\n};\n"
 
     def render_rdl(self, rdl_as_mem=False, rdl_memwidth=8):
         """Render the SystemRDL addrmap internals."""
@@ -958,6 +1150,10 @@ class RoutingDesc(ConfigModel):
     vc_impl: VcImpl | None = None
     """Virtual channel implementation. Left unset, no `VcImpl` parameter is emitted and the hardware default applies."""
     collective: CollectiveCfg = Field(default_factory=CollectiveCfg)
+    table_encoding: TableEncoding = TableEncoding.RANGES
+    """Encoding of the routing tables of the routers for table-based (`ID`) routing. `minimal` uses rules that overlap and take precedence over one another, see the [minimized routing tables](#minimized-routing-tables). Fewer rules make the routers smaller and faster, but the tables are harder to read."""
+    id_order: IdOrder = IdOrder.INSERTION
+    """Order in which the endpoints are assigned their IDs for table-based (`ID`) and source-based (`SRC`) routing. With `dfs` or `hilbert`, endpoints that are close in the topology get contiguous IDs, which keeps the routing tables small. `auto` picks the order that needs the fewest router table rules, and therefore requires `ID` routing."""
 
     @property
     def en_collective(self) -> bool:
@@ -973,6 +1169,16 @@ class RoutingDesc(ConfigModel):
             raise ValueError(f"`route_algo: {self.route_algo}` requires `decouple_rw: Phys` ")
         return self
 
+    @model_validator(mode="after")
+    def validate_auto_id_order(self):
+        """`id_order: auto` compares the router tables, which only `ID` routing has."""
+        if self.id_order is IdOrder.AUTO and self.route_algo is not RouteAlgo.ID:
+            raise ValueError(
+                "`id_order: auto` picks the order with the fewest router table rules and "
+                f"requires `route_algo: ID`, but got {self.route_algo}"
+            )
+        return self
+
     @model_validator(mode="after")
     def validate_collective_route_algo(self):
         """Collective operations are supported with dimension-ordered routing only."""
@@ -1013,6 +1219,8 @@ class Routing(RoutingDesc):
     """The number of bits to represent the Y coordinate. Only used if `route_algo` is XY."""
     num_route_bits: int | None = None
     """The number of bits to represent the route. Only used if `route_algo` is SRC."""
+    id_order_rules: dict[IdOrder, int] = Field(default_factory=dict)
+    """The total number of trimmed router table rules of every order that `id_order: auto` evaluated."""
 
     @classmethod
     def from_desc(cls, desc: RoutingDesc, **generated) -> "Routing":
@@ -0,0 +1,133 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Hop-count and path-diversity statistics of a network topology.
+
+The statistics describe the topology, independently of the routing algorithm: the hop
+count of a pair of network interfaces is the number of routers on a shortest path
+between them, and its path diversity the number of distinct shortest paths, i.e. the
+minimal routes an adaptive routing algorithm could choose from.
+
+Only pairs that exchange transactions count, which are the pairs `Network.gen_routes()`
+generates routes for. A pair is weighted by the number of directions it is used in:
+once for the requests if the source is a manager and the destination a subordinate,
+and once for the responses if it is the other way around. Two endpoints that are both
+managers and subordinates therefore weigh twice as much as a cluster and a memory
+controller, which only exchange requests one way and responses the other.
+
+All pairs are covered by a single breadth-first search per network interface, which
+counts the shortest paths as it goes.
+"""
+
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, TextIO
+
+from floogen.model.route_engine import RouteEngine
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+
+@dataclass
+class TopologyStats:
+    """Hop counts and path diversity over all pairs of communicating network interfaces."""
+
+    name: str
+    """The name of the network."""
+    num_pairs: int = 0
+    """The number of ordered pairs that exchange requests or responses."""
+    num_unreachable: int = 0
+    """The pairs without any path between them, which are not part of the other numbers."""
+    avg_hops: float = 0.0
+    """The weighted average number of routers on a shortest path."""
+    diameter: int = 0
+    """The largest number of routers on a shortest path of any pair."""
+    median_paths: int = 0
+    """The weighted median of the number of shortest paths of a pair."""
+    min_paths: int = 0
+    """The smallest number of shortest paths of any pair."""
+    single_path_share: float = 0.0
+    """The weighted share of the pairs with a single shortest path."""
+    hop_histogram: dict[int, int] = field(default_factory=dict)
+    """The number of pairs per hop count."""
+
+    def write_text(self, file: TextIO | None = None):
+        """Write a human-readable summary."""
+        file = file or sys.stdout
+        print(f"Topology: {self.name}", file=file)
+        print(f"Endpoint pairs: {self.num_pairs} ({self.num_unreachable} unreachable)", file=file)
+        print(f"Average hops: {self.avg_hops:.2f}", file=file)
+        print(f"Diameter: {self.diameter} hops", file=file)
+        print(f"Median shortest paths per pair: {self.median_paths}", file=file)
+        print(
+            f"Minimum shortest paths per pair: {self.min_paths} "
+            f"({self.single_path_share:.0%} of the pairs have a single one)",
+            file=file,
+        )
+        histogram = ", ".join(f"{hops}: {num}" for hops, num in self.hop_histogram.items())
+        print(f"Pairs per hop count: {histogram}", file=file)
+
+    def write_json(self, file: TextIO | None = None):
+        """Write all statistics as a JSON object, e.g. to compare them in CI."""
+        file = file or sys.stdout
+        data = asdict(self)
+        data["hop_histogram"] = {str(hops): num for hops, num in self.hop_histogram.items()}
+        json.dump(data, file, indent=2)
+        file.write("\n")
+
+
+def _weighted_median(values: list[tuple[int, int]]) -> int:
+    """Return the median of `(value, weight)` pairs."""
+    half = sum(weight for _, weight in values) / 2
+    cumulative = 0
+    for value, weight in sorted(values):
+        cumulative += weight
+        if cumulative >= half:
+            return value
+    return 0
+
+
+def topology_stats(network: "Network") -> TopologyStats:
+    """Compute the hop-count and path-diversity statistics of an elaborated network."""
+    graph = network.graph
+    engine = RouteEngine(graph)
+    routers = set(graph.get_rt_nodes(with_obj=False))
+    roles = [(ni.name, ni.is_mgr(), ni.is_sbr()) for ni in graph.get_ni_nodes()]
+    stats = TopologyStats(name=network.name)
+    total_weight = total_hops = single_path_weight = 0
+    # The number of shortest paths grows exponentially with the distance on a mesh,
+    # which makes their median more telling than their mean
+    path_diversity: dict[tuple[int, int], int] = {}
+    histogram: dict[int, int] = {}
+    for src, src_mgr, src_sbr in roles:
+        path_counts = engine.path_counts(src, routers)
+        for dst, dst_mgr, dst_sbr in roles:
+            weight = (src_mgr and dst_sbr) + (src_sbr and dst_mgr)
+            if src == dst or not weight:
+                continue
+            stats.num_pairs += 1
+            if (counts := path_counts.get(dst)) is None:
+                stats.num_unreachable += 1
+                continue
+            hops, num_paths = counts[0] - 1, counts[1]
+            total_weight += weight
+            total_hops += weight * hops
+            if num_paths == 1:
+                single_path_weight += weight
+            path_diversity[(num_paths, weight)] = path_diversity.get((num_paths, weight), 0) + 1
+            histogram[hops] = histogram.get(hops, 0) + 1
+    if total_weight:
+        stats.avg_hops = total_hops / total_weight
+        stats.diameter = max(histogram)
+        stats.min_paths = min(num_paths for num_paths, _ in path_diversity)
+        stats.median_paths = _weighted_median(
+            [(num_paths, weight * num) for (num_paths, weight), num in path_diversity.items()]
+        )
+        stats.single_path_share = single_path_weight / total_weight
+    stats.hop_histogram = dict(sorted(histogram.items()))
+    return stats
@@ -14,6 +14,7 @@
 
 import math
 import random
+from fractions import Fraction
 from pathlib import Path
 
 import ruamel.yaml
@@ -21,26 +22,10 @@ from pydantic import ValidationError
 
 from floogen.model.config import ConfigModel, OneOrMany
 from floogen.model.network import Network
-from floogen.model.routing import XYDirections
+from floogen.model.routing import RouteMap, XYDirections
+from floogen.model.traffic_patterns import MESH_TRAFFIC_TYPES
 from floogen.utils import clog2
 
-# Built-in, mesh-wide algorithmic traffic patterns supported by `gen_traffic_builtin`.
-MESH_TRAFFIC_TYPES = [
-    "hbm",
-    "uniform",
-    "onehop",
-    "bit_complement",
-    "bit_reverse",
-    "bit_rotation",
-    "neighbor",
-    "shuffle",
-    "transpose",
-    "tornado",
-    "hotspot",
-    "hotspot_boundary",
-    "matmul",
-]
-
 # Seeded for reproducibility of the `uniform` traffic pattern.
 random.seed(42)
 
@@ -205,12 +190,25 @@ def resolve_traffic_model(
     return traffic_model
 
 
-def print_traffic_model(traffic_model: Traffic):
-    """Print a summary of all traffic flows in the traffic model."""
+def print_traffic_model(traffic_model: Traffic, sam: RouteMap | None = None):
+    """Print a summary of all traffic flows in the traffic model.
+
+    If the system address map `sam` is given, every address is annotated with the
+    endpoint that owns it.
+    """
+
+    def _addr_str(addr: int | None) -> str:
+        if addr is None:
+            return "N/A"
+        rule = sam.lookup(addr) if sam is not None else None
+        if rule is None or rule.desc is None:
+            return hex(addr)
+        return f"{hex(addr)} ({rule.render_desc()})"
+
     print("\n=== Traffic Model ===")
     for i, flow in enumerate(traffic_model.traffic_flows):
-        init_addr_str = hex(flow.initiator_addr) if flow.initiator_addr is not None else "N/A"
-        ep_addr_str = hex(flow.endpoint_addr) if flow.endpoint_addr is not None else "N/A"
+        init_addr_str = _addr_str(flow.initiator_addr)
+        ep_addr_str = _addr_str(flow.endpoint_addr)
         print(f"\n  Flow [{i}]: '{flow.name}'")
         print(f"    Initiator : {flow.initiator}  addr={init_addr_str}")
         print(f"    Endpoint  : {flow.endpoint}  addr={ep_addr_str}")
@@ -258,10 +256,12 @@ def _gen_job_str(
     )
 
 
-def _emit_jobs(jobs: str, outdir: Path, filename: str, idx: int):
-    """Emit jobs to a job file."""
+def _emit_jobs(jobs: str, outdir: Path, filename: str, idx: int) -> Path:
+    """Emit jobs to a job file and return its path."""
     outdir.mkdir(parents=True, exist_ok=True)
-    (outdir / f"{filename}_{idx}.txt").write_text(jobs, encoding="utf-8")
+    job_file = outdir / f"{filename}_{idx}.txt"
+    job_file.write_text(jobs, encoding="utf-8")
+    return job_file
 
 
 def gen_traffic_cfg(
@@ -270,13 +270,14 @@ def gen_traffic_cfg(
     filename: str,
     outdir: Path,
     verbose: bool = False,
-):
-    """Create a traffic model from a traffic configuration file, then generate DMA jobs for all traffic streams and for the given network."""
+) -> list[Path]:
+    """Create a traffic model from a traffic configuration file, then generate DMA jobs for all traffic streams and for the given network. Returns the paths of the emitted job files."""
     traffic_model = parse_traffic_cfg(cfg)
     traffic_model = resolve_traffic_model(traffic_model, network, verbose=verbose)
     if verbose:
-        print_traffic_model(traffic_model)
+        print_traffic_model(traffic_model, network.routing_info.sam)
     _, floonoc_num_y = _mesh_dims(network)
+    job_files = []
     for flow in traffic_model.traffic_flows:
         local_addr = flow.initiator_addr
         ext_addr = flow.endpoint_addr
@@ -312,10 +313,96 @@ def gen_traffic_cfg(
 
         x, y = flow.initiator[0], flow.initiator[1]
         idx = x * floonoc_num_y + y
-        _emit_jobs(wide_jobs, outdir, filename, idx)
+        job_files.append(_emit_jobs(wide_jobs, outdir, filename, idx))
         _log(verbose, f"Emitted wide job with index {idx} (x: {x}, y: {y})")
-        _emit_jobs(narrow_jobs, outdir, filename, idx + 100)
+        job_files.append(_emit_jobs(narrow_jobs, outdir, filename, idx + 100))
         _log(verbose, f"Emitted narrow job with index {idx + 100} (x: {x}, y: {y})")
+    return job_files
+
+
+def pattern_accesses(
+    traffic_type: str, x: int, y: int, num_x: int, num_y: int
+) -> list[tuple[tuple[int, int], str | None, Fraction]]:
+    """Return the accesses of the node at `(x, y)` in a built-in traffic pattern.
+
+    Every access is given as the mesh coordinate of the accessed node, the direction
+    (`"read"`, `"write"`, or `None` for the configured one) and its share of the wide
+    burst length. The `uniform` pattern accesses every other node with an equal share,
+    of which `gen_traffic_builtin` draws one at random instead. Raises a `ValueError` for a
+    pattern the dimensions of the mesh do not support.
+    """
+    one = Fraction(1)
+    if traffic_type == "hbm":
+        # Tile x=0 are the HBM channels; each core reads/writes the channel of its
+        # y coordinate.
+        return [((-1, y), None, one)]
+    if traffic_type == "uniform":
+        others = [(i, j) for i in range(num_x) for j in range(num_y) if (i, j) != (x, y)]
+        return [(dest, None, Fraction(1, len(others))) for dest in others]
+    if traffic_type == "onehop":
+        return [((x, y + 1), None, one)] if (x, y) == (0, 0) else []
+    if traffic_type == "bit_complement":
+        return [((num_x - x - 1, num_y - y - 1), None, one)]
+    if traffic_type == "bit_reverse":
+        # in order to achieve same result as garnet:
+        # change to space where addresses start at 0 and return afterwards
+        straight = x * num_y + y
+        num_destinations = num_x * num_y
+        reverse = straight & 1  # LSB
+        num_bits = clog2(num_destinations)
+        for _ in range(1, num_bits):
+            reverse <<= 1
+            straight >>= 1
+            reverse |= straight & 1  # LSB
+        return [((reverse % num_x, reverse // num_x), None, one)]
+    if traffic_type == "bit_rotation":
+        source = x * num_y + y
+        num_destinations = num_x * num_y
+        if source % 2 == 0:
+            ext = source // 2
+        else:  # (source % 2 == 1)
+            ext = (source // 2) + (num_destinations // 2)
+        return [((ext % num_x, ext // num_x), None, one)]
+    if traffic_type == "neighbor":
+        return [(((x + 1) % num_x, y), None, one)]
+    if traffic_type == "shuffle":
+        source = x * num_y + y
+        num_destinations = num_x * num_y
+        if source < num_destinations // 2:
+            ext = source * 2
+        else:
+            ext = (source * 2) - num_destinations + 1
+        return [((ext % num_x, ext // num_x), None, one)]
+    if traffic_type == "transpose":
+        if max(num_x, num_y) % min(num_x, num_y):
+            raise ValueError(
+                f"The 'transpose' pattern requires the larger dimension of the mesh to be a "
+                f"multiple of the smaller one, which a {num_x}x{num_y} mesh is not"
+            )
+        if num_x == num_y:
+            dest_x, dest_y = y, x
+        elif num_y > num_x:
+            dest_x = y - (y // num_x) * num_x
+            dest_y = x + (y // num_x) * num_x
+        else:
+            dest_x = y + (x // num_y) * num_y
+            dest_y = x - (x // num_y) * num_y
+        return [((dest_x, dest_y), None, one)]
+    if traffic_type == "tornado":
+        return [(((x + math.ceil(num_x / 2) - 1) % num_x, y), None, one)]
+    if traffic_type == "hotspot_boundary":
+        return [((-1, num_y // 2), None, one)]
+    if traffic_type == "hotspot":
+        return [((num_x // 2, num_y // 2), None, one)]
+    if traffic_type == "matmul":
+        # access matrix A from HBM, matrix B from all HBM channels, and write back
+        # matrix C to HBM
+        accesses = [((-1, y), "read", Fraction(1, 2))]
+        accesses += [((-1, (y + i) % num_y), "read", Fraction(1, 2 * num_y)) for i in range(num_y)]
+        return [*accesses, ((-1, y), "write", Fraction(1, 4))]
+    raise ValueError(
+        f"Unknown traffic type: '{traffic_type}'. Supported types: {', '.join(MESH_TRAFFIC_TYPES)}"
+    )
 
 
 def gen_traffic_builtin(
@@ -329,8 +416,8 @@ def gen_traffic_builtin(
     wide_burst_length: int,
     traffic_rw: str,
     verbose: bool = False,
-):
-    """Generate DMA job files for a built-in traffic pattern. Unlike `gen_traffic_cfg`, this does not require a dedicated traffic configuration file."""
+) -> list[Path]:
+    """Generate DMA job files for a built-in traffic pattern. Unlike `gen_traffic_cfg`, this does not require a dedicated traffic configuration file. Returns the paths of the emitted job files."""
 
     if traffic_type not in MESH_TRAFFIC_TYPES:
         raise ValueError(
@@ -350,91 +437,31 @@ def gen_traffic_builtin(
             _log(verbose, f"Warning: No address found for node ({x}, {y})")
         return a
 
+    job_files = []
     for x in range(num_x):
         for y in range(num_y):
             local_addr = addr(x, y)
             wide_length = wide_burst_length * wide_dw // 8 if wide_dw is not None else None
             narrow_length = narrow_burst_length * narrow_dw // 8 if narrow_dw is not None else None
-            if traffic_type == "hbm":
-                # Tile x=0 are the HBM channels; each core reads/writes the channel of its
-                # y coordinate.
-                accesses = [(addr(-1, y), traffic_rw, wide_length)]
-            elif traffic_type == "uniform":
+            if traffic_type == "uniform":
                 ext_x, ext_y = x, y
                 while (ext_x, ext_y) == (x, y):
                     ext_x = random.randint(0, num_x - 1)
                     ext_y = random.randint(0, num_y - 1)
                 accesses = [(addr(ext_x, ext_y), traffic_rw, wide_length)]
-            elif traffic_type == "onehop":
-                if (x, y) != (0, 0):
-                    wide_length = narrow_length = 0
-                    ext_addr = local_addr = 0
-                else:
-                    ext_addr = addr(x, y + 1)
-                accesses = [(ext_addr, traffic_rw, wide_length)]
-            elif traffic_type == "bit_complement":
-                accesses = [(addr(num_x - x - 1, num_y - y - 1), traffic_rw, wide_length)]
-            elif traffic_type == "bit_reverse":
-                # in order to achieve same result as garnet:
-                # change to space where addresses start at 0 and return afterwards
-                straight = x * num_y + y
-                num_destinations = num_x * num_y
-                reverse = straight & 1  # LSB
-                num_bits = clog2(num_destinations)
-                for _ in range(1, num_bits):
-                    reverse <<= 1
-                    straight >>= 1
-                    reverse |= straight & 1  # LSB
-                accesses = [(addr(reverse % num_x, reverse // num_x), traffic_rw, wide_length)]
-            elif traffic_type == "bit_rotation":
-                source = x * num_y + y
-                num_destinations = num_x * num_y
-                if source % 2 == 0:
-                    ext = source // 2
-                else:  # (source % 2 == 1)
-                    ext = (source // 2) + (num_destinations // 2)
-                accesses = [(addr(ext % num_x, ext // num_x), traffic_rw, wide_length)]
-            elif traffic_type == "neighbor":
-                accesses = [(addr((x + 1) % num_x, y), traffic_rw, wide_length)]
-            elif traffic_type == "shuffle":
-                source = x * num_y + y
-                num_destinations = num_x * num_y
-                if source < num_destinations // 2:
-                    ext = source * 2
-                else:
-                    ext = (source * 2) - num_destinations + 1
-                accesses = [(addr(ext % num_x, ext // num_x), traffic_rw, wide_length)]
-            elif traffic_type == "transpose":
-                if num_x == num_y:
-                    dest_x, dest_y = y, x
-                elif num_y > num_x:
-                    assert num_y % num_x == 0, "num_y must be divisible by num_x"
-                    dest_x = y - (y // num_x) * num_x
-                    dest_y = x + (y // num_x) * num_x
-                else:
-                    assert num_x % num_y == 0, "num_x must be divisible by num_y"
-                    dest_x = y + (x // num_y) * num_y
-                    dest_y = x - (x // num_y) * num_y
-                accesses = [(addr(dest_x, dest_y), traffic_rw, wide_length)]
-            elif traffic_type == "tornado":
-                dest_x = (x + math.ceil(num_x / 2) - 1) % num_x
-                accesses = [(addr(dest_x, y), traffic_rw, wide_length)]
-            elif traffic_type == "hotspot_boundary":
-                accesses = [(addr(-1, num_y // 2), traffic_rw, wide_length)]
-            elif traffic_type == "hotspot":
-                accesses = [(addr(num_x // 2, num_y // 2), traffic_rw, wide_length)]
-            else:  # traffic_type == "matmul"
-                # access matrix A from HBM
+            elif traffic_type == "onehop" and (x, y) != (0, 0):
+                # Idle nodes still get (empty) job files
+                wide_length = narrow_length = 0
+                local_addr = 0
+                accesses = [(0, traffic_rw, wide_length)]
+            else:
                 accesses = [
-                    (addr(-1, y), "read", None if wide_length is None else wide_length // 2)
-                ]
-                # access matrix B from HBM
-                for i in range(num_y):
-                    length = None if wide_length is None else (wide_length // 2) // num_y
-                    accesses += [(addr(-1, (y + i) % num_y), "read", length)]
-                # writeback of matrix C to HBM
-                accesses += [
-                    (addr(-1, y), "write", None if wide_length is None else wide_length // 4)
+                    (
+                        addr(*dest),
+                        access_rw or traffic_rw,
+                        None if wide_length is None else math.floor(wide_length * share),
+                    )
+                    for dest, access_rw, share in pattern_accesses(traffic_type, x, y, num_x, num_y)
                 ]
 
             wide_jobs = ""
@@ -455,5 +482,6 @@ def gen_traffic_builtin(
                     narrow_jobs += _gen_job_str(narrow_length, src_addr, dst_addr)
 
             idx = x * num_y + y
-            _emit_jobs(wide_jobs, outdir, filename, idx)
-            _emit_jobs(narrow_jobs, outdir, filename, idx + 100)
+            job_files.append(_emit_jobs(wide_jobs, outdir, filename, idx))
+            job_files.append(_emit_jobs(narrow_jobs, outdir, filename, idx + 100))
+    return job_files
@@ -0,0 +1,28 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Names of the built-in traffic patterns.
+
+Kept apart from `floogen.model.traffic`, so that the CLI can offer them as choices
+without importing the network models.
+"""
+
+# Built-in, mesh-wide algorithmic traffic patterns supported by `gen_traffic_builtin`.
+MESH_TRAFFIC_TYPES = [
+    "hbm",
+    "uniform",
+    "onehop",
+    "bit_complement",
+    "bit_reverse",
+    "bit_rotation",
+    "neighbor",
+    "shuffle",
+    "transpose",
+    "tornado",
+    "hotspot",
+    "hotspot_boundary",
+    "matmul",
+]
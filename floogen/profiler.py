@@ -0,0 +1,161 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Generation-time profiler, enabled with `floogen --profile`.
+
+The stages of the pipeline - parsing, elaboration, rendering and formatting - are
+marked with `stage()`, which does nothing unless a `Profiler` is active. While one is,
+every stage records its wall time and the peak resident set size (RSS) of the process
+at its end, and the calls to a few hot functions are counted.
+
+Stages that run more than once, e.g. `format` for several batches, are accumulated.
+Work done in worker processes (`-j N`) is accounted to the stage that waits for it,
+but the call counts only cover the main process.
+"""
+
+import functools
+import importlib
+import json
+import sys
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import TextIO
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+HOT_FUNCTIONS = (
+    "networkx:shortest_path",
+    "pydantic:BaseModel.model_validate",
+    "pydantic:BaseModel.model_copy",
+    "floogen.model.route_engine:RouteEngine._bfs",
+    "floogen.utils:VeribleFormatter._format_inplace",
+)
+"""Functions whose calls are counted, as `module:qualified.name`."""
+
+_active: "Profiler | None" = None
+
+
+def peak_rss() -> float | None:
+    """Return the peak resident set size of the process so far in MiB, if available."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, but in KiB on Linux
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+
+@contextmanager
+def stage(name: str) -> Generator[None, None, None]:
+    """Mark a stage of the pipeline, which is timed if a `Profiler` is active."""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+
+class Profiler:
+    """Records the stages of a `floogen` run and counts calls to `HOT_FUNCTIONS`.
+
+    Use it as a context manager around the run, and `report()` the result afterwards.
+    """
+
+    def __init__(self, hot_functions: tuple[str, ...] = HOT_FUNCTIONS):
+        self.hot_functions = hot_functions
+        self.stages: dict[str, dict] = {}
+        self.calls: dict[str, int] = dict.fromkeys(hot_functions, 0)
+        self.total = 0.0
+        self._start = 0.0
+        self._patches: list[tuple[object, str, object]] = []
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another profiler is already active")
+        _active = self
+        for spec in self.hot_functions:
+            self._count_calls(spec)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        self.total = time.perf_counter() - self._start
+        for owner, attr, orig in reversed(self._patches):
+            setattr(owner, attr, orig)
+        self._patches.clear()
+        _active = None
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        """Time a stage and record the peak RSS at its end."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"time": 0.0, "count": 0})
+            entry["time"] += time.perf_counter() - start
+            entry["count"] += 1
+            entry["peak_rss"] = peak_rss()
+
+    def _count_calls(self, spec: str):
+        """Wrap the function given by `spec` to count its calls, until the profiler exits."""
+        import inspect
+
+        module_name, qualname = spec.split(":")
+        owner = importlib.import_module(module_name)
+        *path, attr = qualname.split(".")
+        for name in path:
+            owner = getattr(owner, name)
+        orig = inspect.getattr_static(owner, attr)
+        func = orig.__func__ if isinstance(orig, (classmethod, staticmethod)) else orig
+
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            self.calls[spec] += 1
+            return func(*args, **kwargs)
+
+        wrapper = type(orig)(counted) if isinstance(orig, (classmethod, staticmethod)) else counted
+        setattr(owner, attr, wrapper)
+        self._patches.append((owner, attr, orig))
+
+    def as_dict(self) -> dict:
+        """Return the profile as a JSON-serializable dictionary."""
+        return {
+            "total": {"time": self.total, "peak_rss": peak_rss()},
+            "stages": [{"name": name, **entry} for name, entry in self.stages.items()],
+            "calls": {spec.replace(":", "."): count for spec, count in self.calls.items()},
+        }
+
+    def report(self, fmt: str = "table", file: TextIO | None = None):
+        """Print the profile as a `table` or as `json`, to stderr by default."""
+        file = file or sys.stderr
+        profile = self.as_dict()
+        if fmt == "json":
+            json.dump(profile, file, indent=2)
+            print(file=file)
+            return
+
+        def _rss(value: float | None) -> str:
+            return "-" if value is None else f"{value:.1f}"
+
+        rows = [(s["name"], s["count"], s["time"], s["peak_rss"]) for s in profile["stages"]]
+        rows.append(("total", 1, profile["total"]["time"], profile["total"]["peak_rss"]))
+        width = max(len(name) for name, *_ in rows)
+        print(
+            f"{'Stage':<{width}}  {'Runs':>5}  {'Time [s]':>9}  {'Peak RSS [MiB]':>14}", file=file
+        )
+        for name, count, elapsed, rss in rows:
+            print(f"{name:<{width}}  {count:>5}  {elapsed:>9.3f}  {_rss(rss):>14}", file=file)
+        print(file=file)
+        width = max(len(name) for name in profile["calls"])
+        print(f"{'Function':<{width}}  {'Calls':>8}", file=file)
+        for name, count in profile["calls"].items():
+            print(f"{name:<{width}}  {count:>8}", file=file)
@@ -64,7 +64,11 @@ def handle_query(network, expr):
         "abs": abs,
     }
 
-    env = dict(safe_builtins)
+    def lookup(addr):
+        """Return the rule of the system address map whose range contains `addr`."""
+        return network.routing_info.sam.lookup(addr)
+
+    env = dict(safe_builtins, lookup=lookup)
     env.update({k: ConfigNS(v) for k, v in data.items()})
 
     try:
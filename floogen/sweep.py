@@ -0,0 +1,288 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Latency and throughput of a network over a sweep of the injection rate.
+
+A sweep evaluates every combination of traffic pattern, burst length and injection
+rate, and groups the points into one `Curve` per pattern and burst length. The rate is
+given as the flits per cycle the busiest initiator offers, like the injection ratio
+the DMA test nodes take as `TRAFFIC_INJ_RATIO`, where one flit per cycle is the peak.
+Every point is evaluated with one of two methods:
+
+- `queueing`: An analytical estimate over the routed channel loads. Every channel is
+  treated as an M/D/1 queue that serves a burst in as many cycles as it has beats, and
+  the latency of a flow is its zero-load latency plus the mean waiting time at every
+  channel along its route. Cheap enough for large meshes and fine-grained sweeps.
+- `sim`: The flit-level simulation of `floogen sim`, which also captures the effects of
+  wormhole switching and the limited buffering of the routers.
+
+The points are independent, so they are distributed over a process pool. The result
+of every point is cached, keyed by the network configuration and the settings of the
+point, so that repeating or extending a sweep only evaluates the new points.
+"""
+
+import csv
+import hashlib
+import itertools
+import json
+import math
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, NamedTuple, TextIO
+
+from floogen import cache
+from floogen.model.flit_sim import FIFO_DEPTH, FlitSimulator
+from floogen.model.link_load import FlowRouter, TrafficMatrix, pattern_matrix
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+METHODS = ["queueing", "sim"]
+"""The methods a point can be evaluated with."""
+
+
+class SweepTask(NamedTuple):
+    """The settings of a single point of a sweep."""
+
+    traffic_type: str
+    traffic_rw: str
+    burst_length: int
+    injection_rate: float
+    method: str = "queueing"
+    cycles: int = 10000
+    warmup: int = 1000
+    fifo_depth: int = FIFO_DEPTH
+    seed: int = 0
+
+
+@dataclass
+class SweepPoint:
+    """The latency and throughput at one injection rate."""
+
+    injection_rate: float
+    """The flits per cycle the busiest initiator offers."""
+    offered: float
+    """The flits per cycle offered to the whole network."""
+    accepted: float
+    """The flits per cycle the whole network delivers."""
+    avg_latency: float
+    """The average latency of a burst in cycles, infinite if the network saturates."""
+    p99_latency: float | None
+    """The 99th percentile of the latency in cycles, only known from a simulation."""
+    saturated: bool
+    """Whether the network does not keep up with the offered traffic."""
+
+
+@dataclass
+class Curve:
+    """The points of a sweep for one traffic pattern and burst length."""
+
+    traffic_type: str
+    burst_length: int
+    points: list[SweepPoint] = field(default_factory=list)
+    error: str | None = None
+    """Why the pattern could not be evaluated, in which case there are no points."""
+
+    @property
+    def saturation_rate(self) -> float | None:
+        """The lowest injection rate of the sweep at which the network saturates."""
+        return next((p.injection_rate for p in self.points if p.saturated), None)
+
+
+class QueueingEstimate:
+    """Estimates the latency of a traffic matrix from the loads of the channels it uses."""
+
+    def __init__(self, network: "Network", matrix: TrafficMatrix, router: FlowRouter | None = None):
+        router = router or FlowRouter(network)
+        loads = router.link_loads(matrix)
+        self.max_load = max(loads.values(), default=0.0)
+        self.total_rate = sum(matrix.values())
+        # The rate of every flow, with the loads of the channels along its route
+        self.flows: list[tuple[float, list[float]]] = []
+        for (initiator, target, rw), rate in matrix.items():
+            response = rw == "read"
+            src, dst = (target, initiator) if response else (initiator, target)
+            path = router.path(src, dst, response)
+            self.flows.append((rate, [loads[link] for link in itertools.pairwise(path)]))
+
+    def run(self, injection_rate: float, burst_length: int) -> SweepPoint:
+        """Estimate the latency and throughput at the injection rate."""
+        offered = injection_rate * self.total_rate
+        utilization = injection_rate * self.max_load
+        if utilization >= 1:
+            return SweepPoint(
+                injection_rate=injection_rate,
+                offered=offered,
+                accepted=offered / utilization,
+                avg_latency=math.inf,
+                p99_latency=None,
+                saturated=True,
+            )
+        latency = 0.0
+        for rate, route_loads in self.flows:
+            # The head flit takes a cycle per hop, the rest of the burst follows it
+            flow_latency = len(route_loads) - 1 + burst_length - 1
+            for load in route_loads:
+                rho = injection_rate * load
+                flow_latency += rho * burst_length / (2 * (1 - rho))
+            latency += rate * flow_latency
+        return SweepPoint(
+            injection_rate=injection_rate,
+            offered=offered,
+            accepted=offered,
+            avg_latency=latency / self.total_rate if self.total_rate else math.nan,
+            p99_latency=None,
+            saturated=False,
+        )
+
+
+# The network of a sweep worker process and the models built from it, see `run_sweep`.
+_worker_network: list["Network"] = []
+_worker_models: dict[tuple, QueueingEstimate | FlitSimulator] = {}
+
+
+def _init_sweep_worker(network: "Network"):
+    """Receive the network once per worker, rather than once per point."""
+    _worker_network[:] = [network]
+    _worker_models.clear()
+
+
+def _evaluate(task: SweepTask) -> SweepPoint | str:
+    """Evaluate a point in a worker process, returning the error if it fails."""
+    network = _worker_network[0]
+    model_key = (task.traffic_type, task.traffic_rw, task.method, task.fifo_depth)
+    try:
+        if (model := _worker_models.get(model_key)) is None:
+            matrix = pattern_matrix(network, task.traffic_type, task.traffic_rw)
+            if task.method == "sim":
+                model = FlitSimulator(network, matrix, task.fifo_depth)
+            else:
+                model = QueueingEstimate(network, matrix)
+            _worker_models[model_key] = model
+    except ValueError as e:
+        return str(e)
+    if isinstance(model, QueueingEstimate):
+        return model.run(task.injection_rate, task.burst_length)
+    result = model.run(task.injection_rate, task.burst_length, task.cycles, task.warmup, task.seed)
+    return SweepPoint(
+        injection_rate=task.injection_rate,
+        offered=result.offered,
+        accepted=result.accepted,
+        avg_latency=result.avg_latency,
+        p99_latency=result.percentile(99),
+        saturated=result.saturated,
+    )
+
+
+def _point_key(config_key: str, task: SweepTask) -> str:
+    """Return the cache key of a point of a network."""
+    digest = hashlib.sha256(config_key.encode())
+    digest.update(json.dumps(task._asdict(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def run_sweep(
+    network: "Network", tasks: list[SweepTask], jobs: int = 1, use_cache: bool = True
+) -> list[Curve]:
+    """Evaluate the points of a sweep, using up to `jobs` worker processes.
+
+    Returns one curve per traffic pattern and burst length, in the order of `tasks`.
+    """
+    config_key = cache.cache_key(network) if use_cache else ""
+    results: dict[SweepTask, SweepPoint | str] = {}
+    if use_cache:
+        for task in tasks:
+            if (cached := cache.load_result(_point_key(config_key, task))) is not None:
+                results[task] = SweepPoint(**cached)
+    missing = [task for task in tasks if task not in results]
+    if jobs > 1 and len(missing) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(missing)),
+            initializer=_init_sweep_worker,
+            initargs=(network,),
+        ) as pool:
+            evaluated = list(pool.map(_evaluate, missing))
+    else:
+        _init_sweep_worker(network)
+        evaluated = [_evaluate(task) for task in missing]
+    for task, point in zip(missing, evaluated, strict=True):
+        results[task] = point
+        if use_cache and isinstance(point, SweepPoint):
+            cache.store_result(_point_key(config_key, task), asdict(point))
+
+    curves: dict[tuple[str, int], Curve] = {}
+    for task in tasks:
+        curve = curves.setdefault(
+            (task.traffic_type, task.burst_length),
+            Curve(traffic_type=task.traffic_type, burst_length=task.burst_length),
+        )
+        if isinstance(point := results[task], str):
+            curve.error = point
+        elif curve.error is None:
+            curve.points.append(point)
+    for curve in curves.values():
+        if curve.error is not None:
+            curve.points = []
+    return list(curves.values())
+
+
+CSV_FIELDS = [
+    "traffic_type",
+    "burst_length",
+    "injection_rate",
+    "offered",
+    "accepted",
+    "avg_latency",
+    "p99_latency",
+    "saturated",
+    "saturation_rate",
+]
+
+
+def write_csv(curves: list[Curve], file: TextIO | None = None):
+    """Write one row per point, along with the saturation rate of its curve."""
+    writer = csv.DictWriter(file or sys.stdout, fieldnames=CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for curve in curves:
+        for point in curve.points:
+            writer.writerow(
+                {
+                    "traffic_type": curve.traffic_type,
+                    "burst_length": curve.burst_length,
+                    **{
+                        name: round(value, 4) if isinstance(value, float) else value
+                        for name, value in asdict(point).items()
+                    },
+                    "saturation_rate": curve.saturation_rate,
+                }
+            )
+
+
+def _json_point(point: SweepPoint) -> dict:
+    """Return a point as JSON data, where infinite latencies are not valid and `null`."""
+    data = asdict(point)
+    if not math.isfinite(point.avg_latency):
+        data["avg_latency"] = None
+    return data
+
+
+def write_json(curves: list[Curve], file: TextIO | None = None):
+    """Write every curve with its points and saturation rate."""
+    file = file or sys.stdout
+    data = [
+        {
+            "traffic_type": curve.traffic_type,
+            "burst_length": curve.burst_length,
+            "saturation_rate": curve.saturation_rate,
+            "points": [_json_point(point) for point in curve.points],
+        }
+        for curve in curves
+        if curve.error is None
+    ]
+    json.dump(data, file, indent=2)
+    file.write("\n")
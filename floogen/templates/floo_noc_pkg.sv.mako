@@ -4,6 +4,12 @@
 <%!
     import datetime
 %>\
+## Writes the fragments of a large declaration one by one, instead of joining them first.
+<%def name="stream(fragments)">\
+% for fragment in fragments:
+${fragment}\
+% endfor
+</%def>\
 // Copyright ${datetime.datetime.now().year} ETH Zurich and University of Bologna.
 // Solderpad Hardware License, Version 0.51, see LICENSE for details.
 // SPDX-License-Identifier: SHL-0.51
@@ -50,9 +56,9 @@ package floo_${name}_noc_pkg;
     id_t end_addr;
   } route_map_rule_t;
 
-  ${noc.routing.sam.render(aw=noc.routing.addr_width)}
+  ${stream(noc.routing.sam.iter_render(aw=noc.routing.addr_width))}
   % if noc.routing.en_collective:
-    ${noc.routing.collective_sam.render(aw=noc.routing.addr_width)}
+    ${stream(noc.routing.collective_sam.iter_render(aw=noc.routing.addr_width))}
   %endif
 % else:
   localparam int unsigned NumSamRules = 1;
@@ -61,7 +67,7 @@ package floo_${name}_noc_pkg;
 % endif
 
 % if noc.routing.route_algo.value == "SourceRouting":
-  ${noc.render_ni_tables()}
+  ${stream(noc.iter_ni_tables())}
 % endif
 
   ${noc.routing.render_route_cfg(name="RouteCfg")}
@@ -5,8 +5,9 @@
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
 import pytest
+from pydantic import ValidationError
 
-from floogen.model.routing import AddrRange, RouteMap, RouteMapRule, SimpleId
+from floogen.model.routing import AddrRange, RouteMap, RouteMapRule, SimpleId, _min_strokes
 
 
 def test_addr_range_creation1():
@@ -54,8 +55,7 @@ def test_addr_range_creation4():
 
 def test_addr_range_arr_idx():
     """Test the arr_idx method of an AddrRange object."""
-    addr_range = AddrRange.from_base_size(50, 100)
-    addr_range.set_arr((1,), (5,))
+    addr_range = AddrRange.from_base_size(50, 100).set_arr((1,), (5,))
     assert addr_range.start == 150
     assert addr_range.end == 250
     assert addr_range.size == 100
@@ -64,6 +64,16 @@ def test_addr_range_arr_idx():
     assert addr_range.arr_dim == (5,)
 
 
+def test_addr_range_is_frozen():
+    """`set_arr` returns a new range, so ranges can be shared."""
+    addr_range = AddrRange.from_base_size(50, 100)
+    element = addr_range.set_arr((1,), (5,))
+    assert (addr_range.start, addr_range.arr_idx) == (50, None)
+    assert (element.start, element.arr_idx) == (150, (1,))
+    with pytest.raises(ValidationError):
+        addr_range.end = 0  # ty: ignore[invalid-assignment]
+
+
 def test_invalid_addr_range():
     """Test the validation of an AddrRange object."""
     with pytest.raises(ValueError):
@@ -208,6 +218,90 @@ def test_trim():
         RouteMapRule(addr_range=AddrRange(start=31, end=40), dest=SimpleId(id=2)),
     ]
     assert routing_table.rules == expected_rules
+    # The merged range is a new one, the rules passed in are left alone
+    assert rule1.addr_range == AddrRange(start=0, end=10)
+
+
+def _route_map() -> RouteMap:
+    """Return a map with a gap between 20 and 30, and the rules out of address order."""
+    return RouteMap(
+        name="test_map",
+        rules=[
+            RouteMapRule(addr_range=AddrRange(start=30, end=40), dest=SimpleId(id=2)),
+            RouteMapRule(addr_range=AddrRange(start=0, end=10), dest=SimpleId(id=1)),
+            RouteMapRule(addr_range=AddrRange(start=10, end=20), dest=SimpleId(id=1)),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ("addr", "dest"), [(0, 1), (9, 1), (10, 1), (19, 1), (20, None), (30, 2), (39, 2), (40, None)]
+)
+def test_lookup(addr, dest):
+    rule = _route_map().lookup(addr)
+    assert getattr(rule, "dest", None) == (SimpleId(id=dest) if dest is not None else None)
+
+
+def test_insert():
+    routing_table = _route_map()
+    routing_table.insert(RouteMapRule(addr_range=AddrRange(start=20, end=30), dest=SimpleId(id=3)))
+    assert len(routing_table) == 4
+    assert getattr(routing_table.lookup(25), "dest", None) == SimpleId(id=3)
+    for start, end in [(15, 25), (35, 45), (0, 50)]:
+        rule = RouteMapRule(addr_range=AddrRange(start=start, end=end), dest=SimpleId(id=4))
+        with pytest.raises(ValueError, match="overlaps"):
+            routing_table.insert(rule)
+    assert len(routing_table) == 4
+
+
+def test_lookup_after_trim():
+    routing_table = _route_map()
+    routing_table.trim()
+    assert [(r.addr_range.start, r.addr_range.end) for r in routing_table.rules] == [
+        (30, 40),
+        (0, 20),
+    ]
+    assert getattr(routing_table.lookup(5), "addr_range", None) == AddrRange(start=0, end=20)
+    assert getattr(routing_table.lookup(35), "dest", None) == SimpleId(id=2)
+
+
+@pytest.mark.parametrize(
+    ("colors", "num_strokes"),
+    [("", 0), ("A", 1), ("AB", 2), ("ABA", 2), ("ABAB", 3), ("ABCBA", 3), ("ABACADA", 4)],
+)
+def test_min_strokes(colors, num_strokes):
+    strokes = _min_strokes(list(colors))
+    assert len(strokes) == num_strokes
+    painted = [""] * len(colors)
+    for first, last in strokes:
+        painted[first : last + 1] = [colors[first]] * (last - first + 1)
+    assert "".join(painted) == colors
+
+
+def _decode(rules: list[RouteMapRule], addr: int) -> RouteMapRule | None:
+    """Decode like the hardware, where the rule rendered first takes precedence."""
+    return next((r for r in rules if r.addr_range.start <= addr < r.addr_range.end), None)
+
+
+def test_minimize():
+    # Destination 1 is interrupted by 2 and 3, and there is a gap before the last rule
+    dests = [1, 2, 1, 3, 1, 2, 2, 1]
+    rules = [
+        RouteMapRule(addr_range=AddrRange(start=i, end=i + 1), dest=SimpleId(id=d))
+        for i, d in enumerate(dests)
+    ]
+    rules.append(RouteMapRule(addr_range=AddrRange(start=10, end=11), dest=SimpleId(id=1)))
+    routing_table = RouteMap(name="test_map", rules=rules)
+    routing_table.minimize()
+    # One rule for 1 below 2, 3 and 2 again, and one after the gap, which stays unmapped
+    assert len(routing_table) == 5
+    assert routing_table.num_unminimized_rules == 9
+    for addr in range(12):
+        expected = getattr(_decode(rules, addr), "dest", None)
+        assert getattr(_decode(routing_table.rules, addr), "dest", None) == expected
+        assert getattr(routing_table.lookup(addr), "dest", None) == expected
+    with pytest.raises(ValueError, match="minimized"):
+        routing_table.trim()
 
 
 def test_rdl_addrmap_grp_addr_range_scalar_and_list():
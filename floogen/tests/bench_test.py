@@ -0,0 +1,69 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the scaling benchmarks."""
+
+import json
+
+import pytest
+
+from floogen import bench
+from floogen.model.network import Network
+
+
+@pytest.mark.parametrize("case", bench.suite("quick"), ids=lambda case: case.name)
+def test_suite_configs_are_valid(case):
+    assert Network.model_validate(case.config).name == case.name
+
+
+def test_full_suite_extends_quick_suite():
+    quick = {case.name for case in bench.suite("quick")}
+    full = {case.name for case in bench.suite("full")}
+    assert quick < full
+    assert {"mesh_xy_64x64", "mesh_id_64x64", "mesh_src_64x64"} <= full
+
+
+def test_run_case():
+    result = bench.run_case(bench.Case("mesh", bench.mesh_config(2, 2, "SRC")), repeat=1)
+    assert set(result["stages"]) == set(bench.STAGES)
+    for entry in result["stages"].values():
+        assert entry["time"] >= 0
+        assert entry["memory"] >= 0
+    assert result["total"] == pytest.approx(sum(e["time"] for e in result["stages"].values()))
+
+
+def _results(**stage_times) -> dict:
+    """Return results of a single case with the given stage times."""
+    return {"cases": {"mesh": {"stages": {s: {"time": t} for s, t in stage_times.items()}}}}
+
+
+def test_compare_reports_regressions():
+    baseline = _results(validate=0.1, render=0.1, create_network=0.001)
+    results = _results(validate=0.2, render=0.11, create_network=0.003)
+    regressions = bench.compare(results, baseline, threshold=0.25)
+    # `render` is within the threshold, `create_network` too fast to be compared
+    assert len(regressions) == 1
+    assert regressions[0].startswith("mesh: validate")
+
+
+def test_compare_skips_unknown_cases():
+    assert not bench.compare(_results(validate=1.0), {"cases": {}})
+
+
+def test_main_saves_and_compares(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    assert bench.main(["-k", "mesh_xy_2x2", "--repeat", "1", "--save", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    assert list(saved["cases"]) == ["mesh_xy_2x2"]
+    assert "mesh_xy_2x2" in capsys.readouterr().out
+    # Make the baseline unreachably fast
+    for entry in saved["cases"]["mesh_xy_2x2"]["stages"].values():
+        entry["time"] = 1e-9
+    saved["cases"]["mesh_xy_2x2"]["stages"]["render"]["time"] = 1e-6
+    baseline.write_text(json.dumps(saved))
+    args = ["-k", "mesh_xy_2x2", "--repeat", "1", "--no-memory", "--min-time", "0"]
+    assert bench.main([*args, "--compare", str(baseline)]) == 1
+    assert "Regression: mesh_xy_2x2: render" in capsys.readouterr().err
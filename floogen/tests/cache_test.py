@@ -0,0 +1,109 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the on-disk cache of elaborated networks."""
+
+import os
+import pathlib
+
+import pytest
+
+from floogen import cache
+from floogen.config_parser import parse_config
+from floogen.model.network import Network
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+
+
+@pytest.fixture(autouse=True)
+def setup_cache_dir(tmp_path, monkeypatch):
+    """Keep the cache of every test in its own temporary directory."""
+    monkeypatch.setenv("FLOOGEN_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def parse(example: str = "axi_mesh_id", overrides=None) -> Network:
+    """Parse an example configuration."""
+    return parse_config(Network, EXAMPLES_DIR / f"{example}.yml", overrides)
+
+
+def test_cache_dir(monkeypatch):
+    monkeypatch.delenv("FLOOGEN_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg")
+    assert cache.cache_dir() == pathlib.Path("/xdg/floogen")
+
+
+def test_cache_key_is_stable():
+    assert cache.cache_key(parse()) == cache.cache_key(parse())
+
+
+def test_cache_key_changes_with_config():
+    assert cache.cache_key(parse("axi_mesh_id")) != cache.cache_key(parse("axi_mesh_src"))
+    assert cache.cache_key(parse(), {"a": "1"}) != cache.cache_key(parse())
+
+
+def test_elaborate_reuses_cached_network(setup_cache_dir):
+    network = cache.elaborate(parse())
+    assert len(list(setup_cache_dir.iterdir())) == 1
+    cached = cache.elaborate(parse())
+    assert cached is not network
+    assert cached.routing_info.sam.render() == network.routing_info.sam.render()
+    for rt, cached_rt in zip(network.graph.get_rt_nodes(), cached.graph.get_rt_nodes()):
+        assert cached_rt.table.render() == rt.table.render()
+
+
+def test_elaborate_without_cache(setup_cache_dir):
+    network = cache.elaborate(parse(), use_cache=False)
+    assert network.graph.get_rt_nodes()
+    assert not setup_cache_dir.exists()
+
+
+def test_unreadable_entry_is_discarded(setup_cache_dir):
+    network = parse()
+    key = cache.cache_key(network)
+    setup_cache_dir.mkdir()
+    (setup_cache_dir / f"{key}.pkl").write_bytes(b"garbage")
+    assert cache.load(key) is None
+    assert not (setup_cache_dir / f"{key}.pkl").exists()
+
+
+def test_evict_least_recently_used(setup_cache_dir):
+    setup_cache_dir.mkdir()
+    for i, name in enumerate(["old", "mid", "new"]):
+        path = setup_cache_dir / f"{name}.pkl"
+        path.write_bytes(bytes(100))
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    cache.evict(setup_cache_dir, max_size=250)
+    assert sorted(p.stem for p in setup_cache_dir.iterdir()) == ["mid", "new"]
+
+
+def test_load_template_reuses_compiled_module(setup_cache_dir, tmp_path):
+    tpl = tmp_path / "hello.txt.mako"
+    tpl.write_text("Hello ${name}!")
+    assert cache.load_template(tpl).render(name="FlooGen") == "Hello FlooGen!"
+    modules = list((setup_cache_dir / "templates").glob("*.py"))
+    assert len(modules) == 1
+    mtime = modules[0].stat().st_mtime_ns
+    assert cache.load_template(tpl).render(name="NoC") == "Hello NoC!"
+    assert modules[0].stat().st_mtime_ns == mtime
+
+
+def test_load_template_recompiles_changed_template(setup_cache_dir, tmp_path):
+    tpl = tmp_path / "hello.txt.mako"
+    tpl.write_text("Hello ${name}!")
+    cache.load_template(tpl)
+    tpl.write_text("Bye ${name}!")
+    assert cache.load_template(tpl).render(name="FlooGen") == "Bye FlooGen!"
+    assert len(list((setup_cache_dir / "templates").glob("*.py"))) == 2
+
+
+def test_load_template_without_writable_cache(monkeypatch, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setenv("FLOOGEN_CACHE_DIR", str(blocker))
+    tpl = tmp_path / "hello.txt.mako"
+    tpl.write_text("Hello ${name}!")
+    assert cache.load_template(tpl).render(name="FlooGen") == "Hello FlooGen!"
@@ -0,0 +1,376 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the command-line interface."""
+
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from floogen import cli
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+REPO_DIR = pathlib.Path(__file__).parents[2]
+
+IMPORT_BUDGET = 0.2
+"""Upper bound on the time to import the CLI, in seconds."""
+
+HEAVY_MODULES = {"networkx", "mako", "pydantic", "ruamel"}
+
+
+def run(monkeypatch, *args) -> int:
+    """Run `floogen` with the given arguments."""
+    monkeypatch.setattr(sys, "argv", ["floogen", *map(str, args)])
+    return cli.main()
+
+
+def test_all_defaults(monkeypatch, capsys, tmp_path):
+    """Without any output selected, the package, top-module and SystemRDL are generated."""
+    outdir = tmp_path / "out"
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    assert run(monkeypatch, "all", "-c", cfg, "-o", outdir, "--no-format") == 0
+    manifest = capsys.readouterr().out.splitlines()
+    assert [pathlib.Path(p).name for p in manifest] == [
+        "floo_axi_mesh_noc_pkg.sv",
+        "floo_axi_mesh_noc.sv",
+        "axi_mesh_addrmap.rdl",
+    ]
+    assert all(pathlib.Path(p).is_file() for p in manifest)
+
+
+def test_all_matches_single_commands(monkeypatch, capsys, tmp_path):
+    """One `all` run produces the same files as the individual commands."""
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    single, combined = tmp_path / "single", tmp_path / "all"
+    run(monkeypatch, "rtl", "-c", cfg, "-o", single, "--no-format")
+    run(monkeypatch, "rdl", "-c", cfg, "-o", single)
+    run(monkeypatch, "schema", "-o", single)
+    run(monkeypatch, "traffic", "-c", cfg, "-o", single / "jobs", "--traffic-type", "onehop")
+    capsys.readouterr()
+    run(
+        monkeypatch,
+        *("all", "-c", cfg, "-o", combined, "--no-format"),
+        *("--pkg", "--top", "--rdl", "--schema", "--traffic-type", "onehop"),
+    )
+    manifest = capsys.readouterr().out.splitlines()
+    assert len(manifest) == len(set(manifest))
+    assert {pathlib.Path(p) for p in manifest} == set(combined.rglob("*.*"))
+    for path in single.rglob("*.*"):
+        assert (combined / path.relative_to(single)).read_text() == path.read_text()
+
+
+def test_all_requires_outdir(monkeypatch, capsys):
+    assert run(monkeypatch, "all", "-c", EXAMPLES_DIR / "axi_mesh_xy.yml") == 1
+    assert "requires an output directory" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("command", ["rtl", "rdl", "all"])
+def test_parallel_rendering_is_deterministic(monkeypatch, capsys, tmp_path, command):
+    """Rendering in parallel produces the same files as rendering one after another."""
+    cfg = EXAMPLES_DIR / "occamy_mesh_src.yml"
+    fmt = ["--no-format"] if command != "rdl" else []
+    run(monkeypatch, command, "-c", cfg, "-o", tmp_path / "seq", *fmt)
+    run(monkeypatch, command, "-c", cfg, "-o", tmp_path / "par", *fmt, "-j", "2")
+    capsys.readouterr()
+    seq_files = sorted(p.relative_to(tmp_path / "seq") for p in (tmp_path / "seq").iterdir())
+    par_files = sorted(p.relative_to(tmp_path / "par") for p in (tmp_path / "par").iterdir())
+    assert seq_files == par_files
+    for path in seq_files:
+        assert (tmp_path / "par" / path).read_text() == (tmp_path / "seq" / path).read_text()
+
+
+def test_parallel_rendering_keeps_stdout_order(monkeypatch, capsys):
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    run(monkeypatch, "rtl", "-c", cfg, "--no-format")
+    sequential = capsys.readouterr().out
+    run(monkeypatch, "rtl", "-c", cfg, "--no-format", "-j", "2")
+    assert capsys.readouterr().out == sequential
+
+
+@pytest.fixture
+def fake_verible(tmp_path):
+    """A stand-in for `verible-verilog-format` that logs its invocations."""
+    script = tmp_path / "fake-verible"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import pathlib, sys\n"
+        f"with open({str(tmp_path / 'calls.log')!r}, 'a') as log:\n"
+        "    log.write(' '.join(sys.argv[1:]) + '\\n')\n"
+        "assert '--inplace' in sys.argv\n"
+        "for arg in sys.argv[1:]:\n"
+        "    if not arg.startswith('-'):\n"
+        "        path = pathlib.Path(arg)\n"
+        "        path.write_text(path.read_text() + '// formatted\\n')\n"
+    )
+    script.chmod(0o755)
+    return script
+
+
+def test_query_lookup(monkeypatch, capsys):
+    """`lookup()` resolves an address to the SAM rule of the endpoint owning it."""
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    assert run(monkeypatch, "query", "-c", cfg, "--no-cache", "lookup(0x2_0000).desc") == 0
+    assert capsys.readouterr().out.strip() == "cluster"
+    assert run(monkeypatch, "query", "-c", cfg, "lookup(0x2_0000).render_desc()") == 0
+    assert capsys.readouterr().out.strip() == "cluster_x0_y2"
+
+
+def test_encoded_tables_are_reported(monkeypatch, capsys, tmp_path):
+    cfg = tmp_path / "axi_mesh_id.yml"
+    example = (EXAMPLES_DIR / "axi_mesh_id.yml").read_text()
+    cfg.write_text(
+        example.replace('route_algo: "ID"', 'route_algo: "ID"\n  table_encoding: minimal')
+    )
+    assert run(monkeypatch, "pkg", "-c", cfg, "--no-cache", "--no-format", "-v") == 0
+    report = capsys.readouterr().err.splitlines()
+    assert "router_0_0: " in report[0]
+    assert report[-1].startswith("Encoded router tables: ")
+
+
+def test_id_order_is_reported(monkeypatch, capsys, tmp_path):
+    cfg = tmp_path / "axi_mesh_id.yml"
+    example = (EXAMPLES_DIR / "axi_mesh_id.yml").read_text()
+    cfg.write_text(example.replace('route_algo: "ID"', 'route_algo: "ID"\n  id_order: auto'))
+    assert run(monkeypatch, "pkg", "-c", cfg, "--no-cache", "--no-format", "-v") == 0
+    report = capsys.readouterr().err.splitlines()
+    assert report[0].startswith("Router table rules per endpoint ID order: insertion ")
+    assert report[1].startswith("Endpoint IDs in ")
+
+
+def test_analyze_compares_the_builtin_patterns(monkeypatch, capsys):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    assert run(monkeypatch, "analyze", "-c", cfg) == 0
+    table = capsys.readouterr().out.splitlines()
+    assert table[0].split()[:3] == ["Traffic", "Max", "load"]
+    assert len(table) == 1 + len(cli.MESH_TRAFFIC_TYPES)
+    assert "not analyzed" in next(line for line in table if line.startswith("hotspot_boundary"))
+
+    assert run(monkeypatch, "analyze", "-c", cfg, "--traffic-type", "uniform", "--top", "2") == 0
+    report = capsys.readouterr().out.splitlines()
+    assert report[1] == "Max link load: 1.067 flits/cycle"
+    assert report[-3] == "Bottleneck links:"
+
+    assert run(monkeypatch, "analyze", "-c", cfg, "--traffic-type", "hotspot_boundary") == 1
+    assert capsys.readouterr().err.startswith("floogen: router_0_0 routes hbm_ni_")
+
+
+def test_analyze_writes_the_loads(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    assert run(monkeypatch, "analyze", "-c", cfg, "-o", tmp_path, "--traffic-type", "uniform") == 0
+    outfile = tmp_path / "nw_mesh_loads.txt"
+    assert capsys.readouterr().out.strip() == str(outfile)
+    report = outfile.read_text().splitlines()
+    assert report[0] == "Traffic: uniform"
+    assert report[1] == "Max link load: 1.067 flits/cycle"
+
+
+def test_analyze_skips_the_patterns_a_mesh_does_not_support(monkeypatch, capsys):
+    # A 3x8 mesh cannot be transposed
+    cfg = EXAMPLES_DIR / "occamy_mesh_xy.yml"
+    assert run(monkeypatch, "analyze", "-c", cfg) == 0
+    table = capsys.readouterr().out.splitlines()
+    assert len(table) == 1 + len(cli.MESH_TRAFFIC_TYPES)
+    transpose = next(line for line in table if line.startswith("transpose"))
+    assert "not analyzed: The 'transpose' pattern requires" in transpose
+    assert run(monkeypatch, "analyze", "-c", cfg, "--traffic-type", "transpose") == 1
+    assert capsys.readouterr().err.startswith("floogen: The 'transpose' pattern requires")
+
+
+def test_traffic_requires_a_mesh_of_routers(monkeypatch, capsys):
+    cfg = EXAMPLES_DIR / "terapool.yml"
+    for command in ("analyze", "sim"):
+        assert run(monkeypatch, command, "-c", cfg) == 1
+        assert "requires a 2D mesh of routers" in capsys.readouterr().err
+
+
+def test_sim_reports_every_rate(monkeypatch, capsys):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    args = ["--traffic-type", "transpose", "--rate", "0.1", "0.2", "--cycles", "500"]
+    assert run(monkeypatch, "sim", "-c", cfg, *args) == 0
+    table = capsys.readouterr().out.splitlines()
+    assert table[0] == "Traffic: transpose"
+    assert table[1].split()[:3] == ["Rate", "Offered", "Accepted"]
+    assert [line.split()[0] for line in table[2:]] == ["0.100", "0.200"]
+
+
+def test_sim_writes_the_results(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    args = ["--traffic-type", "transpose", "--rate", "0.1", "--cycles", "500"]
+    assert run(monkeypatch, "sim", "-c", cfg, "-o", tmp_path, *args) == 0
+    outfile = tmp_path / "nw_mesh_sim.txt"
+    assert capsys.readouterr().out.strip() == str(outfile)
+    table = outfile.read_text().splitlines()
+    assert table[0] == "Traffic: transpose"
+    assert [line.split()[0] for line in table[2:]] == ["0.100"]
+
+
+def test_sweep_writes_the_curves(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    args = ["--traffic-type", "uniform", "transpose", "--rate", "0.5", "0.2", "--format", "json"]
+    assert run(monkeypatch, "sweep", "-c", cfg, "-o", tmp_path, "--no-cache", *args) == 0
+    outfile = tmp_path / "nw_mesh_sweep.json"
+    assert capsys.readouterr().out.strip() == str(outfile)
+    curves = json.loads(outfile.read_text())
+    assert [curve["traffic_type"] for curve in curves] == ["uniform", "transpose"]
+    assert [point["injection_rate"] for point in curves[0]["points"]] == [0.2, 0.5]
+    assert curves[0]["saturation_rate"] is None
+    assert curves[1]["saturation_rate"] == 0.5
+    assert curves[1]["points"][1]["avg_latency"] is None
+
+
+def test_sweep_skips_the_patterns_a_mesh_does_not_support(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "occamy_mesh_xy.yml"
+    args = ["--traffic-type", "uniform", "transpose", "--rate", "0.1", "-j", "2", "-o", tmp_path]
+    assert run(monkeypatch, "sweep", "-c", cfg, "--no-cache", "--format", "json", *args) == 0
+    out = capsys.readouterr()
+    assert "floogen: skipping traffic 'transpose': The 'transpose' pattern requires" in out.err
+    curves = json.loads(pathlib.Path(out.out.strip()).read_text())
+    assert [curve["traffic_type"] for curve in curves] == ["uniform"]
+    assert run(monkeypatch, "sweep", "-c", EXAMPLES_DIR / "terapool.yml", "--no-cache") == 1
+    assert "requires a 2D mesh of routers" in capsys.readouterr().err
+
+
+def test_route_traces_a_route(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "nw_mesh_id.yml"
+    assert run(monkeypatch, "route", "-c", cfg, "cluster_0_0", "cluster_0_1") == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "cluster_ni_0_0 -> cluster_ni_0_1: 2 hop(s)",
+        "  cluster_ni_0_0",
+        "  router_0_0      in 4 -> out 0",
+        "  router_0_1      in 2 -> out 4",
+        "  cluster_ni_0_1",
+    ]
+    assert run(monkeypatch, "route", "-c", cfg, "--all", "-o", tmp_path) == 0
+    outfile = tmp_path / "nw_mesh_hops.csv"
+    assert capsys.readouterr().out.strip() == str(outfile)
+    assert len(outfile.read_text().splitlines()) == 1 + 16
+    assert run(monkeypatch, "route", "-c", cfg, "cluster_0_0") == 1
+    assert "requires a source and a destination" in capsys.readouterr().err
+
+
+def test_failing_template_leaves_no_output(monkeypatch, tmp_path):
+    tpl = tmp_path / "bad.sv.mako"
+    tpl.write_text('line one\n${noc.name}\n<% raise RuntimeError("broken template") %>\n')
+    outdir = tmp_path / "out"
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    with pytest.raises(RuntimeError, match="broken template"):
+        run(monkeypatch, "template", "-c", cfg, "-o", outdir, "--no-format", tpl)
+    assert not list(outdir.iterdir())
+    # The output of an earlier, successful run is kept as it was
+    (outdir / "bad.sv").write_text("previous output\n")
+    with pytest.raises(RuntimeError, match="broken template"):
+        run(monkeypatch, "template", "-c", cfg, "-o", outdir, "--no-format", tpl)
+    assert [path.name for path in outdir.iterdir()] == ["bad.sv"]
+    assert (outdir / "bad.sv").read_text() == "previous output\n"
+
+
+def test_stats_reports_the_topology(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "nw_mesh_xy.yml"
+    assert run(monkeypatch, "stats", "-c", cfg, "--no-cache") == 0
+    out = capsys.readouterr().out
+    assert "Endpoint pairs: 368 (0 unreachable)" in out
+    assert "Diameter: 7 hops" in out
+    assert run(monkeypatch, "stats", "-c", cfg, "--format", "json", "-o", tmp_path) == 0
+    outfile = tmp_path / "nw_mesh_stats.json"
+    assert capsys.readouterr().out.strip() == str(outfile)
+    assert json.loads(outfile.read_text())["num_pairs"] == 368
+
+
+def test_outputs_are_formatted_in_one_batch(monkeypatch, capsys, tmp_path, fake_verible):
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    outdir = tmp_path / "out"
+    run(monkeypatch, "rtl", "-c", cfg, "-o", outdir, "--verible-fmt-bin", fake_verible, "-v")
+    assert "Formatted 2 file(s)" in capsys.readouterr().err
+    assert len((tmp_path / "calls.log").read_text().splitlines()) == 1
+    for path in outdir.iterdir():
+        assert path.read_text().endswith("// formatted\n")
+
+
+def test_formatting_is_split_over_jobs(monkeypatch, capsys, tmp_path, fake_verible):
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    run(monkeypatch, "rtl", "-c", cfg, "--no-format")
+    unformatted = capsys.readouterr().out
+    run(monkeypatch, "rtl", "-c", cfg, "--verible-fmt-bin", fake_verible, "-j", "2")
+    assert len((tmp_path / "calls.log").read_text().splitlines()) == 2
+    formatted = capsys.readouterr().out
+    assert formatted.count("// formatted\n") == 2
+    assert formatted.replace("// formatted\n", "") == unformatted
+
+
+def test_missing_formatter_is_skipped(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    run(monkeypatch, "rtl", "-c", cfg, "--no-format")
+    unformatted = capsys.readouterr().out
+    monkeypatch.setenv("PATH", str(tmp_path))
+    run(monkeypatch, "rtl", "-c", cfg)
+    captured = capsys.readouterr()
+    assert captured.out == unformatted
+    assert captured.err.count("`verible-verilog-format` was not found") == 1
+
+
+def test_streamed_output_matches_stdout(monkeypatch, capsys, tmp_path):
+    """Outputs streamed into a file are identical to the ones printed to stdout."""
+    cfg = EXAMPLES_DIR / "occamy_mesh_src.yml"
+    run(monkeypatch, "pkg", "-c", cfg, "--no-format")
+    printed = capsys.readouterr().out
+    run(monkeypatch, "pkg", "-c", cfg, "-o", tmp_path, "--no-format")
+    (outfile,) = tmp_path.iterdir()
+    assert outfile.read_text() + "\n" == printed
+    assert "RoutingTables" in printed
+
+
+def imported_modules(*args) -> set[str]:
+    """Run `floogen` in a fresh interpreter, returning the top-level modules it imported."""
+    code = (
+        "import json, sys\n"
+        "from floogen import cli\n"
+        f"sys.argv = ['floogen', *{list(map(str, args))!r}]\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})), file=sys.stderr)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    return set(json.loads(result.stderr.splitlines()[-1]))
+
+
+@pytest.mark.parametrize(
+    ("args", "needed"),
+    [
+        (["--version"], set()),
+        (["help"], set()),
+        (["schema"], {"pydantic"}),
+        (
+            ["traffic", "-c", EXAMPLES_DIR / "nw_mesh_xy.yml", "--traffic-type", "onehop"],
+            HEAVY_MODULES - {"mako"},
+        ),
+    ],
+    ids=["version", "help", "schema", "traffic"],
+)
+def test_commands_import_only_what_they_need(tmp_path, args, needed):
+    if args[0] == "traffic":
+        args = [*args, "-o", tmp_path]
+    assert imported_modules(*args) & HEAVY_MODULES == needed
+
+
+def test_import_time_budget():
+    """Importing the CLI stays well below the time it took to import the network models."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import floogen.cli"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # The last line of the report is `floogen.cli` itself: self | cumulative | name, in us
+    cumulative = int(result.stderr.splitlines()[-1].split("|")[1])
+    assert cumulative / 1e6 < IMPORT_BUDGET
@@ -0,0 +1,52 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Shared test setup."""
+
+import os
+import pathlib
+import shutil
+import tempfile
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from floogen.model.network import Network
+
+# Set before any test resolves the cache directory, which keeps the caches of the test
+# session out of the user's cache directory.
+_CACHE_DIR = tempfile.mkdtemp(prefix="floogen-test-cache-")
+os.environ["FLOOGEN_CACHE_DIR"] = _CACHE_DIR
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+
+
+def pytest_unconfigure(config):
+    """Remove the cache directory of the test session."""
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def example_network() -> Callable[[str], "Network"]:
+    """Return a function that elaborates an example network by name, once per session.
+
+    The networks are shared between all tests, which must not modify them.
+    """
+    from floogen.cache import elaborate
+    from floogen.config_parser import parse_config
+    from floogen.model.network import Network
+
+    networks: dict[str, Network] = {}
+
+    def get(name: str) -> Network:
+        if name not in networks:
+            network = parse_config(Network, EXAMPLES_DIR / f"{name}.yml")
+            networks[name] = elaborate(network, use_cache=False)
+        return networks[name]
+
+    return get
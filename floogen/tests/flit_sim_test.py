@@ -0,0 +1,49 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the flit-level network simulator."""
+
+import pytest
+
+from floogen.model.flit_sim import FlitSimulator
+from floogen.model.link_load import analyze, pattern_matrix
+from floogen.model.network import Network
+
+
+@pytest.fixture
+def network(example_network) -> Network:
+    """The elaborated 4x4 example mesh with XY routing."""
+    return example_network("nw_mesh_xy")
+
+
+def test_zero_load_latency(network):
+    simulator = FlitSimulator(network, {("cluster_ni_0_0", "cluster_ni_3_0", "write"): 1.0})
+    [route] = simulator.flow_routes[0]
+    result = simulator.run(0.05, burst_length=8, cycles=2000, warmup=0)
+    # One cycle per hop for the head flit, followed by the rest of the burst
+    assert min(result.latencies) == len(route) - 1 + 8 - 1
+    assert result.undelivered == 0
+
+
+def test_throughput_below_and_above_saturation(network):
+    matrix = pattern_matrix(network, "hotspot")
+    simulator = FlitSimulator(network, matrix)
+    saturation_rate = analyze(network, matrix, "hotspot").saturation_rate
+    low = simulator.run(saturation_rate / 2, cycles=4000)
+    assert not low.saturated
+    assert low.accepted == pytest.approx(low.offered, rel=0.1)
+    # All traffic ends at a single network interface, which accepts one flit per cycle
+    high = simulator.run(4 * saturation_rate, cycles=4000)
+    assert high.saturated
+    assert high.accepted == pytest.approx(1.0, abs=0.01)
+    assert high.avg_latency > low.avg_latency
+
+
+def test_runs_are_reproducible(network):
+    simulator = FlitSimulator(network, pattern_matrix(network, "uniform", "read"))
+    first, second = (simulator.run(0.2, cycles=1000, seed=1) for _ in range(2))
+    assert first == second
+    assert first.latencies != simulator.run(0.2, cycles=1000, seed=2).latencies
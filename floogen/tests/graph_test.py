@@ -4,9 +4,13 @@
 #
 # Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
 
+import pathlib
+
 import pytest
 
+from floogen.config_parser import parse_config
 from floogen.model.graph import Graph
+from floogen.model.network import Network
 
 
 @pytest.fixture(name="graph")
@@ -392,3 +396,106 @@ def test_get_node_id(graph):
     """Test getting the id of a node"""
     graph.add_node("A", type="router", id=1)
     assert graph.get_node_id("A") == 1
+
+
+def test_freeze(graph):
+    """Freezing the graph indexes its nodes and edges."""
+    graph.add_node("A", type="router", lvl=0)
+    graph.add_node("B", type="network_interface", arr_idx=(1,))
+    graph.add_node("C", type="endpoint")
+    graph.add_edge_bidir("A", "B", type="link")
+    graph.add_edge("B", "C", type="protocol")
+    compact = graph.freeze()
+    assert compact.names == ("A", "B", "C")
+    assert list(compact.successors(compact.index["B"])) == [0, 2]
+    assert list(compact.predecessors(compact.index["C"])) == [1]
+    assert compact.edges_from("B") == [("B", "A"), ("B", "C")]
+    assert compact.arr_idx == [None, (1,), None]
+    assert list(compact.lvl) == [0, -1, -1]
+    assert graph.freeze() is compact
+
+
+def test_thaw_on_change(graph):
+    """Changing the structure of a frozen graph drops the compact representation."""
+    graph.add_node("A", type="router")
+    graph.freeze()
+    graph.add_node("B", type="router")
+    assert graph.get_rt_nodes(with_obj=False) == ["A", "B"]
+    graph.freeze()
+    graph.remove_node("A")
+    assert graph.get_rt_nodes(with_obj=False) == ["B"]
+
+
+def test_typed_index(graph):
+    """Typed queries keep the graph's order, even if edges are not added in that order."""
+    graph.add_node("A", type="router")
+    graph.add_node("B", type="router")
+    graph.add_node("C", type="endpoint")
+    graph.add_edge("B", "A", type="link")
+    graph.add_edge("A", "B", type="link")
+    graph.add_edge("B", "C", type="protocol")
+    assert graph.get_link_edges(with_obj=False) == [("A", "B"), ("B", "A")]
+    assert graph.get_prot_edges(with_obj=False) == [("B", "C")]
+    graph.remove_node("A")
+    assert graph.get_rt_nodes(with_obj=False) == ["B"]
+    assert graph.get_link_edges(with_obj=False) == []
+
+
+def test_typed_cache_invalidation(graph):
+    """Setting an object invalidates the cached query results."""
+    graph.add_node("A", type="router", obj="Router A")
+    graph.add_node("B", type="endpoint", obj="Endpoint B")
+    graph.add_edge("A", "B", type="link", obj="Link AB")
+    assert graph.get_rt_nodes() == ["Router A"]
+    assert graph.get_link_edges() == ["Link AB"]
+    graph.set_node_obj("A", "New Router A")
+    graph.set_edge_obj(("A", "B"), "New Link AB")
+    assert graph.get_rt_nodes() == ["New Router A"]
+    assert graph.get_link_edges() == ["New Link AB"]
+    graph.add_node("C", type="router", obj="Router C")
+    assert graph.get_rt_nodes() == ["New Router A", "Router C"]
+
+
+def test_typed_queries_on_view(graph):
+    """Subgraph views fall back to filtering their nodes."""
+    graph.add_node("A", type="router")
+    graph.add_node("B", type="router")
+    assert graph.subgraph(["B"]).get_rt_nodes(with_obj=False) == ["B"]
+
+
+@pytest.mark.parametrize("example", ["axi_mesh_xy", "nw_mesh_src", "occamy_tree"])
+def test_frozen_queries(example):
+    """Queries on a frozen graph return the same as on the plain graph."""
+    examples_dir = pathlib.Path(__file__).parents[1] / "examples"
+    network = parse_config(Network, examples_dir / f"{example}.yml")
+    network.create_network()
+    graph = network.graph
+
+    def query():
+        queries = [
+            graph.get_ni_nodes(with_name=True),
+            graph.get_rt_nodes(with_name=True),
+            graph.get_ep_nodes(with_obj=False),
+            graph.get_prot_edges(with_name=True),
+            graph.get_link_edges(with_obj=False),
+        ]
+        for node in graph.nodes:
+            queries.append(graph.get_edges_from(node, with_name=True))
+            queries.append(graph.get_edges_to(node, filters=[graph.is_link_edge]))
+            queries.append(graph.get_edges_of(node, with_obj=False))
+        return queries
+
+    frozen = query()
+    graph.thaw()
+    assert frozen == query()
+
+
+def test_create_unique_ep_id_after_removal(graph):
+    """Endpoint ids are renumbered if an endpoint is removed."""
+    graph.add_node("A", type="endpoint")
+    graph.add_node("B", type="endpoint")
+    graph.add_node("C", type="endpoint")
+    graph.remove_node("B")
+    assert graph.create_unique_ep_id("C") == 1
+    with pytest.raises(ValueError):
+        graph.create_unique_ep_id("B")
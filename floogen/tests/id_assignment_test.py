@@ -0,0 +1,75 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the assignment of endpoint IDs."""
+
+import itertools
+import pathlib
+
+import pytest
+from pydantic import ValidationError
+
+from floogen import bench
+from floogen.config_parser import parse_config
+from floogen.model.id_assignment import assign_ep_ids, count_table_rules, hilbert_index
+from floogen.model.network import Network
+from floogen.model.routing import IdOrder, RoutingDesc
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+
+
+def mesh(x: int, y: int, id_order: IdOrder) -> Network:
+    """Return an elaborated `ID` routed mesh with the given endpoint ID order."""
+    network = Network.model_validate(bench.mesh_config(x, y, "ID"))
+    network.routing.id_order = id_order
+    network.create_network()
+    network.compile_network()
+    network.gen_routing_info()
+    return network
+
+
+def test_hilbert_curve_visits_neighbors():
+    cells = sorted((hilbert_index(x, y, 3), (x, y)) for x in range(8) for y in range(8))
+    assert [index for index, _ in cells] == list(range(64))
+    for (_, (x0, y0)), (_, (x1, y1)) in itertools.pairwise(cells):
+        assert abs(x0 - x1) + abs(y0 - y1) == 1
+
+
+@pytest.mark.parametrize("id_order", [IdOrder.INSERTION, IdOrder.DFS, IdOrder.HILBERT])
+def test_counted_rules_match_router_tables(id_order):
+    network = mesh(4, 3, id_order)
+    ordered = sorted(network.graph.get_ep_nodes(with_obj=False), key=network.graph.get_node_uid)
+    num_rules = count_table_rules(network.graph, {id_order: ordered})
+    assert num_rules[id_order] == sum(len(rt.table) for rt in network.graph.get_rt_nodes())
+
+
+def test_auto_picks_the_fewest_rules():
+    network = mesh(6, 6, IdOrder.AUTO)
+    num_rules = network.routing_info.id_order_rules
+    assert list(num_rules) == [IdOrder.INSERTION, IdOrder.DFS, IdOrder.HILBERT]
+    assert sum(len(rt.table) for rt in network.graph.get_rt_nodes()) == min(num_rules.values())
+    assert min(num_rules.values()) < num_rules[IdOrder.INSERTION]
+
+
+def test_auto_keeps_the_declaration_order_on_a_tie():
+    network = parse_config(Network, EXAMPLES_DIR / "single_cluster.yml")
+    network.create_network()
+    ep_ids, num_rules = assign_ep_ids(network.graph, IdOrder.AUTO)
+    assert IdOrder.HILBERT not in num_rules
+    assert ep_ids == assign_ep_ids(network.graph, IdOrder.INSERTION)[0]
+
+
+def test_auto_requires_id_routing():
+    assert RoutingDesc(route_algo="ID", id_order="auto").id_order is IdOrder.AUTO
+    with pytest.raises(ValidationError, match="`id_order: auto` .* requires `route_algo: ID`"):
+        RoutingDesc(route_algo="SRC", id_order="auto")
+
+
+def test_hilbert_requires_a_router_array():
+    network = parse_config(Network, EXAMPLES_DIR / "occamy_tree.yml")
+    network.create_network()
+    with pytest.raises(ValueError, match="two-dimensional array of routers"):
+        assign_ep_ids(network.graph, IdOrder.HILBERT)
@@ -0,0 +1,70 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the static link-load analysis."""
+
+import itertools
+
+import pytest
+
+from floogen.model.link_load import FlowRouter, analyze, bisections, pattern_matrix
+
+
+def test_xy_routes_x_first(example_network):
+    router = FlowRouter(example_network("nw_mesh_xy"))
+    assert router.path("cluster_ni_0_0", "cluster_ni_2_1") == [
+        "cluster_ni_0_0",
+        "router_0_0",
+        "router_1_0",
+        "router_2_0",
+        "router_2_1",
+        "cluster_ni_2_1",
+    ]
+    # The responses of the mirrored algorithm take the opposite dimension order
+    router = FlowRouter(example_network("nw_mesh_mixed"))
+    assert router.path("cluster_ni_0_0", "cluster_ni_2_1", response=True)[2] == "router_0_1"
+
+
+@pytest.mark.parametrize("route_algo", ["xy", "mixed", "id", "src"])
+def test_loads_are_the_sum_of_the_flow_paths(example_network, route_algo):
+    network = example_network(f"nw_mesh_{route_algo}")
+    router = FlowRouter(network)
+    for traffic_rw in ("read", "write"):
+        matrix = pattern_matrix(network, "uniform", traffic_rw)
+        expected: dict[tuple[str, str], float] = {}
+        for (initiator, target, rw), rate in matrix.items():
+            path = (
+                router.path(target, initiator, response=True)
+                if rw == "read"
+                else router.path(initiator, target)
+            )
+            for link in itertools.pairwise(path):
+                expected[link] = expected.get(link, 0.0) + rate
+        assert router.link_loads(matrix) == pytest.approx(expected)
+
+
+def test_uniform_xy_mesh_saturates_at_the_bisection_rate(example_network):
+    network = example_network("nw_mesh_xy")
+    report = analyze(network, pattern_matrix(network, "uniform"), "uniform")
+    # Half of the 16 clusters send 8/15 of their traffic over the 4 links of a bisection
+    assert report.max_load == pytest.approx(16 / 15)
+    assert report.saturation_rate == pytest.approx(15 / 16)
+    assert report.bisection_rate == pytest.approx(15 / 16)
+    assert report.bottlenecks(1)[0][1] == pytest.approx(report.max_load)
+
+
+def test_bisections_of_a_mesh(example_network):
+    cuts = bisections(example_network("nw_mesh_xy"))
+    assert [(cut.dim, cut.num_links) for cut in cuts] == [("x", 4), ("y", 4)]
+    assert not cuts[0].sides["cluster_ni_1_3"]
+    assert cuts[0].sides["cluster_ni_2_0"]
+
+
+def test_misrouted_flows_are_reported(example_network):
+    # The HBM channels on the west are not reachable with XY routing from every row
+    network = example_network("nw_mesh_xy")
+    with pytest.raises(ValueError, match="routes hbm_ni_"):
+        analyze(network, pattern_matrix(network, "hotspot_boundary"), "hotspot_boundary")
@@ -0,0 +1,85 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the generation-time profiler."""
+
+import io
+import json
+import pathlib
+import sys
+
+import networkx as nx
+from pydantic import BaseModel
+
+from floogen import cli, profiler
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+
+
+class Point(BaseModel):
+    """A model to count calls on."""
+
+    x: int
+
+
+def test_stage_without_profiler():
+    with profiler.stage("idle"):
+        pass
+    assert profiler._active is None
+
+
+def test_stages_are_accumulated():
+    with profiler.Profiler() as prof:
+        for _ in range(3):
+            with profiler.stage("work"):
+                pass
+    assert prof.stages["work"]["count"] == 3
+    assert prof.stages["work"]["time"] <= prof.total
+
+
+def test_calls_are_counted_and_restored():
+    orig_validate = BaseModel.__dict__["model_validate"]
+    orig_shortest_path = nx.shortest_path
+    with profiler.Profiler() as prof:
+        Point.model_validate({"x": 1}).model_copy()
+        nx.shortest_path(nx.path_graph(3), 0, 2)
+    assert prof.calls["pydantic:BaseModel.model_validate"] == 1
+    assert prof.calls["pydantic:BaseModel.model_copy"] == 1
+    assert prof.calls["networkx:shortest_path"] == 1
+    assert BaseModel.__dict__["model_validate"] is orig_validate
+    assert nx.shortest_path is orig_shortest_path
+
+
+def test_table_report():
+    with profiler.Profiler() as prof, profiler.stage("work"):
+        pass
+    out = io.StringIO()
+    prof.report("table", out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].split()[:3] == ["Stage", "Runs", "Time"]
+    assert lines[1].startswith("work")
+    assert lines[2].startswith("total")
+
+
+def test_cli_profile_json(monkeypatch, capsys, tmp_path):
+    cfg = EXAMPLES_DIR / "axi_mesh_xy.yml"
+    argv = ["floogen", "rtl", "-c", str(cfg), "-o", str(tmp_path), "--no-format"]
+    monkeypatch.setattr(sys, "argv", [*argv, "--no-cache", "--profile", "json"])
+    assert cli.main() == 0
+    report = json.loads(capsys.readouterr().err)
+    stages = [s["name"] for s in report["stages"]]
+    assert stages == [
+        "load_yaml",
+        "resolve_params",
+        "validate",
+        "cache_load",
+        "create_network",
+        "compile_network",
+        "gen_routing_info",
+        "render",
+    ]
+    assert report["calls"]["pydantic.BaseModel.model_validate"] > 0
+    assert profiler._active is None
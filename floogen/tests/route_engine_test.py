@@ -0,0 +1,198 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the shortest-path engine behind the routing tables."""
+
+import itertools
+import pathlib
+
+import networkx as nx
+import pytest
+
+from floogen import bench
+from floogen.cache import elaborate
+from floogen.config_parser import parse_config
+from floogen.model import routing
+from floogen.model.graph import Graph
+from floogen.model.network import Network
+from floogen.model.route_engine import RouteEngine
+from floogen.model.routing import IdOrder, TableEncoding
+
+EXAMPLES_DIR = pathlib.Path(__file__).parents[1] / "examples"
+
+
+@pytest.fixture(name="graph")
+def setup_graph():
+    """A ring of four routers, where `A` reaches `C` over two equally short paths."""
+    graph = Graph()
+    for node in "ABCD":
+        graph.add_node(node, type="router")
+    graph.add_edge_bidir("A", "B", type="link")
+    graph.add_edge_bidir("B", "C", type="link")
+    graph.add_edge_bidir("C", "D", type="link")
+    graph.add_edge_bidir("D", "A", type="link")
+    return graph
+
+
+@pytest.fixture(name="diamond")
+def setup_diamond():
+    """`A` reaches `D` over `B` or `C`, but `D` was connected to `C` first."""
+    graph = Graph()
+    for node in "ABCD":
+        graph.add_node(node, type="router")
+    graph.add_edge_bidir("A", "B", type="link")
+    graph.add_edge_bidir("A", "C", type="link")
+    graph.add_edge_bidir("C", "D", type="link")
+    graph.add_edge_bidir("B", "D", type="link")
+    return graph
+
+
+def test_next_hops(graph):
+    """Ties are broken by adjacency order, i.e. through `B` which was connected first."""
+    assert RouteEngine(graph).next_hops("A") == {"B": "B", "D": "D", "C": "B"}
+
+
+def test_ties_are_broken_from_the_source(diamond):
+    """Unlike with `nx.shortest_path`, the order of the destination's neighbors does not matter."""
+    assert RouteEngine(diamond).next_hops("A")["D"] == "B"
+    assert nx.shortest_path(diamond, "A", "D") == ["A", "C", "D"]
+
+
+def test_shortest_path(graph):
+    assert RouteEngine(graph).shortest_path("A", "C") == ["A", "B", "C"]
+
+
+def test_unreachable_node_has_no_next_hop(graph):
+    graph.add_node("E", type="router")
+    engine = RouteEngine(graph)
+    assert "E" not in engine.next_hops("A")
+    with pytest.raises(ValueError, match="No path"):
+        engine.shortest_path("A", "E")
+
+
+@pytest.mark.parametrize("example", ["axi_mesh_id", "nw_mesh_src", "occamy_tree"])
+def test_paths_match_networkx(example_network, example):
+    """The examples get the same tables as from `nx.shortest_path`, which they had before."""
+    graph = example_network(example).graph
+    engine = RouteEngine(graph)
+    ni_nodes = graph.get_ni_nodes(with_obj=False, with_name=True)
+    for src in list(graph.get_rt_nodes(with_obj=False, with_name=True)) + list(ni_nodes):
+        next_hops = engine.next_hops(src)
+        for dst in ni_nodes:
+            if dst == src:
+                continue
+            assert next_hops[dst] == nx.shortest_path(graph, src, dst)[1]
+
+
+def test_source_routes(graph):
+    """Every hop between source and destination contributes its port and port width."""
+    ports = {"B": ({"A": 0, "C": 1}, 1), "C": ({"B": 0, "D": 1}, 1), "D": ({"C": 0, "A": 1}, 1)}
+    routes = RouteEngine(graph).source_routes("A", ports)
+    assert routes == {"B": ([], 0), "D": ([], 0), "C": ([(1, 1)], 1)}
+
+
+def test_source_routes_break_ties_from_the_source(diamond):
+    """Of the two paths from `A` to `D`, the route takes the one over `B`, like `next_hops`."""
+    ports = {"B": ({"A": 0, "D": 1}, 1), "C": ({"A": 0, "D": 2}, 2)}
+    assert RouteEngine(diamond).source_routes("A", ports)["D"] == ([(1, 1)], 1)
+    assert nx.shortest_path(diamond, "A", "D")[1] == "C"
+
+
+def test_path_counts(graph):
+    """`C` is reached over both neighbors of `A`, unless `D` does not forward."""
+    engine = RouteEngine(graph)
+    assert engine.path_counts("A", set("BCD")) == {"B": (1, 1), "D": (1, 1), "C": (2, 2)}
+    assert engine.path_counts("A", set("BC"))["C"] == (2, 1)
+
+
+@pytest.mark.parametrize("example", ["nw_mesh_id", "occamy_tree"])
+def test_path_counts_match_networkx(example_network, example):
+    graph = example_network(example).graph
+    engine = RouteEngine(graph)
+    routers = set(graph.get_rt_nodes(with_obj=False))
+    ni_nodes = graph.get_ni_nodes(with_obj=False)
+    src = ni_nodes[0]
+    path_counts = engine.path_counts(src, routers)
+    for dst in ni_nodes[1:]:
+        paths = list(nx.all_shortest_paths(graph, src, dst))
+        assert path_counts[dst] == (len(paths[0]) - 1, len(paths))
+
+
+@pytest.mark.parametrize("example", ["nw_mesh_src", "occamy_mesh_src"])
+def test_source_routes_match_networkx(example_network, example):
+    """The examples get the same source routes as from `nx.shortest_path`, as they had before."""
+    network = example_network(example)
+    graph = network.graph
+    engine = RouteEngine(graph)
+    ports = {rt.name: (rt.out_ports(), 1) for rt in graph.get_rt_nodes()}
+    ni_nodes = graph.get_ni_nodes(with_obj=False, with_name=True)
+    for src in ni_nodes:
+        routes = engine.source_routes(src, ports)
+        for dst in ni_nodes:
+            if dst == src:
+                continue
+            path = nx.shortest_path(graph, src, dst)
+            hops = [ports[u][0][v] for u, v in itertools.pairwise(path[1:])]
+            assert routes[dst] == ([(port, 1) for port in hops], len(hops))
+
+
+def test_minimal_router_tables_decode_the_same():
+    """Minimal tables route every destination ID to the same output port with no more rules."""
+    encoding = TableEncoding.MINIMAL
+    tables = {}
+    for table_encoding in (TableEncoding.RANGES, encoding):
+        network = parse_config(Network, EXAMPLES_DIR / "axi_mesh_id.yml")
+        network.routing.table_encoding = table_encoding
+        network = elaborate(network, use_cache=False)
+        tables[table_encoding] = {rt.name: rt.table for rt in network.graph.get_rt_nodes()}
+
+    for name, table in tables[encoding].items():
+        full = tables[TableEncoding.RANGES][name]
+        for dest_id in range(network.routing_info.num_endpoints):
+            decoded = next(
+                (r.dest for r in table.rules if r.addr_range.start <= dest_id < r.addr_range.end),
+                None,
+            )
+            assert decoded == getattr(full.lookup(dest_id), "dest", None)
+        assert len(table) <= len(full)
+    num_rules = {enc: sum(map(len, tables[enc].values())) for enc in tables}
+    assert num_rules[encoding] < num_rules[TableEncoding.RANGES]
+
+
+def test_long_router_tables_are_minimized_in_windows(monkeypatch, caplog):
+    """Tables longer than the window still decode the same, and minimizing them is logged."""
+    monkeypatch.setattr(routing, "MINIMIZE_WINDOW", 5)
+    network = Network.model_validate(bench.interleaved_tree_config(4, 4))
+    network.create_network()
+    network.compile_network()
+    network.gen_routing_info()
+    assert "in windows of 5" in caplog.text
+
+    for rt in network.graph.get_rt_nodes():
+        table = rt.table
+        assert len(table) <= table.num_unminimized_rules
+        for dest_id in range(network.routing_info.num_endpoints):
+            decoded = next(
+                (r.dest for r in table.rules if r.addr_range.start <= dest_id < r.addr_range.end),
+                None,
+            )
+            assert decoded == getattr(table.lookup(dest_id), "dest", None)
+
+
+def test_dfs_id_order_shrinks_router_tables():
+    """Numbering the endpoints along the routers keeps them in fewer ranges."""
+    num_rules = {}
+    for id_order in IdOrder:
+        network = Network.model_validate(bench.mesh_config(8, 8, "ID"))
+        network.routing.id_order = id_order
+        network.create_network()
+        network.compile_network()
+        network.gen_routing_info()
+        num_rules[id_order] = sum(len(rt.table) for rt in network.graph.get_rt_nodes())
+        ids = sorted(ni.id.id for ni in network.graph.get_ni_nodes())
+        assert ids == list(range(len(ids)))
+        assert all(ni.id == ni.uid for ni in network.graph.get_ni_nodes())
+    assert num_rules[IdOrder.DFS] < num_rules[IdOrder.INSERTION]
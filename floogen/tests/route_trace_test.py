@@ -0,0 +1,75 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for tracing the routes of a network."""
+
+import io
+import json
+
+import pytest
+
+from floogen.model.route_trace import hop_matrix
+from floogen.model.routing import XYDirections
+
+
+def test_trace_route_lists_the_ports(example_network):
+    hops = example_network("nw_mesh_xy").trace_route("cluster_0_0", "cluster_ni_1_1")
+    assert [(hop.node, hop.out_port) for hop in hops[1:-1]] == [
+        ("router_0_0", XYDirections.EAST.value),
+        ("router_1_0", XYDirections.NORTH.value),
+        ("router_1_1", XYDirections.EJECT.value),
+    ]
+    assert [hop.in_port for hop in hops[1:-1]] == [
+        XYDirections.EJECT.value,
+        XYDirections.WEST.value,
+        XYDirections.SOUTH.value,
+    ]
+    assert hops[0].in_port is None and hops[-1].out_port is None
+
+
+def test_trace_route_of_responses(example_network):
+    network = example_network("nw_mesh_mixed")
+    request = network.trace_route("cluster_0_0", "cluster_1_1")
+    response = network.trace_route("cluster_0_0", "cluster_1_1", response=True)
+    assert request[2].node == "router_1_0"
+    assert response[2].node == "router_0_1"
+
+
+def test_unknown_endpoints_are_rejected(example_network):
+    with pytest.raises(ValueError, match="Unknown endpoint or network interface 'cluster'"):
+        example_network("nw_mesh_xy").trace_route("cluster", "hbm_0")
+
+
+@pytest.mark.parametrize("route_algo", ["xy", "id", "src"])
+def test_hop_matrix_matches_the_traced_routes(example_network, route_algo):
+    network = example_network(f"nw_mesh_{route_algo}")
+    matrix = hop_matrix(network)
+    assert len(matrix.sources) == 16
+    assert len(matrix.destinations) == 20
+    for src, row in zip(matrix.sources, matrix.hops, strict=True):
+        for dst, hops in zip(matrix.destinations, row, strict=True):
+            if src == dst:
+                assert hops is None
+                continue
+            try:
+                route = network.trace_route(src, dst)
+            except ValueError:
+                assert hops is None
+            else:
+                assert hops == len(route) - 2
+
+
+def test_hop_matrix_export(example_network):
+    matrix = hop_matrix(example_network("nw_mesh_id"))
+    output = io.StringIO()
+    matrix.write_json(output)
+    data = json.loads(output.getvalue())
+    assert data["hops"][0][:3] == [None, 2, 3]
+    output = io.StringIO()
+    matrix.write_csv(output)
+    header, first = output.getvalue().splitlines()[:2]
+    assert header.startswith(",cluster_ni_0_0,cluster_ni_0_1,")
+    assert first.startswith("cluster_ni_0_0,,2,3,")
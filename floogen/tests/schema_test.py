@@ -10,12 +10,13 @@ These cover input shapes that used to be accepted (and silently misinterpreted)
 rather than rejected, plus validators that returned the wrong thing.
 """
 
+import dataclasses
 import pathlib
 
 import pytest
 from pydantic import ValidationError
 
-from floogen.config_parser import parse_config
+from floogen.config_parser import ConfigError, parse_config
 from floogen.model.connection import ConnectionDesc
 from floogen.model.endpoint import EndpointDesc
 from floogen.model.network import Network
@@ -73,6 +74,22 @@ def test_xy_id_offset_accepts_both_union_branches(model):
     assert model(name="n", xy_id_offset={"x": 1, "y": 2}).xy_id_offset == Coord(x=1, y=2)
 
 
+@pytest.mark.parametrize("model", [EndpointDesc, RouterDesc])
+def test_negative_id_offset_is_rejected(model):
+    with pytest.raises(ValidationError):
+        model(name="n", xy_id_offset={"id": -1})
+
+
+def test_ids_are_frozen_values():
+    """Elaborated IDs are plain values, which are hashed and compared by their fields."""
+    coord = Coord(x=3, y=2) - Coord(x=1, y=1)
+    assert coord == Coord(x=2, y=1)
+    assert {coord: 0, SimpleId(id=2): 1}[Coord(2, 1)] == 0
+    assert sorted([SimpleId(id=2), SimpleId(id=0)]) == [SimpleId(id=0), SimpleId(id=2)]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        coord.x = 0
+
+
 @pytest.mark.parametrize("model", [EndpointDesc, RouterDesc])
 def test_partial_coord_offset_is_accepted(model):
     """A partial offset keeps working; the omitted axis defaults to 0."""
@@ -183,6 +200,14 @@ def test_generated_routing_fields_are_not_configurable():
             RoutingDesc.model_validate({"route_algo": "XY", field: 1})
 
 
+def test_graph_is_not_configurable(tmp_path):
+    """`graph` is elaboration state, so a stray `graph:` key is rejected."""
+    cfg = tmp_path / "network.yml"
+    cfg.write_text(EXAMPLE.read_text() + "graph: 42\n")
+    with pytest.raises(ConfigError):
+        parse_config(Network, cfg)
+
+
 def test_routing_info_is_unavailable_before_elaboration():
     """Reading a derived width too early names the cause instead of returning `None`."""
     network = parse_config(Network, EXAMPLE)
@@ -229,3 +254,20 @@ def test_set_decouple_rw_emits_localparam():
     rendered = routing.render_vc_impl()
     assert "WideRwDecouple" in rendered
     assert "VcImpl" in rendered
+
+
+def test_fast_ni_construction_matches_full_validation(monkeypatch):
+    """Network interfaces built with `model_construct` equal fully validated ones."""
+
+    def _compiled_nis():
+        network = parse_config(Network, EXAMPLE)
+        network.create_network()
+        network.compile_network()
+        return network.graph.get_ni_nodes()
+
+    monkeypatch.delenv("FLOOGEN_VALIDATE", raising=False)
+    fast = _compiled_nis()
+    monkeypatch.setenv("FLOOGEN_VALIDATE", "1")
+    validated = _compiled_nis()
+    assert fast == validated
+    assert [ni.model_fields_set for ni in fast] == [ni.model_fields_set for ni in validated]
@@ -0,0 +1,87 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the injection-rate sweeps."""
+
+import csv
+import io
+
+import pytest
+
+from floogen import sweep
+from floogen.model.link_load import analyze, pattern_matrix
+from floogen.model.network import Network
+from floogen.sweep import SweepTask, run_sweep
+
+
+@pytest.fixture
+def network(example_network) -> Network:
+    """The elaborated 4x4 example mesh with XY routing."""
+    return example_network("nw_mesh_xy")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("FLOOGEN_CACHE_DIR", str(tmp_path))
+
+
+def tasks(traffic_type: str, rates: list[float], **kwargs) -> list[SweepTask]:
+    return [SweepTask(traffic_type, "write", 16, rate, **kwargs) for rate in rates]
+
+
+def test_queueing_saturates_at_the_max_link_load(network):
+    saturation_rate = analyze(network, pattern_matrix(network, "transpose"), "").saturation_rate
+    rates = [saturation_rate * scale for scale in (0.01, 0.5, 0.99, 1.01, 2)]
+    [curve] = run_sweep(network, tasks("transpose", rates), use_cache=False)
+    assert curve.saturation_rate == rates[3]
+    latencies = [point.avg_latency for point in curve.points]
+    assert latencies == sorted(latencies)
+    assert latencies[-1] == float("inf")
+    assert curve.points[-1].accepted == pytest.approx(curve.points[-1].offered / 2)
+
+
+def test_queueing_matches_the_simulation_at_low_load(network):
+    estimate, simulated = (
+        run_sweep(network, tasks("uniform", [0.1], method=method, cycles=4000), use_cache=False)
+        for method in ("queueing", "sim")
+    )
+    assert estimate[0].points[0].avg_latency == pytest.approx(
+        simulated[0].points[0].avg_latency, rel=0.15
+    )
+
+
+def test_points_are_cached(network, monkeypatch):
+    sweep_tasks = tasks("uniform", [0.1, 0.3], method="sim", cycles=500)
+    curves = run_sweep(network, sweep_tasks)
+
+    def evaluate(task):
+        raise AssertionError(f"{task} was evaluated again")
+
+    monkeypatch.setattr(sweep, "_evaluate", evaluate)
+    assert run_sweep(network, sweep_tasks) == curves
+
+
+def test_parallel_sweep_is_deterministic(network):
+    sweep_tasks = [
+        *tasks("uniform", [0.1, 0.6], method="sim", cycles=500),
+        *tasks("shuffle", [0.1, 0.6], method="sim", cycles=500),
+    ]
+    serial = run_sweep(network, sweep_tasks, use_cache=False)
+    assert run_sweep(network, sweep_tasks, jobs=2, use_cache=False) == serial
+    assert [curve.traffic_type for curve in serial] == ["uniform", "shuffle"]
+
+
+def test_unroutable_patterns_are_reported(network):
+    curves = run_sweep(network, tasks("hotspot_boundary", [0.1]) + tasks("uniform", [0.1]))
+    assert curves[0].error is not None
+    assert "routes hbm_ni_" in curves[0].error
+    assert not curves[0].points
+
+    output = io.StringIO()
+    sweep.write_csv(curves, output)
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert [row["traffic_type"] for row in rows] == ["uniform"]
+    assert rows[0]["saturation_rate"] == ""
@@ -0,0 +1,53 @@
+# Copyright 2026 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Author: Tim Fischer <fischeti@iis.ee.ethz.ch>
+
+"""Tests for the hop-count and path-diversity statistics of a topology."""
+
+import io
+import json
+
+import networkx as nx
+import pytest
+
+from floogen.model.topology_stats import topology_stats
+
+
+def test_mesh_pairs_are_weighted_by_their_roles(example_network):
+    network = example_network("nw_mesh_xy")
+    stats = topology_stats(network)
+    # 16 clusters talk to each other in both directions, the 4 HBM channels only serve them
+    assert stats.num_pairs == 16 * 15 + 2 * 16 * 4
+    assert stats.num_unreachable == 0
+    assert sum(stats.hop_histogram.values()) == stats.num_pairs
+    assert stats.diameter == max(stats.hop_histogram) == 7
+    graph = network.graph
+    total_hops = total_weight = 0
+    for src in graph.get_ni_nodes():
+        for dst in graph.get_ni_nodes():
+            weight = (src.is_mgr() and dst.is_sbr()) + (src.is_sbr() and dst.is_mgr())
+            if src != dst and weight:
+                total_hops += weight * (nx.shortest_path_length(graph, src.name, dst.name) - 1)
+                total_weight += weight
+    assert stats.avg_hops == pytest.approx(total_hops / total_weight)
+    # Only the pairs in the same row or column have a single shortest path
+    assert stats.min_paths == 1
+    assert 0 < stats.single_path_share < 1
+    assert stats.median_paths > 1
+
+
+def test_tree_has_no_path_diversity(example_network):
+    stats = topology_stats(example_network("occamy_tree"))
+    assert stats.min_paths == stats.median_paths == 1
+    assert stats.single_path_share == 1.0
+
+
+def test_stats_are_written_as_json(example_network):
+    stats = topology_stats(example_network("nw_mesh_xy"))
+    out = io.StringIO()
+    stats.write_json(out)
+    data = json.loads(out.getvalue())
+    assert data["name"] == "nw_mesh"
+    assert data["hop_histogram"]["7"] == stats.hop_histogram[7]
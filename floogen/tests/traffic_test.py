@@ -42,3 +42,17 @@ def test_builtin_traffic_uses_mesh_coordinates_for_all_routing_algorithms(tmp_pa
 
     assert (tmp_path / "mesh_0.txt").read_text()
     assert (tmp_path / "mesh_100.txt").read_text()
+
+
+def test_traffic_addresses_are_mapped():
+    """Every address traffic is generated for belongs to an endpoint in the SAM."""
+    network = parse_config(Network, EXAMPLES_DIR / "nw_mesh_xy.yml")
+    network.create_network()
+    network.compile_network()
+    network.gen_routing_info()
+
+    sam = network.routing_info.sam
+    for addr in _xy_addr_map(network).values():
+        rule = sam.lookup(addr)
+        assert rule is not None
+        assert rule.addr_range.start == addr
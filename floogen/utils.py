@@ -7,6 +7,10 @@
 import math
 import shutil
 import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
 
 
 def cdiv(x: float, y: float) -> int:
@@ -145,6 +149,24 @@ def sv_param_decl(
     Returns:
         str: SystemVerilog parameter declaration.
     """
+    return sv_param_decl_head(name, ptype, dtype, array_size) + f"{value};\n"
+
+
+def sv_param_decl_head(
+    name: str,
+    ptype: str = "localparam",
+    dtype: str = "int unsigned",
+    array_size: int | str | list[int | str] | None = None,
+) -> str:
+    """Declare a SystemVerilog parameter up to and including the `=`.
+
+    Used to stream large values, which are emitted piecewise after the head and
+    terminated with `;`. See `sv_param_decl` for the arguments.
+
+    Examples:
+        >>> sv_param_decl_head("Width")
+        "localparam int unsigned Width = "
+    """
     assert ptype in ["localparam", "parameter"]
 
     def _array_fmt(size):
@@ -153,12 +175,12 @@ def sv_param_decl(
         return f"[{size}:0]"
 
     if array_size is None:
-        return f"{ptype} {dtype} {name} = {value};\n"
+        return f"{ptype} {dtype} {name} = "
     if isinstance(array_size, (int, str)):
-        return f"{ptype} {dtype}{_array_fmt(array_size)} {name} = {value};\n"
+        return f"{ptype} {dtype}{_array_fmt(array_size)} {name} = "
     if isinstance(array_size, list):
         array_fmt = "".join([_array_fmt(size) for size in array_size])
-        return f"{ptype} {dtype}{array_fmt} {name} = {value};\n"
+        return f"{ptype} {dtype}{array_fmt} {name} = "
     raise ValueError("array_size must be int, str, or list.")
 
 
@@ -265,6 +287,99 @@ def sv_enum_typedef(
     return typedef
 
 
+class VeribleFormatter:
+    """Formats SystemVerilog sources with `verible-verilog-format`.
+
+    All sources of a batch are written to temporary files and formatted in place by a
+    single invocation of the formatter, instead of spawning one process per source.
+    Large batches can be split over a few concurrent invocations.
+
+    If the binary cannot be found, a warning is printed once and the sources are
+    returned unchanged.
+
+    Attributes:
+        elapsed (float): Total time spent formatting, in seconds.
+        num_formatted (int): Total number of formatted sources.
+    """
+
+    def __init__(self, verible_fmt_bin: str | None = None, verible_fmt_args: str | None = None):
+        """Initialize the formatter.
+
+        Args:
+            verible_fmt_bin (str, optional): Path to the verible-verilog-format binary.
+                If None, it will try to find it in the PATH. Defaults to None.
+            verible_fmt_args (str, optional): Additional arguments to pass to
+                verible-verilog-format. Defaults to None.
+        """
+        if verible_fmt_bin is None:
+            verible_fmt_bin = shutil.which("verible-verilog-format")  # Fallback to `which`
+        self.cmd = None
+        if verible_fmt_bin is not None:
+            self.cmd = verible_fmt_bin.split() + (verible_fmt_args or "").split()
+        self.elapsed = 0.0
+        self.num_formatted = 0
+        self._warned = False
+
+    def format(self, sources: list[str], jobs: int = 1) -> list[str]:
+        """Format a batch of sources, using up to `jobs` concurrent formatter processes.
+
+        Returns:
+            list[str]: The formatted sources in the same order, or the original sources
+                if verible-verilog-format is not found.
+        """
+        if not sources or not self._available():
+            return list(sources)
+        with tempfile.TemporaryDirectory(prefix="floogen-fmt-") as tmp_dir:
+            files = [Path(tmp_dir) / f"{i}.sv" for i in range(len(sources))]
+            for file, source in zip(files, sources, strict=True):
+                file.write_text(source, encoding="utf-8")
+            self.format_files(files, jobs)
+            return [file.read_text(encoding="utf-8") for file in files]
+
+    def format_files(self, files: list[Path], jobs: int = 1):
+        """Format a batch of files in place, using up to `jobs` concurrent formatter processes.
+
+        The files are left untouched if verible-verilog-format is not found.
+        """
+        if not files or not self._available():
+            return
+        start = time.perf_counter()
+        chunks = [files[i::jobs] for i in range(max(1, min(jobs, len(files))))]
+        if len(chunks) == 1:
+            self._format_inplace(chunks[0])
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(len(chunks)) as pool:
+                list(pool.map(self._format_inplace, chunks))
+        self.elapsed += time.perf_counter() - start
+        self.num_formatted += len(files)
+
+    def _available(self) -> bool:
+        """Check whether the formatter was found, and warn once if it was not."""
+        if self.cmd is None and not self._warned:
+            print(
+                "\033[93mWarning:\033[0m Output formatting is skipped because "
+                "`verible-verilog-format` was not found in the `PATH`. "
+                "Please install it or use the `--no-format` flag to skip formatting. "
+                "Alternatively, you can also specify the path to the binary with the "
+                "`--verible-fmt-bin` flag.",
+                file=sys.stderr,
+            )
+            self._warned = True
+        return self.cmd is not None
+
+    def _format_inplace(self, files: list[Path]):
+        """Format the files in place with a single invocation of the formatter."""
+        assert self.cmd is not None
+        subprocess.run(
+            [*self.cmd, "--inplace", *map(str, files)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+
 def verible_format(string: str, verible_fmt_bin=None, verible_fmt_args=None) -> str:
     """Format the string using verible-verilog-format.
 
@@ -278,29 +393,4 @@ def verible_format(string: str, verible_fmt_bin=None, verible_fmt_args=None) ->
     Returns:
         str: Formatted string, or the original string if verible-verilog-format is not found.
     """
-    if verible_fmt_bin is None:
-        verible_fmt_bin = shutil.which("verible-verilog-format")  # Fallback to `which`
-    if verible_fmt_bin is None:
-        print(
-            "\033[93mWarning:\033[0m Output formatting is skipped because \
-            `verible-verilog-format` was not found in the `PATH` \
-             Please install it or use the `--no-format` flag to skip formatting. \
-             Alternatively, you can also specify the path to the binary with the \
-            `--verible-fmt-bin` flag."
-        )
-        return string
-
-    if verible_fmt_args is None:
-        verible_fmt_args = []
-    else:
-        verible_fmt_args = verible_fmt_args.split()
-
-    # Format the output using verible-verilog-format, by piping it into the stdin
-    # of the formatter and capturing the stdout
-    return subprocess.run(
-        verible_fmt_bin.split() + verible_fmt_args + ["-"],
-        input=string,
-        capture_output=True,
-        text=True,
-        check=True,
-    ).stdout
+    return VeribleFormatter(verible_fmt_bin, verible_fmt_args).format([string])[0]